@@ -8,17 +8,20 @@ class BoardAdmin(admin.ModelAdmin):
     Inherit:
         admin.ModelAdmin
     Fields:
-        list_filter    : Fields used to filter Board object in the list
-        list_display   : Fields visible in Board object list
+        list_filter         : Fields used to filter Board object in the list
+        list_display        : Fields visible in Board object list
+        list_select_related : Foreign keys joined into the list query
     """
 
     list_filter = ("write_permission",)
+    list_select_related = ("create_user",)
 
     list_display = (
         "name",
         "path",
         "write_permission",
         "post_count",
+        "unique_views",
         "create_user",
         "created_at",
         "updated_at",
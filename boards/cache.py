@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from copy import copy
+from threading import Lock
+from time import monotonic, time
+import os
+from django.core.cache import cache
+from django.http import Http404
+
+BOARD_CACHE_TIMEOUT = int(os.environ.get("BOARD_CACHE_TIMEOUT", 60 * 10))
+BOARD_CACHE_NEGATIVE_TIMEOUT = int(os.environ.get("BOARD_CACHE_NEGATIVE_TIMEOUT", 30))
+BOARD_CACHE_LOCAL_TIMEOUT = float(os.environ.get("BOARD_CACHE_LOCAL_TIMEOUT", 5))
+BOARD_CACHE_LOCAL_SIZE = int(os.environ.get("BOARD_CACHE_LOCAL_SIZE", 1024))
+MISSING = "__missing__"
+
+
+class BoardCache:
+    """Two level read-through cache of Board by path
+    Process-local LRU in front of the shared django cache. Shared entries are
+    keyed with a version stamp of their path, which Board.save/delete
+    increment, so only that path expires and a board loaded before the write
+    is cached under a dead key. Workers check versions of their local
+    entries every local_timeout seconds.
+    The django cache must be shared by worker processes (settings.CACHES),
+    with a per-process cache saves only invalidate their own process.
+    Unknown paths are cached as MISSING for negative_timeout seconds.
+    Counters updated with queryset updates (post_count) may lag by timeout.
+    The viewers sketch is deferred, it's only read when counting views.
+
+    Fields:
+        timeout          : Shared cache timeout of found boards
+        negative_timeout : Shared cache timeout of unknown paths
+        local_timeout    : Seconds between version checks of local entries
+        local_size       : Maximum process-local entries
+    Methods:
+        get              : Return Board of path or raise Board.DoesNotExist
+        invalidate       : Increment path's version so its cached board expires
+    """
+
+    def __init__(
+        self,
+        timeout=BOARD_CACHE_TIMEOUT,
+        negative_timeout=BOARD_CACHE_NEGATIVE_TIMEOUT,
+        local_timeout=BOARD_CACHE_LOCAL_TIMEOUT,
+        local_size=BOARD_CACHE_LOCAL_SIZE,
+    ):
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+        self.local_timeout = local_timeout
+        self.local_size = local_size
+        self.local = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def version_key(path):
+        return f"boards:version:{path}"
+
+    def current_version(self, path):
+        key = self.version_key(path)
+        version = cache.get(key)
+        if version is None:
+            # Time based start keeps evicted versions from being reused
+            cache.add(key, int(time() * 1000), None)
+            version = cache.get(key)
+        return version
+
+    def get(self, path):
+        from boards.models import Board
+
+        now = monotonic()
+        board = version = None
+        with self.lock:
+            entry = self.local.get(path)
+            if entry is not None:
+                board, version, checked_at = entry
+                self.local.move_to_end(path)
+        stale = entry is None or now - checked_at >= self.local_timeout
+
+        if stale:
+            current = self.current_version(path)
+            if current != version:
+                board = None
+                version = current
+
+        if board is None:
+            key = f"boards:{version}:{path}"
+            board = cache.get(key)
+
+            if board is None:
+                board = Board.objects.defer("viewers").filter(pk=path).first()
+                board = board or MISSING
+                timeout = self.negative_timeout if board == MISSING else self.timeout
+                cache.set(key, board, timeout)
+
+        if stale:
+            with self.lock:
+                self.local[path] = (board, version, now)
+                self.local.move_to_end(path)
+                while len(self.local) > self.local_size:
+                    self.local.popitem(last=False)
+
+        if board == MISSING:
+            raise Board.DoesNotExist(f"Board {path} does not exist")
+
+        return copy(board)
+
+    def invalidate(self, path):
+        key = self.version_key(path)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, int(time() * 1000), None):
+                cache.incr(key)
+
+        with self.lock:
+            self.local.pop(path, None)
+
+
+board_cache = BoardCache()
+
+
+def get_board(path):
+    return board_cache.get(path)
+
+
+def get_board_or_404(path):
+    from boards.models import Board
+
+    try:
+        return board_cache.get(path)
+    except Board.DoesNotExist:
+        raise Http404(f"Board {path} does not exist")
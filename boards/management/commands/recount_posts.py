@@ -0,0 +1,52 @@
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from boards.models import Board
+from common.routers import post_databases
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    """Rebuild Board's denormalized post_count field
+    Recount every board's posts with a single UPDATE ... SET post_count = (SELECT COUNT)
+    Sharded posts are counted per shard and written with one bulk update
+    """
+
+    help = "Rebuild denormalized post_count of every board"
+
+    def handle(self, *args, **options):
+        if settings.POST_SHARDS:
+            updated = self.recount_shards()
+            self.stdout.write(self.style.SUCCESS(f"Recounted {updated} boards"))
+            return
+
+        post_counts = (
+            Post.objects.filter(board=OuterRef("pk"))
+            .order_by()
+            .values("board")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        updated = Board.objects.update(post_count=Coalesce(Subquery(post_counts), 0))
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} boards"))
+
+    def recount_shards(self):
+        counts = Counter()
+        for alias in post_databases():
+            counts.update(
+                dict(
+                    Post.objects.using(alias)
+                    .order_by()
+                    .values("board")
+                    .annotate(count=Count("pk"))
+                    .values_list("board", "count")
+                )
+            )
+
+        boards = list(Board.objects.only("post_count"))
+        for board in boards:
+            board.post_count = counts[board.pk]
+        Board.objects.bulk_update(boards, ["post_count"])
+        return len(boards)
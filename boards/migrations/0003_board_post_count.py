@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2026-10-18 00:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_post_count(apps, schema_editor):
+    Board = apps.get_model('boards', 'Board')
+    Post = apps.get_model('posts', 'Post')
+    post_counts = (
+        Post.objects.filter(board=models.OuterRef('pk'))
+        .order_by()
+        .values('board')
+        .annotate(count=models.Count('pk'))
+        .values('count')
+    )
+    Board.objects.update(
+        post_count=Coalesce(models.Subquery(post_counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0002_board_create_user'),
+        ('posts', '0003_auto_20200621_0928'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_post_count, migrations.RunPython.noop),
+    ]
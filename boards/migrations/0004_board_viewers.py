@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='viewers',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
+from functools import partial
+from django.db import models, transaction
 from common.models import AbstractTimeStamp, Permission
+from boards.cache import board_cache
 from re import sub
 
 
@@ -12,10 +14,14 @@ class Board(AbstractTimeStamp):
         name             : CharField
         write_permission : CharField
         create_user      : User model (1:N)
+        post_count       : PositiveIntegerField (Denormalized)
+        viewers          : BinaryField (HyperLogLog sketch of unique viewers)
     Methods:
         __str__          : Return board's name
-        post_count       : Return related post counts
         save             : Remove special character in path
+                           Never overwrite post_count and viewers on update
+                           Invalidate board cache
+        unique_views     : Return estimated unique viewers of board's posts
     Meta:
         db_table         : boards
     """
@@ -29,15 +35,39 @@ class Board(AbstractTimeStamp):
         "users.User", related_name="boards", on_delete=models.CASCADE
     )
 
-    def post_count(self):
-        return len(self.posts.all())
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    viewers = models.BinaryField(null=True, editable=False)
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
         self.path = sub(r"\W+", "", self.path)
+
+        # post_count is maintained with F() updates by Post and viewers by
+        # posts.unique_views, so a stale in-memory value must not be written back
+        if not (
+            self._state.adding
+            or kwargs.get("force_insert")
+            or kwargs.get("update_fields") is not None
+        ):
+            skipped = self.get_deferred_fields() | {"post_count", "viewers"}
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+
         super().save(*args, **kwargs)
 
+        # Invalidate again on commit, readers may cache the old row until then
+        board_cache.invalidate(self.path)
+        transaction.on_commit(partial(board_cache.invalidate, self.path))
+
+    def unique_views(self):
+        from posts.unique_views import unique_views
+
+        return unique_views.board_views(self.pk, self.viewers)
+
     class Meta:
         db_table = "boards"
@@ -0,0 +1,13 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from boards.cache import board_cache
+from boards.models import Board
+
+
+@receiver(post_delete, sender=Board)
+def invalidate_board_cache(sender, instance, **kwargs):
+    """Invalidate board cache when board is deleted directly or by cascade"""
+    board_cache.invalidate(instance.path)
+    transaction.on_commit(partial(board_cache.invalidate, instance.path))
@@ -0,0 +1,32 @@
+from common.testing import AdminChangelistMixin, TestCase
+from boards.models import Board
+from users.models import User
+
+
+class BoardAdminQueryCountTest(AdminChangelistMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running BoardAdminQueryCountTest
+
+        User Fields :
+            admin           : superuser
+            test_user_0 ~ 9 : board creators
+
+        Board Fields :
+            path : board0 ~ board9
+        """
+        cls.admin = User.objects.create_superuser(username="admin", password="admin")
+        for index in range(10):
+            user = User.objects.create_user(username=f"test_user_{index}")
+            Board.objects.create(
+                name=f"board{index}", path=f"board{index}", create_user=user
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_board_changelist(self):
+        """BoardAdmin changelist query count test
+        Check create_user and post_count columns don't query per row
+        """
+        self.assertConstantQueries(Board)
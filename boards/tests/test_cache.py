@@ -0,0 +1,133 @@
+from django.core.cache import cache
+from django.http import Http404
+from common.testing import TestCase
+from boards.cache import BoardCache, get_board_or_404
+from boards.models import Board
+from users.models import User
+
+
+class BoardCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running BoardCacheTest
+
+        Board Fields :
+            name        : test
+            path        : test
+            create_user : test_user_1
+        """
+        user = User.objects.create_user(username="test_user_1")
+        Board.objects.create(name="test", path="test", create_user=user)
+
+    def setUp(self):
+        """Run every test function
+        Clear shared cache and create two caches acting as separate workers
+        """
+        cache.clear()
+        self.worker_1 = BoardCache(local_timeout=60)
+        self.worker_2 = BoardCache(local_timeout=60)
+
+    def test_get_board_read_through(self):
+        """BoardCache get method test
+        Check database is queried once and shared with other worker
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(self.worker_1.get("test").name, "test")
+            self.assertEqual(self.worker_1.get("test").name, "test")
+            self.assertEqual(self.worker_2.get("test").name, "test")
+
+    def test_get_board_negative_cache(self):
+        """BoardCache negative cache test
+        Check unknown path raises DoesNotExist and is queried only once
+        """
+        with self.assertNumQueries(1):
+            for worker in (self.worker_1, self.worker_2, self.worker_1):
+                with self.assertRaises(Board.DoesNotExist):
+                    worker.get("unknown")
+
+    def test_board_save_invalidate(self):
+        """BoardCache invalidation test
+        Check saved board is reloaded by every worker after local_timeout
+        """
+        self.worker_1.get("test")
+        self.worker_2.get("test")
+
+        board = Board.objects.get(path="test")
+        board.name = "renamed"
+        board.save()
+
+        self.assertEqual(self.worker_2.get("test").name, "test")
+        self.worker_2.local_timeout = 0
+        self.assertEqual(self.worker_2.get("test").name, "renamed")
+
+    def test_board_create_invalidate_negative_cache(self):
+        """BoardCache negative cache invalidation test
+        Check newly created board replaces cached unknown path
+        """
+        with self.assertRaises(Board.DoesNotExist):
+            self.worker_1.get("new")
+
+        Board.objects.create(name="new", path="new", create_user=User.objects.get(id=1))
+        self.worker_1.local_timeout = 0
+        self.assertEqual(self.worker_1.get("new").name, "new")
+
+    def test_board_delete_invalidate(self):
+        """BoardCache delete invalidation test
+        Check deleted board isn't returned from cache
+        """
+        self.worker_1.get("test")
+        Board.objects.filter(path="test").delete()
+        self.worker_1.local_timeout = 0
+
+        with self.assertRaises(Board.DoesNotExist):
+            self.worker_1.get("test")
+
+    def test_board_save_invalidate_path(self):
+        """BoardCache path invalidation test
+        Check saving a board keeps other boards cached
+        """
+        other = Board.objects.create(
+            name="other", path="other", create_user=User.objects.get(id=1)
+        )
+        self.worker_1.get("test")
+        self.worker_1.get("other")
+
+        other.name = "renamed"
+        other.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.worker_2.get("test").name, "test")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.worker_2.get("other").name, "renamed")
+
+    def test_board_save_late_set(self):
+        """BoardCache late set test
+        Check a board loaded before a save and cached after it is never returned
+        """
+        version = self.worker_1.current_version("test")
+        stale = Board.objects.get(path="test")
+        board = Board.objects.get(path="test")
+        board.name = "renamed"
+        board.save()
+
+        # A reader which missed before the save caches the old row after it
+        cache.set(f"boards:{version}:test", stale, None)
+        self.assertEqual(self.worker_2.get("test").name, "renamed")
+
+    def test_local_cache_size(self):
+        """BoardCache local size test
+        Check process-local entries are bounded by local_size
+        """
+        board_cache = BoardCache(local_size=2)
+        for path in ("a", "b", "c"):
+            with self.assertRaises(Board.DoesNotExist):
+                board_cache.get(path)
+
+        self.assertEqual(list(board_cache.local), ["b", "c"])
+
+    def test_get_board_or_404(self):
+        """get_board_or_404 function test
+        Check unknown path raises Http404
+        """
+        with self.assertRaises(Http404):
+            get_board_or_404("unknown")
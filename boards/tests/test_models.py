@@ -1,11 +1,16 @@
-from django.test import TestCase
+from io import StringIO
 from django.db import IntegrityError
+from django.core.management import call_command
+from common.testing import TestCase
 from boards.models import Board
+from posts.models import Post
 from users.models import User
 from common.models import Permission
 
 
 class BoardModelTest(TestCase):
+    board_path = "test"
+
     @classmethod
     def setUpTestData(cls):
         """Run only once when running BoardModelTest
@@ -100,12 +105,90 @@ class BoardModelTest(TestCase):
 
         self.assertEqual(board.path, "test")
 
-    def test_board_post_count_method(self):
-        """Board model post_count method test
-        Check test board's post_count method return 0
+    def test_board_post_count_default(self):
+        """Board model post_count field default test
+        Check test board's post_count field is 0
+        """
+        board = Board.objects.get(name="test")
+        self.assertEqual(board.post_count, 0)
+
+    def test_board_post_count_create_and_delete(self):
+        """Board model post_count field maintenance test
+        Check post_count increase on post creation and decrease on post deletion
+        """
+        board = Board.objects.get(name="test")
+        user = User.objects.get(id=1)
+
+        post = Post.objects.create(
+            create_user=user, board=board, title="title", content="content"
+        )
+        Post.objects.create(
+            create_user=user, board=board, title="title", content="content"
+        )
+        board.refresh_from_db()
+        self.assertEqual(board.post_count, 2)
+
+        post.delete()
+        board.refresh_from_db()
+        self.assertEqual(board.post_count, 1)
+
+        Post.objects.filter(board=board).delete()
+        board.refresh_from_db()
+        self.assertEqual(board.post_count, 0)
+
+    def test_board_post_count_move_post(self):
+        """Board model post_count field maintenance test
+        Check post_count moved when post's board changed
+        """
+        board = Board.objects.get(name="test")
+        other_board = Board.objects.get(name="test2")
+        user = User.objects.get(id=1)
+
+        post = Post.objects.create(
+            create_user=user, board=board, title="title", content="content"
+        )
+        post = Post.objects.get(pk=post.pk)
+        post.board = other_board
+        post.save()
+
+        board.refresh_from_db()
+        other_board.refresh_from_db()
+        self.assertEqual(board.post_count, 0)
+        self.assertEqual(other_board.post_count, 1)
+
+    def test_board_save_keep_post_count(self):
+        """Board model save method test
+        Check saving stale board instance doesn't overwrite post_count
         """
         board = Board.objects.get(name="test")
-        self.assertEqual(board.post_count(), 0)
+        user = User.objects.get(id=1)
+
+        Post.objects.create(
+            create_user=user, board=board, title="title", content="content"
+        )
+        board.name = "renamed"
+        board.save()
+
+        board.refresh_from_db()
+        self.assertEqual(board.name, "renamed")
+        self.assertEqual(board.post_count, 1)
+
+    def test_recount_posts_command(self):
+        """recount_posts management command test
+        Check drifted post_count is rebuilt from posts table
+        """
+        board = Board.objects.get(name="test")
+        user = User.objects.get(id=1)
+
+        Post.objects.create(
+            create_user=user, board=board, title="title", content="content"
+        )
+        Board.objects.update(post_count=10)
+
+        call_command("recount_posts", stdout=StringIO())
+
+        self.assertEqual(Board.objects.get(name="test").post_count, 1)
+        self.assertEqual(Board.objects.get(name="test2").post_count, 0)
 
     def test_create_user_related_name(self):
         """Board model create_user field related_name test
@@ -1 +1 @@
-from django.test import TestCase
+from common.testing import TestCase
@@ -1 +1,27 @@
 from django.contrib import admin
+from comments.models import Comment
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    """Register Comment model at admin panel
+    Inherit:
+        admin.ModelAdmin
+    Fields:
+        list_display        : Fields visible in Comment object list
+        list_select_related : Foreign keys joined into the list query
+        raw_id_fields       : Foreign keys edited by id instead of select box
+    """
+
+    list_display = (
+        "__str__",
+        "post",
+        "create_user",
+        "depth",
+        "created_at",
+        "updated_at",
+    )
+
+    list_select_related = ("post", "create_user")
+
+    raw_id_fields = ("post", "create_user", "parent")
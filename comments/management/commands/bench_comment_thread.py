@@ -0,0 +1,94 @@
+import json
+from random import Random
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from boards.models import Board
+from comments.models import MAX_DEPTH, Comment, path_segment
+from comments.views import COMMENT_THREAD_FIELDS
+from common.benchmark import format_stats, measure, rollback
+from posts.models import Post
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Benchmark rendering a large comment thread
+    Compare one ordered materialized path query with a naive recursive
+    adjacency list walk (one query per comment). Fixtures are rolled back.
+    """
+
+    help = "Benchmark rendering a post's comment thread"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--naive-repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with rollback():
+            post = self.seed(options["comments"], Random(options["seed"]))
+
+            def materialized_path():
+                comments = Comment.objects.thread(post).values(*COMMENT_THREAD_FIELDS)
+                return json.dumps(list(comments), cls=DjangoJSONEncoder)
+
+            def adjacency_list():
+                def walk(parent_id, rendered):
+                    children = Comment.objects.filter(
+                        post=post, parent_id=parent_id
+                    ).order_by("pk")
+                    for comment in children.values(*COMMENT_THREAD_FIELDS):
+                        rendered.append(comment)
+                        walk(comment["id"], rendered)
+                    return rendered
+
+                return json.dumps(walk(None, []), cls=DjangoJSONEncoder)
+
+            results = {
+                "materialized path thread": measure(
+                    materialized_path, options["repeat"]
+                ),
+                "recursive adjacency list": measure(
+                    adjacency_list, options["naive_repeat"]
+                ),
+            }
+
+        self.stdout.write(f"Rendered thread of {options['comments']} comments")
+        for label, stats in results.items():
+            self.stdout.write(format_stats(label, stats))
+
+    def seed(self, count, random):
+        user = User.objects.create_user(username="bench_comment_user")
+        board = Board.objects.create(
+            name="bench", path="benchcomment", create_user=user
+        )
+        post = Post.objects.create(
+            create_user=user, board=board, title="bench", content=""
+        )
+
+        next_pk = (Comment.objects.aggregate(pk=Max("pk"))["pk"] or 0) + 1
+        comments = []
+        for pk in range(next_pk, next_pk + count):
+            parent = None
+            # Replies prefer recent comments, a third starts a new top level thread
+            if comments and random.random() > 0.3:
+                parent = comments[-1 - int(random.expovariate(0.05)) % len(comments)]
+                if parent.depth >= MAX_DEPTH:
+                    parent = None
+
+            comments.append(
+                Comment(
+                    pk=pk,
+                    post=post,
+                    create_user=user,
+                    parent=parent,
+                    depth=parent.depth + 1 if parent else 0,
+                    path=(parent.path if parent else "") + path_segment(pk),
+                    content=f"comment {pk}",
+                )
+            )
+
+        Comment.objects.bulk_create(comments, batch_size=2000)
+        Post.objects.filter(pk=post.pk).update(comment_count=count)
+        return post
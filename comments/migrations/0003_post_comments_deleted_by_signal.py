@@ -0,0 +1,20 @@
+# Generated by Django 3.1 on 2026-10-18 08:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_viewers'),
+        ('comments', '0002_cross_database_relations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='comments', to='posts.post'),
+        ),
+    ]
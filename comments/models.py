@@ -1 +1,112 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from common.models import AbstractTimeStamp
+from common.routers import post_shard
+from posts.models import Post
+
+PATH_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+PATH_SEGMENT_LENGTH = 8
+PATH_SEPARATOR = "/"
+MAX_DEPTH = 27
+
+
+def path_segment(pk):
+    """Return fixed width base36 segment so paths sort in thread order"""
+    segment = ""
+    while pk:
+        pk, digit = divmod(pk, len(PATH_DIGITS))
+        segment = PATH_DIGITS[digit] + segment
+    return segment.rjust(PATH_SEGMENT_LENGTH, "0") + PATH_SEPARATOR
+
+
+class CommentQuerySet(models.QuerySet):
+    def thread(self, post):
+        """Return every comment of post in thread (depth first) order"""
+        return self.filter(post=post).order_by("path")
+
+    def subtree(self, comment):
+        """Return comment and its replies in thread order
+        Descendant paths are in [path, path with "/" replaced by "0"),
+        so the lookup is an index range scan instead of LIKE.
+        """
+        upper = comment.path[:-1] + chr(ord(PATH_SEPARATOR) + 1)
+        return self.filter(
+            post_id=comment.post_id, path__gte=comment.path, path__lt=upper
+        ).order_by("path")
+
+
+class Comment(AbstractTimeStamp):
+    """Threaded Comment Model
+    Inherit:
+        AbstractTimeStamp
+    Fields:
+        post        : Post model (1:N)
+        create_user : User model (1:N)
+        parent      : Comment model (1:N, Nullable)
+        path        : CharField (Materialized path of ancestors and itself)
+        depth       : PositiveSmallIntegerField (0 for top level comment)
+        content     : TextField
+    Methods:
+        __str__     : Return comment's content
+        save        : Set path and depth, increase post's comment_count
+    Meta:
+        db_table    : comments
+        indexes     : post, path (Thread and subtree listing)
+    """
+
+    # Posts may live in shards (common.routers), where deletion's collector
+    # would look for comments, so comments.signals deletes them instead
+    post = models.ForeignKey(
+        "posts.Post",
+        related_name="comments",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    create_user = models.ForeignKey(
+        "users.User", related_name="comments", on_delete=models.CASCADE
+    )
+    parent = models.ForeignKey(
+        "self",
+        related_name="replies",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    path = models.CharField(
+        max_length=(PATH_SEGMENT_LENGTH + 1) * (MAX_DEPTH + 1), editable=False
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    content = models.TextField()
+
+    objects = CommentQuerySet.as_manager()
+
+    def __str__(self):
+        return self.content
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        parent_path = ""
+        if self.parent_id is not None:
+            parent = self.parent
+            if parent.post_id != self.post_id:
+                raise ValidationError("Reply must belong to the parent's post")
+            if parent.depth >= MAX_DEPTH:
+                raise ValidationError(f"Replies can't be nested over {MAX_DEPTH}")
+            parent_path = parent.path
+            self.depth = parent.depth + 1
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            self.path = parent_path + path_segment(self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+            Post.objects.using(post_shard(self.post_id)).filter(pk=self.post_id).update(
+                comment_count=models.F("comment_count") + 1
+            )
+
+    class Meta:
+        db_table = "comments"
+        indexes = [models.Index(fields=["post", "path"], name="comments_post_path_idx")]
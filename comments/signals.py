@@ -0,0 +1,23 @@
+from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from comments.models import Comment
+from common.routers import post_shard
+from posts.models import Post
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_comments(sender, instance, **kwargs):
+    """Delete deleted post's comments, which stay in default database"""
+    Comment.objects.filter(post_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_post_comment_count(sender, instance, **kwargs):
+    """Decrease deleted comment's post comment_count
+    Cascaded replies send their own post_delete signal
+    """
+    posts = Post.objects.using(post_shard(instance.post_id))
+    posts.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=models.F("comment_count") - 1
+    )
@@ -1 +1,145 @@
-from django.test import TestCase
+from django.core.exceptions import ValidationError
+from common.testing import TestCase
+from boards.models import Board
+from comments.models import MAX_DEPTH, Comment, path_segment
+from posts.models import Post
+from users.models import User
+
+
+class CommentModelTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running CommentModelTest
+
+        Post Fields :
+            title : test title, other title
+
+        Comment Fields (test title) :
+            first          : top level
+                first-1    : reply of first
+                    first-1-1 : reply of first-1
+                first-2    : reply of first
+            second         : top level
+        """
+        user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=user)
+        post = Post.objects.create(
+            create_user=user, board=board, title="test title", content=""
+        )
+        Post.objects.create(
+            create_user=user, board=board, title="other title", content=""
+        )
+
+        def create(content, parent=None):
+            return Comment.objects.create(
+                post=post, create_user=user, parent=parent, content=content
+            )
+
+        first = create("first")
+        create("second")
+        first_1 = create("first-1", first)
+        create("first-2", first)
+        create("first-1-1", first_1)
+
+    def contents(self, queryset):
+        return [comment.content for comment in queryset]
+
+    def test_comment_str_method(self):
+        """Comment model __str__ method test
+        Check str method return comment's content
+        """
+        comment = Comment.objects.get(content="first")
+        self.assertEqual(str(comment), "first")
+
+    def test_comment_path_and_depth(self):
+        """Comment model save method test
+        Check path contains ancestors' segments and depth counts them
+        """
+        first = Comment.objects.get(content="first")
+        first_1 = Comment.objects.get(content="first-1")
+        first_1_1 = Comment.objects.get(content="first-1-1")
+
+        self.assertEqual(first.path, path_segment(first.pk))
+        self.assertEqual(first_1_1.path, first_1.path + path_segment(first_1_1.pk))
+        self.assertEqual([first.depth, first_1.depth, first_1_1.depth], [0, 1, 2])
+
+    def test_comment_thread_order(self):
+        """Comment queryset thread method test
+        Check whole thread is loaded depth first in one query
+        """
+        post = Post.objects.get(title="test title")
+
+        with self.assertNumQueries(1):
+            contents = self.contents(Comment.objects.thread(post))
+
+        self.assertEqual(
+            contents, ["first", "first-1", "first-1-1", "first-2", "second"]
+        )
+
+    def test_comment_subtree(self):
+        """Comment queryset subtree method test
+        Check subtree contains only the comment and its replies
+        """
+        first = Comment.objects.get(content="first")
+        first_1 = Comment.objects.get(content="first-1")
+
+        self.assertEqual(
+            self.contents(Comment.objects.subtree(first)),
+            ["first", "first-1", "first-1-1", "first-2"],
+        )
+        self.assertEqual(
+            self.contents(Comment.objects.subtree(first_1)), ["first-1", "first-1-1"]
+        )
+
+    def test_post_comment_count(self):
+        """Post model comment_count field maintenance test
+        Check count increases on creation and decreases with cascaded replies
+        """
+        post = Post.objects.get(title="test title")
+        self.assertEqual(post.comment_count, 5)
+
+        Comment.objects.get(content="first").delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+    def test_post_save_keep_comment_count(self):
+        """Post model save method test
+        Check saving stale post instance doesn't overwrite comment_count
+        """
+        post = Post.objects.get(title="test title")
+        Comment.objects.create(post=post, create_user=post.create_user, content="new")
+
+        post.title = "renamed"
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 6)
+
+    def test_reply_other_post(self):
+        """Comment model save method validation test
+        Check reply to other post's comment raises ValidationError
+        """
+        other = Post.objects.get(title="other title")
+        first = Comment.objects.get(content="first")
+
+        with self.assertRaises(ValidationError):
+            Comment.objects.create(
+                post=other, create_user=other.create_user, parent=first, content="x"
+            )
+
+    def test_reply_max_depth(self):
+        """Comment model save method depth limit test
+        Check reply over MAX_DEPTH raises ValidationError
+        """
+        parent = Comment.objects.get(content="second")
+        for _ in range(MAX_DEPTH):
+            parent = Comment.objects.create(
+                post=parent.post, create_user=parent.create_user, parent=parent
+            )
+
+        with self.assertRaises(ValidationError):
+            Comment.objects.create(
+                post=parent.post, create_user=parent.create_user, parent=parent
+            )
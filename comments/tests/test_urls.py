@@ -1 +1,14 @@
-from django.test import TestCase
+from django.urls import resolve, reverse
+from common.testing import TestCase
+from comments import views
+
+
+class CommentUrlTest(TestCase):
+    def test_comment_thread_url(self):
+        """comment_thread url test
+        Check post id is routed to comment_thread view
+        """
+        url = reverse("comments:thread", args=[1])
+
+        self.assertEqual(url, "/comments/1/")
+        self.assertEqual(resolve(url).func, views.comment_thread)
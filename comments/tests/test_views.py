@@ -1 +1,91 @@
-from django.test import TestCase
+from unittest.mock import patch
+from django.urls import reverse
+from common.testing import TestCase
+from boards.models import Board
+from comments.models import Comment
+from posts.models import Post
+from posts.unique_views import unique_views
+from users.models import User
+
+
+class CommentThreadViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running CommentThreadViewTest
+
+        Comment Fields :
+            root            : top level
+                reply 0 ~ 2 : replies of root
+            other           : top level
+        """
+        user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=user)
+        cls.post = Post.objects.create(
+            create_user=user, board=board, title="test title", content=""
+        )
+        cls.root = Comment.objects.create(
+            post=cls.post, create_user=user, content="root"
+        )
+        for index in range(3):
+            Comment.objects.create(
+                post=cls.post,
+                create_user=user,
+                parent=cls.root,
+                content=f"reply {index}",
+            )
+        Comment.objects.create(post=cls.post, create_user=user, content="other")
+
+        cls.url = reverse("comments:thread", args=[cls.post.pk])
+
+    def tearDown(self):
+        unique_views.drain()
+
+    def contents(self, response):
+        return [comment["content"] for comment in response.json()["results"]]
+
+    def test_comment_thread(self):
+        """comment_thread view test
+        Check thread is returned in depth first order with depth
+        """
+        response = self.client.get(self.url)
+        results = response.json()["results"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.contents(response), ["root", "reply 0", "reply 1", "reply 2", "other"]
+        )
+        self.assertEqual([comment["depth"] for comment in results], [0, 1, 1, 1, 0])
+
+    def test_comment_subtree(self):
+        """comment_thread view root test
+        Check root param returns only root's subtree
+        """
+        response = self.client.get(self.url, {"root": self.root.pk})
+        self.assertEqual(
+            self.contents(response), ["root", "reply 0", "reply 1", "reply 2"]
+        )
+
+    def test_comment_thread_pagination(self):
+        """comment_thread view pagination test
+        Check next cursor continues thread order
+        """
+        with patch("comments.views.COMMENT_THREAD_PAGE_SIZE", 2):
+            first = self.client.get(self.url)
+            second = self.client.get(self.url, {"cursor": first.json()["next"]})
+
+        self.assertEqual(self.contents(first), ["root", "reply 0"])
+        self.assertEqual(self.contents(second), ["reply 1", "reply 2"])
+
+    def test_comment_thread_invalid_root(self):
+        """comment_thread view invalid root test
+        Check non numeric root returns 400 and unknown root returns 404
+        """
+        self.assertEqual(self.client.get(self.url, {"root": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"root": 0}).status_code, 404)
+
+    def test_comment_thread_unknown_post(self):
+        """comment_thread view unknown post test
+        Check unknown post returns 404
+        """
+        response = self.client.get(reverse("comments:thread", args=[0]))
+        self.assertEqual(response.status_code, 404)
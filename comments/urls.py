@@ -0,0 +1,8 @@
+from django.urls import path
+from comments import views
+
+app_name = "comments"
+
+urlpatterns = [
+    path("<int:post_id>/", views.comment_thread, name="thread"),
+]
@@ -1 +1,72 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+from comments.models import Comment
+from common.executor import async_view
+from common.pagination import CursorPaginator, InvalidCursor
+from common.routers import post_shard, replica_reads, use_shard
+from posts.models import Post
+from posts.unique_views import unique_views, viewer_key
+
+COMMENT_THREAD_PAGE_SIZE = 200
+COMMENT_THREAD_FIELDS = (
+    "id",
+    "parent",
+    "create_user",
+    "depth",
+    "path",
+    "content",
+    "created_at",
+)
+
+
+@async_view
+@require_GET
+@replica_reads()
+def comment_thread(request, post_id):
+    """Post's comments in thread order with depth, paginated by cursor
+    Counts the request as a view of the post and its board.
+    Query Params:
+        root   : Comment id to return only its subtree
+        cursor : Opaque cursor from previous response's next or previous
+    Response:
+        results  : Comment list in depth first order
+        next     : Cursor of following comments or null
+        previous : Cursor of preceding comments or null
+        views    : Estimated unique viewers of the post
+    """
+    with use_shard(post_shard(post_id)):
+        post = get_object_or_404(
+            Post.objects.only("pk", "board", "viewers"), pk=post_id
+        )
+    unique_views.record(post.pk, post.board_id, viewer_key(request))
+
+    root_id = request.GET.get("root")
+    if root_id is not None and not root_id.isdigit():
+        return JsonResponse({"message": "root must be a comment id"}, status=400)
+
+    if root_id is None:
+        queryset = Comment.objects.thread(post)
+    else:
+        root = get_object_or_404(
+            Comment.objects.only("post_id", "path"), pk=root_id, post=post
+        )
+        queryset = Comment.objects.subtree(root)
+
+    paginator = CursorPaginator(
+        queryset.values(*COMMENT_THREAD_FIELDS), ("path",), COMMENT_THREAD_PAGE_SIZE
+    )
+
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor as error:
+        return JsonResponse({"message": str(error)}, status=400)
+
+    return JsonResponse(
+        {
+            "results": page.items,
+            "next": page.next,
+            "previous": page.previous,
+            "views": post.unique_views(),
+        }
+    )
@@ -0,0 +1,11 @@
+from common.pagination import EstimatedCountPaginator
+
+
+class EstimatedCountAdminMixin:
+    """ModelAdmin mixin switching changelist to estimated counts
+    Uses EstimatedCountPaginator and skips the second unfiltered
+    COUNT(*) which the changelist runs for filtered results.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+from statistics import mean
+from time import perf_counter
+import json
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+def measure(func, repeat=100):
+    """Call func repeat times and return latency statistics in milliseconds
+    Return:
+        dict with count, mean, p50, p95, p99, max keys
+    """
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        samples.append((perf_counter() - start) * 1000)
+
+    return summarize(samples)
+
+
+def summarize(samples):
+    """Return latency statistics of millisecond samples like measure"""
+    samples = sorted(samples)
+
+    def percentile(rate):
+        return samples[min(len(samples) - 1, int(len(samples) * rate))]
+
+    return {
+        "count": len(samples),
+        "mean": mean(samples),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": samples[-1],
+    }
+
+
+def count_queries(func, using="default"):
+    """Call func once and return executed query count"""
+    with CaptureQueriesContext(connections[using]) as context:
+        func()
+    return len(context.captured_queries)
+
+
+def format_stats(label, stats):
+    return (
+        f"{label:<32} mean {stats['mean']:8.3f}ms  p50 {stats['p50']:8.3f}ms  "
+        f"p95 {stats['p95']:8.3f}ms  p99 {stats['p99']:8.3f}ms"
+    )
+
+
+@contextmanager
+def rollback(using=None):
+    """Run benchmark fixtures inside a transaction that is always rolled back"""
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep given created_at values instead of auto_now_add"""
+    fields = [model._meta.get_field("created_at") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def write_results(path, results):
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(results, stream, indent=2, sort_keys=True)
+        stream.write("\n")
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as stream:
+        return json.load(stream)
+
+
+def compare_results(results, baseline, tolerance=0.2, min_delta=0.5, metric="p95"):
+    """Compare benchmark results with baseline results of the same labels
+    A label regresses when its metric latency grows by more than tolerance
+    (0.2 = 20%) and min_delta milliseconds, so jitter of sub-millisecond
+    paths is ignored, or when it runs more queries than the baseline.
+    Return list of regression messages.
+    """
+    regressions = []
+    for label, stats in results.items():
+        base = baseline.get(label)
+        if base is None:
+            continue
+
+        limit = max(base[metric] * (1 + tolerance), base[metric] + min_delta)
+        if stats[metric] > limit:
+            regressions.append(
+                f"{label}: {metric} {stats[metric]:.3f}ms > "
+                f"baseline {base[metric]:.3f}ms limit {limit:.3f}ms"
+            )
+        if stats.get("queries", 0) > base.get("queries", 0):
+            regressions.append(
+                f"{label}: {stats['queries']} queries > "
+                f"baseline {base.get('queries', 0)} queries"
+            )
+
+    return regressions
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from functools import partial, wraps
+import asyncio
+import os
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+ORM_THREADS = int(os.environ.get("ORM_THREADS", 16))
+
+orm_executor = ThreadPoolExecutor(max_workers=ORM_THREADS, thread_name_prefix="orm")
+# Set by orm_pool_application for requests served on a native event loop
+_use_orm_executor = ContextVar("use_orm_executor", default=False)
+
+
+def _run_and_close(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Like request_finished, close connections unless CONN_MAX_AGE keeps them
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run blocking func (ORM queries, file I/O) without blocking the event loop
+    In requests of orm_pool_application (config.asgi) func runs in
+    orm_executor, so at most ORM_THREADS database connections are used
+    however many requests are awaiting. Context variables (database routing,
+    query metrics) are copied into the thread.
+    Elsewhere (WSGI, test client, async_to_sync) func runs thread sensitive,
+    in the blocked calling thread with its connections and transactions.
+    """
+    if not _use_orm_executor.get():
+        return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+
+    context = copy_context()
+    return await asyncio.get_event_loop().run_in_executor(
+        orm_executor, partial(context.run, _run_and_close, func, args, kwargs)
+    )
+
+
+def orm_pool_application(application):
+    """Wrap ASGI application so run_sync uses orm_executor in its requests"""
+
+    @wraps(application)
+    async def wrapper(scope, receive, send):
+        token = _use_orm_executor.set(True)
+        try:
+            return await application(scope, receive, send)
+        finally:
+            _use_orm_executor.reset(token)
+
+    return wrapper
+
+
+def async_view(view):
+    """Turn sync view into an async view running it with run_sync"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_sync(view, request, *args, **kwargs)
+
+    return wrapper
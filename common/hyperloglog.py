@@ -0,0 +1,134 @@
+from hashlib import blake2b
+from math import log, sqrt
+import struct
+import zlib
+
+FORMAT_VERSION = 1
+SPARSE = 0
+DENSE = 1
+# Inverse powers of two by register value, summed by every estimate
+INVERSE_POWERS = [2.0**-rank for rank in range(65)]
+
+
+def hash64(value):
+    """Return 64 bit hash of value's string form, stable across processes"""
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter
+    Each hash sets one of 2 ** precision registers to the highest position
+    of its first one bit. count estimates the distinct values added with a
+    standard error of 1.04 / sqrt(2 ** precision), 1.6% for precision 12,
+    and merging sketches counts the union of their values.
+    Small sketches keep only set registers in a dict and serialize to 3
+    bytes per register, larger ones a bytearray serialized with zlib.
+
+    Fields:
+        precision      : Register index bits (4 ~ 16)
+    Methods:
+        add            : Add value (hashed with hash64)
+        add_hash       : Add 64 bit hash
+        merge          : Add every value of other sketch of the same precision
+        count          : Return estimated distinct value count
+        standard_error : Return relative standard error of count
+        to_bytes       : Return compact binary form
+        from_bytes     : Return sketch of to_bytes result (classmethod)
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        self.sparse = {}
+        self.registers = None
+
+    def add(self, value):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed):
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+
+        registers = self.registers
+        if registers is not None:
+            if rank > registers[index]:
+                registers[index] = rank
+        elif rank > self.sparse.get(index, 0):
+            self.sparse[index] = rank
+            if len(self.sparse) > self.size // 32:
+                self.densify()
+
+    def densify(self):
+        if self.registers is None:
+            self.registers = bytearray(self.size)
+            for index, rank in self.sparse.items():
+                self.registers[index] = rank
+            self.sparse = {}
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Only sketches of the same precision merge")
+
+        if other.registers is None:
+            for index, rank in other.sparse.items():
+                if self.registers is not None:
+                    if rank > self.registers[index]:
+                        self.registers[index] = rank
+                elif rank > self.sparse.get(index, 0):
+                    self.sparse[index] = rank
+            if self.registers is None and len(self.sparse) > self.size // 32:
+                self.densify()
+        else:
+            self.densify()
+            self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        size = self.size
+        if self.registers is None:
+            zeros = size - len(self.sparse)
+            total = zeros + sum(INVERSE_POWERS[rank] for rank in self.sparse.values())
+        else:
+            zeros = self.registers.count(0)
+            total = sum(INVERSE_POWERS[rank] for rank in self.registers)
+
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / total
+        # Linear counting is more accurate while many registers are unset
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * log(size / zeros)
+        return round(estimate)
+
+    def standard_error(self):
+        return 1.04 / sqrt(self.size)
+
+    def to_bytes(self):
+        header = bytes([FORMAT_VERSION, self.precision])
+        if self.registers is None:
+            return (
+                header
+                + bytes([SPARSE])
+                + b"".join(
+                    struct.pack(">HB", index, rank)
+                    for index, rank in sorted(self.sparse.items())
+                )
+            )
+        return header + bytes([DENSE]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        version, precision, kind = data[:3]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unknown HyperLogLog format {version}")
+
+        sketch = cls(precision)
+        if kind == SPARSE:
+            sketch.sparse = {
+                index: rank for index, rank in struct.iter_unpack(">HB", data[3:])
+            }
+        else:
+            sketch.registers = bytearray(zlib.decompress(data[3:]))
+        return sketch
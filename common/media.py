@@ -0,0 +1,127 @@
+from mimetypes import guess_type
+from urllib.parse import quote
+import os
+import re
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from common.storage import content_digest
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Legacy names may get new content, clients revalidate them with the ETag
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Return (start, end) of single "bytes=" Range header, end inclusive
+    Return:
+        None to ignore the header (absent, malformed or several ranges),
+        False when the range is unsatisfiable
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if not length or not size:
+            return False
+        return max(size - length, 0), size - 1
+
+    start, end = int(start), int(end) if end else None
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        return False
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        while length > 0:
+            chunk = stream.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, name, immutable=None, storage=None):
+    """Return response of stored file name for GET and HEAD requests
+    Content-addressed names (or immutable=True) are cached for a year with
+    their hash as strong ETag, other names are revalidated by modified time
+    and size. Conditional requests get 304 or 412.
+    With MEDIA_SERVER "nginx" the body is left to X-Accel-Redirect under
+    MEDIA_ACCEL_PREFIX, with "sendfile" to X-Sendfile, and the front server
+    also answers Range requests. Otherwise Django serves one byte range.
+    Names with dot-prefixed segments, such as temporary uploads, are 404.
+    """
+    if any(part.startswith(".") for part in re.split(r"[/\\]", name)):
+        raise Http404
+
+    storage = storage or default_storage
+    path = storage.path(name)
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    digest = content_digest(name)
+    if immutable is None:
+        immutable = digest is not None
+    etag = f'"{digest or f"{stat.st_mtime_ns:x}-{stat.st_size:x}"}"'
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        ),
+        "Accept-Ranges": "bytes",
+    }
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    content_type = guess_type(name)[0] or "application/octet-stream"
+    server = getattr(settings, "MEDIA_SERVER", "")
+    if server:
+        response = HttpResponse(content_type=content_type)
+        if server == "nginx":
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+        else:
+            response["X-Sendfile"] = path
+    else:
+        byte_range = None
+        if request.META.get("HTTP_IF_RANGE", etag) == etag:
+            byte_range = parse_range(request.META.get("HTTP_RANGE", ""), stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416, content_type=content_type)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range is not None:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(path, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = end - start + 1
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,112 @@
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+import os
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5))
+
+
+class ViewMetrics:
+    """Aggregated metrics of one view
+    Fields:
+        buckets         : Request count per duration bucket (not cumulative)
+        duration        : Sum of request durations in seconds
+        queries         : Sum of executed queries
+        db_time         : Sum of query durations in seconds
+        duplicates      : Sum of queries repeating an earlier SQL of the request
+        n_plus_one      : Requests which repeated one SQL N_PLUS_ONE_THRESHOLD times
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(REQUEST_DURATION_BUCKETS) + 1)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.duplicates = 0
+        self.n_plus_one = 0
+
+
+class MetricsRegistry:
+    """In-process registry of per view request metrics
+    Every worker process keeps its own registry, Prometheus scrapes each
+    worker (or sums them) like any multi process exporter.
+
+    Methods:
+        observe : Add one request's metrics to its view
+        render  : Return metrics in Prometheus text exposition format
+        clear   : Drop every collected metric
+    """
+
+    def __init__(self):
+        self.views = defaultdict(ViewMetrics)
+        self.lock = Lock()
+
+    def observe(self, view, duration, queries, db_time, duplicates, n_plus_one):
+        bucket = bisect_left(REQUEST_DURATION_BUCKETS, duration)
+        with self.lock:
+            metrics = self.views[view]
+            metrics.buckets[bucket] += 1
+            metrics.duration += duration
+            metrics.queries += queries
+            metrics.db_time += db_time
+            metrics.duplicates += duplicates
+            metrics.n_plus_one += int(n_plus_one)
+
+    def clear(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self):
+        with self.lock:
+            views = sorted(
+                (view, list(metrics.buckets), dict(vars(metrics)))
+                for view, metrics in self.views.items()
+            )
+
+        lines = [
+            "# HELP django_request_duration_seconds Request duration by view",
+            "# TYPE django_request_duration_seconds histogram",
+        ]
+        for view, buckets, metrics in views:
+            label = f'view="{escape_label(view)}"'
+            total = 0
+            for bound, count in zip(REQUEST_DURATION_BUCKETS + ("+Inf",), buckets):
+                total += count
+                lines.append(
+                    f'django_request_duration_seconds_bucket{{{label},le="{bound}"}} '
+                    f"{total}"
+                )
+            lines.append(
+                f"django_request_duration_seconds_sum{{{label}}} {metrics['duration']}"
+            )
+            lines.append(f"django_request_duration_seconds_count{{{label}}} {total}")
+
+        counters = (
+            ("django_request_queries_total", "queries", "Executed SQL queries"),
+            ("django_request_db_seconds_total", "db_time", "Time spent in SQL"),
+            (
+                "django_request_duplicate_queries_total",
+                "duplicates",
+                "Queries repeating an earlier SQL of the same request",
+            ),
+            (
+                "django_request_n_plus_one_total",
+                "n_plus_one",
+                "Requests repeating one SQL at least N_PLUS_ONE_THRESHOLD times",
+            ),
+        )
+        for name, field, description in counters:
+            lines.append(f"# HELP {name} {description} by view")
+            lines.append(f"# TYPE {name} counter")
+            for view, _, metrics in views:
+                lines.append(f'{name}{{view="{escape_label(view)}"}} {metrics[field]}')
+
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics_registry = MetricsRegistry()
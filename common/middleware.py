@@ -0,0 +1,205 @@
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+import asyncio
+import logging
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from common.executor import run_sync
+from common.metrics import N_PLUS_ONE_THRESHOLD, metrics_registry
+from common.routers import read_your_writes
+
+logger = logging.getLogger(__name__)
+
+_recorder = ContextVar("query_recorder", default=None)
+
+
+class HybridMiddleware:
+    """Base of middlewares running sync or async like the handler chain
+    Under ASGI get_response is a coroutine function, then constructing the
+    middleware returns a coroutine function awaiting the instance's __call__,
+    which returns __acall__'s coroutine, and Django awaits it without thread
+    adapters. The instance is the wrapper's middleware attribute.
+
+    Methods:
+        handle    : Process request synchronously (WSGI)
+        __acall__ : Process request asynchronously (ASGI)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __new__(cls, get_response):
+        middleware = super().__new__(cls)
+        if not asyncio.iscoroutinefunction(get_response):
+            return middleware
+
+        # Django's handler awaits coroutine functions, instances never are one
+        middleware.__init__(get_response)
+
+        async def wrapper(request):
+            return await middleware(request)
+
+        wrapper.middleware = middleware
+        return wrapper
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class QueryRecorder:
+    """Database execute wrapper counting a request's queries
+    Only SQL templates and durations are kept, never parameters, so the
+    cost per query is one clock read and one counter increment.
+    """
+
+    def __init__(self):
+        self.statements = Counter()
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.statements[sql] += 1
+
+    @property
+    def queries(self):
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self):
+        return self.queries - len(self.statements)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection passing queries to the request's
+    QueryRecorder, found in a context variable so queries run in thread
+    pools (common.executor.run_sync) are recorded too
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class QueryMetricsMiddleware(HybridMiddleware):
+    """Measure every request's duration, SQL count and SQL time
+    Adds a Server-Timing header (db and total durations), logs a warning
+    when one SQL repeats N_PLUS_ONE_THRESHOLD times (likely N+1 queries)
+    and aggregates everything per view into common.metrics.metrics_registry,
+    which common.views.metrics exposes to Prometheus.
+    Works without DEBUG since queries are recorded by execute wrappers.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Connections opened before connection_created was connected
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def handle(self, request):
+        recorder = QueryRecorder()
+        start = perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.observe(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.observe(request, response, recorder, start)
+
+    def observe(self, request, response, recorder, start):
+        duration = perf_counter() - start
+        view = self.view_name(request)
+        repeated = recorder.statements.most_common(1)
+        n_plus_one = bool(repeated) and repeated[0][1] >= N_PLUS_ONE_THRESHOLD
+
+        if n_plus_one:
+            logger.warning(
+                "Possible N+1 queries in %s: %d times %s",
+                view,
+                repeated[0][1],
+                repeated[0][0][:200],
+            )
+
+        metrics_registry.observe(
+            view,
+            duration,
+            recorder.queries,
+            recorder.db_time,
+            recorder.duplicates,
+            n_plus_one,
+        )
+        response["Server-Timing"] = (
+            f'db;dur={recorder.db_time * 1000:.2f};desc="{recorder.queries} queries", '
+            f"total;dur={duration * 1000:.2f}"
+        )
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<unresolved>"
+        return match.view_name
+
+
+class ReadYourWritesMiddleware(HybridMiddleware):
+    """Keep users who just wrote on the primary database
+    Place it after authentication middlewares. Does nothing without
+    DATABASE_REPLICAS, see common.routers.read_your_writes.
+    """
+
+    @staticmethod
+    def user_id(request):
+        user = getattr(request, "user", None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def handle(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        with read_your_writes(self.user_id(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        # Lazy request.user may query sessions or users
+        user_id = await run_sync(self.user_id, request)
+        with read_your_writes(user_id):
+            return await self.get_response(request)
@@ -0,0 +1,108 @@
+from base64 import b64encode
+from contextlib import contextmanager
+from datetime import datetime
+import json
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+
+class RowEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder keeping microseconds of datetimes
+    Binary values (BinaryField) are written as base64 strings, which
+    BinaryField.to_python decodes on import.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        if isinstance(o, (bytes, memoryview)):
+            return b64encode(o).decode("ascii")
+        return super().default(o)
+
+
+def export_rows(queryset, stream, chunk_size=2000):
+    """Write queryset's rows to stream as newline delimited JSON
+    Rows are read with a chunked iterator (a server-side cursor where the
+    backend supports it) and written one line each, so memory doesn't grow
+    with the table. Every line holds model label and concrete field values.
+    Return written row count.
+    """
+    model = queryset.model
+    label = model._meta.label_lower
+    fields = [field.attname for field in model._meta.concrete_fields]
+    encoder = RowEncoder(ensure_ascii=False)
+
+    count = 0
+    for row in queryset.order_by("pk").values(*fields).iterator(chunk_size):
+        stream.write(encoder.encode({"model": label, "fields": row}) + "\n")
+        count += 1
+
+    return count
+
+
+def read_batches(lines, models, batch_size=1000):
+    """Yield (model, instances) batches from newline delimited JSON lines
+    Consecutive lines of the same model are grouped into batches of at most
+    batch_size unsaved instances. Blank lines are skipped.
+    """
+    models = {model._meta.label_lower: model for model in models}
+    model, batch = None, []
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        try:
+            data = json.loads(line)
+            line_model = models[data["model"]]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Line {number} isn't a row of {', '.join(models)}")
+
+        if batch and (line_model is not model or len(batch) >= batch_size):
+            yield model, batch
+            batch = []
+
+        model = line_model
+        fields = {field.attname: field for field in model._meta.concrete_fields}
+        batch.append(
+            model(
+                **{
+                    name: fields[name].to_python(value)
+                    for name, value in data["fields"].items()
+                    if name in fields
+                }
+            )
+        )
+
+    if batch:
+        yield model, batch
+
+
+@contextmanager
+def preserve_timestamps(*models):
+    """Let bulk_create keep given created_at and updated_at values"""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def reset_sequences(models, using="default"):
+    """Move auto increment sequences past imported primary keys"""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
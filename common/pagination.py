@@ -0,0 +1,244 @@
+from hashlib import md5
+import json
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor can't be decoded or doesn't match the paginator"""
+
+
+class CursorPage:
+    """Single page of CursorPaginator
+    Fields:
+        items    : Page's rows in paginator ordering
+        next     : Cursor of the following page or None
+        previous : Cursor of the preceding page or None
+    """
+
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.items = items
+        self.next = next_cursor
+        self.previous = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class CursorPaginator:
+    """Keyset (seek) paginator
+    Every page is fetched with a range condition on the ordering fields,
+    so deep pages cost the same as the first one when an index covers them.
+    The last ordering field must be unique to make the cursor stable.
+
+    Fields:
+        queryset  : QuerySet or values() QuerySet to paginate
+        ordering  : Ordering field names, all ascending or all descending ("-")
+        page_size : Maximum rows per page
+    Methods:
+        page      : Return CursorPage after cursor (first page when None)
+    """
+
+    salt = "common.pagination.cursor"
+
+    def __init__(self, queryset, ordering, page_size=20):
+        descending = {name.startswith("-") for name in ordering}
+        if len(descending) != 1:
+            raise ValueError("ordering fields must share one direction")
+
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip("-") for name in ordering)
+        self.descending = descending.pop()
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        if cursor is None:
+            direction, values = "next", None
+        else:
+            direction, values = self.decode_cursor(cursor)
+
+        forward = direction == "next"
+        queryset = self.queryset
+
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+
+        if forward:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*self._reversed_ordering())
+
+        items = list(queryset[: self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[: self.page_size]
+
+        if not forward:
+            items.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = (
+            self.encode_cursor("next", items[-1]) if items and has_next else None
+        )
+        previous_cursor = (
+            self.encode_cursor("previous", items[0]) if items and has_previous else None
+        )
+        return CursorPage(items, next_cursor, previous_cursor)
+
+    def encode_cursor(self, direction, item):
+        values = [self._to_json(self._value(item, name)) for name in self.fields]
+        return signing.dumps(
+            {"d": direction[0], "o": self.ordering, "v": values}, salt=self.salt
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=self.salt)
+        except signing.BadSignature:
+            raise InvalidCursor("Cursor signature doesn't match")
+
+        if (
+            not isinstance(data, dict)
+            or tuple(data.get("o", ())) != self.ordering
+            or data.get("d") not in ("n", "p")
+        ):
+            raise InvalidCursor("Cursor doesn't belong to this listing")
+
+        model = self.queryset.model
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, data["v"])
+            ]
+        except Exception:
+            raise InvalidCursor("Cursor values are malformed")
+
+        return ("next" if data["d"] == "n" else "previous"), values
+
+    def _seek(self, values, forward):
+        """Build lexicographic (f1, f2, ...) > or < (v1, v2, ...) condition
+        Leading f1 >= / <= v1 term lets the database use an index range scan
+        """
+        lookup = "lt" if forward == self.descending else "gt"
+        bound = "lte" if lookup == "lt" else "gte"
+
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            equal = {field: values[i] for i, field in enumerate(self.fields[:index])}
+            condition |= Q(**equal, **{f"{name}__{lookup}": values[index]})
+
+        return Q(**{f"{self.fields[0]}__{bound}": values[0]}) & condition
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        )
+
+    @staticmethod
+    def _value(item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
+    @staticmethod
+    def _to_json(value):
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator which avoids exact COUNT(*) on large querysets
+    Counts up to exact_threshold rows exactly with a LIMITed count.
+    Larger querysets use backend statistics (PostgreSQL reltuples or EXPLAIN,
+    MySQL table rows, SQLite sqlite_stat1) and otherwise an exact count
+    cached for cache_timeout seconds, so it's refreshed periodically.
+
+    Fields:
+        exact_threshold : Maximum rows counted exactly on every request
+        cache_timeout   : Seconds a fallback exact count is reused
+    """
+
+    exact_threshold = 1000
+    cache_timeout = 60 * 5
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        queryset = queryset.order_by()
+        bounded = queryset[: self.exact_threshold + 1].count()
+        if bounded <= self.exact_threshold:
+            return bounded
+
+        estimate = self.statistics_count(queryset)
+        if estimate is None:
+            estimate = self.cached_count(queryset)
+
+        return max(estimate, bounded)
+
+    def statistics_count(self, queryset):
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        filtered = bool(queryset.query.where)
+
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    if filtered:
+                        plan = json.loads(queryset.explain(format="json"))
+                        return int(plan[0]["Plan"]["Plan Rows"])
+                    cursor.execute(
+                        "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                        [table],
+                    )
+                elif filtered:
+                    return None
+                elif connection.vendor == "mysql":
+                    cursor.execute(
+                        "SELECT table_rows FROM information_schema.tables "
+                        "WHERE table_schema = DATABASE() AND table_name = %s",
+                        [table],
+                    )
+                elif connection.vendor == "sqlite":
+                    cursor.execute(
+                        "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                        [table],
+                    )
+                else:
+                    return None
+
+                row = cursor.fetchone()
+        except DatabaseError:
+            return None
+
+        if row is None or row[0] is None:
+            return None
+
+        estimate = int(float(str(row[0]).split()[0]))
+        return estimate if estimate >= 0 else None
+
+    def cached_count(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = md5(f"{queryset.db}:{sql}:{params!r}".encode("utf-8")).hexdigest()
+        key = f"estimated_count:{digest}"
+
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.cache_timeout)
+
+        return count
@@ -0,0 +1,234 @@
+from collections import Counter
+from random import random
+from threading import Event, Thread, enumerate as threads, get_ident
+from time import perf_counter, time
+import json
+import os
+import sys
+from django.conf import settings
+from django.core import signing
+from common.executor import run_sync
+from common.middleware import HybridMiddleware
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.002))
+PROFILE_RING_SIZE = int(os.environ.get("PROFILE_RING_SIZE", 100))
+PROFILE_TOKEN_MAX_AGE = int(os.environ.get("PROFILE_TOKEN_MAX_AGE", 60 * 60))
+PROFILE_TOKEN_SALT = "common.profiling.token"
+
+
+def profile_dir():
+    return os.environ.get("PROFILE_DIR") or os.path.join(settings.BASE_DIR, "profiles")
+
+
+def make_profile_token():
+    """Return signed X-Profile header value valid for PROFILE_TOKEN_MAX_AGE"""
+    return signing.dumps("profile", salt=PROFILE_TOKEN_SALT)
+
+
+def check_profile_token(token):
+    try:
+        signing.loads(token, salt=PROFILE_TOKEN_SALT, max_age=PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    """Sample one thread's Python stack every interval seconds
+    A daemon thread reads the target frame with sys._current_frames and
+    counts folded stacks ("root;caller;callee"), the flamegraph.pl and
+    speedscope input format. Unlike cProfile, the profiled code runs at
+    full speed between samples.
+    With all_threads, every other thread is sampled and stacks are prefixed
+    with thread names, e.g. for async requests running code in thread pools.
+
+    Methods:
+        start / stop : Start sampling, stop and return Counter of folded stacks
+    """
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL, all_threads=False):
+        self.thread_id = thread_id or get_ident()
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks = Counter()
+        self.stopped = Event()
+        self.thread = Thread(target=self.run, name="stack-sampler", daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frames = sys._current_frames()
+        if not self.all_threads:
+            self.add(frames.get(self.thread_id))
+            return
+
+        names = {thread.ident: thread.name for thread in threads()}
+        for thread_id, frame in frames.items():
+            if thread_id != self.thread.ident:
+                self.add(frame, names.get(thread_id, str(thread_id)))
+
+    def add(self, frame, thread_name=None):
+        names = []
+        while frame is not None:
+            names.append(frame_name(frame))
+            frame = frame.f_back
+        if thread_name is not None:
+            names.append(thread_name)
+        if names:
+            self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        # Requests faster than interval still get one sample
+        if not self.stacks:
+            self.sample()
+        return self.stacks
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of request profiles
+    Every profile is one JSON file named by its start time, the oldest files
+    are removed once more than size profiles exist.
+
+    Methods:
+        save   : Write profile and drop profiles beyond size, return its name
+        list   : Return profile summaries, newest first
+        load   : Return profile of name or None
+    """
+
+    def __init__(self, directory=None, size=PROFILE_RING_SIZE):
+        self.directory = directory
+        self.size = size
+
+    @property
+    def path(self):
+        return self.directory or profile_dir()
+
+    def names(self):
+        try:
+            files = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            (name[:-5] for name in files if name.endswith(".json")), reverse=True
+        )
+
+    def save(self, profile):
+        os.makedirs(self.path, exist_ok=True)
+        name = f"{int(profile['created_at'] * 1000000)}-{os.getpid()}"
+        temporary = os.path.join(self.path, f".{name}.tmp")
+        with open(temporary, "w", encoding="utf-8") as stream:
+            json.dump(profile, stream)
+        os.replace(temporary, os.path.join(self.path, f"{name}.json"))
+
+        for stale in self.names()[self.size :]:
+            try:
+                os.remove(os.path.join(self.path, f"{stale}.json"))
+            except FileNotFoundError:
+                pass
+
+        return name
+
+    def load(self, name):
+        if name not in self.names():
+            return None
+        try:
+            with open(os.path.join(self.path, f"{name}.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list(self):
+        summaries = []
+        for name in self.names():
+            profile = self.load(name)
+            if profile is not None:
+                profile.pop("stacks", None)
+                summaries.append(dict(profile, name=name))
+        return summaries
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """Profile requests with X-Profile token or PROFILE_SAMPLE_RATE sampling
+    Place it first in MIDDLEWARE so every other middleware, the view and ORM
+    calls appear in the stacks. Without the header and with a zero sample
+    rate the request goes straight through, only the header lookup is added.
+    Staff users get tokens from the profiles admin page.
+    Async requests sample every thread, including concurrent requests.
+    """
+
+    @staticmethod
+    def reason(request):
+        token = request.META.get(PROFILE_HEADER)
+        if token is not None and check_profile_token(token):
+            return "header"
+        if PROFILE_SAMPLE_RATE and random() < PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    def handle(self, request):
+        reason = self.reason(request)
+        if reason is None:
+            return self.get_response(request)
+
+        created_at = time()
+        start = perf_counter()
+        sampler = StackSampler().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+
+        profile = self.profile(request, response, reason, sampler, stacks, start)
+        response["X-Profile-Id"] = profile_store.save(
+            dict(profile, created_at=created_at)
+        )
+        return response
+
+    async def __acall__(self, request):
+        reason = self.reason(request)
+        if reason is None:
+            return await self.get_response(request)
+
+        created_at = time()
+        start = perf_counter()
+        sampler = StackSampler(all_threads=True).start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stacks = await run_sync(sampler.stop)
+
+        profile = self.profile(request, response, reason, sampler, stacks, start)
+        response["X-Profile-Id"] = await run_sync(
+            profile_store.save, dict(profile, created_at=created_at)
+        )
+        return response
+
+    @staticmethod
+    def profile(request, response, reason, sampler, stacks, start):
+        return {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration": perf_counter() - start,
+            "reason": reason,
+            "interval": sampler.interval,
+            "samples": sum(stacks.values()),
+            "stacks": dict(stacks),
+        }
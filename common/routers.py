@@ -0,0 +1,220 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from random import choice
+from zlib import crc32
+import os
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+# Every shard allocates post and vote ids from its own range, so a post id
+# alone tells its shard and ids stay unique across shards
+SHARD_ID_SPAN = 1 << 40
+SHARDED_MODELS = {("posts", "post"), ("posts", "postvoteduser")}
+
+_replica_reads = ContextVar("replica_reads", default=False)
+_request_state = ContextVar("replica_request_state", default=None)
+_shard = ContextVar("post_shard", default=None)
+
+
+def is_sharded(model):
+    return (model._meta.app_label, model._meta.model_name) in SHARDED_MODELS
+
+
+def post_databases():
+    """Return aliases holding posts, every shard or only default"""
+    return list(settings.POST_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def shard_for(board_path):
+    """Return alias of the shard holding board's posts"""
+    shards = settings.POST_SHARDS
+    if not shards:
+        return DEFAULT_DB_ALIAS
+    return shards[crc32(board_path.encode()) % len(shards)]
+
+
+def post_shard(post_id):
+    """Return alias of the shard holding post of post_id"""
+    index = post_id // SHARD_ID_SPAN
+    if not index or index > len(settings.POST_SHARDS):
+        return DEFAULT_DB_ALIAS
+    return settings.POST_SHARDS[index - 1]
+
+
+def shard_id_start(alias):
+    """Return last id reserved before shard's id range"""
+    return (settings.POST_SHARDS.index(alias) + 1) * SHARD_ID_SPAN
+
+
+@contextmanager
+def use_shard(alias):
+    """Route queries of sharded models without instance hints to alias"""
+    token = _shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _shard.reset(token)
+
+
+def board_shard(board_path):
+    return use_shard(shard_for(board_path))
+
+
+def board_sharded(view):
+    """Run view taking board_path inside its board's use_shard"""
+
+    @wraps(view)
+    def wrapper(request, board_path, *args, **kwargs):
+        with board_shard(board_path):
+            return view(request, board_path, *args, **kwargs)
+
+    return wrapper
+
+
+def fan_out(func, *args, **kwargs):
+    """Call func once per post database inside use_shard, return results list"""
+    results = []
+    for alias in post_databases():
+        with use_shard(alias):
+            results.append(func(*args, **kwargs))
+    return results
+
+
+@contextmanager
+def replica_reads():
+    """Allow reads of default database models to go to DATABASE_REPLICAS
+    Used by read-only views (listings and search), also as a decorator.
+    Reads inside transactions or after the user's own writes stay on primary.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ShardedQuerySet(models.QuerySet):
+    """QuerySet of sharded models creating rows in their instance's shard
+    QuerySet.create saves with the queryset's database, which the router
+    can only guess without the instance, unless using() picked one.
+    """
+
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True)
+        return obj
+
+
+def _pin_key(user_id):
+    return f"replica_pin:{user_id}"
+
+
+@contextmanager
+def read_your_writes(user_id):
+    """Track one request's writes for replica stickiness
+    Reads go to primary when user wrote within REPLICA_PIN_SECONDS, and the
+    user is pinned to primary again when the request writes.
+    """
+    state = {
+        "pinned": user_id is not None and bool(cache.get(_pin_key(user_id))),
+        "wrote": False,
+    }
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+        if state["wrote"] and user_id is not None:
+            cache.set(_pin_key(user_id), True, REPLICA_PIN_SECONDS)
+
+
+class DatabaseRouter:
+    """Route reads to replicas and posts to shards
+    Reads of unsharded models go to a random DATABASE_REPLICAS alias only
+    inside replica_reads, outside transactions and while the request isn't
+    pinned to primary (read_your_writes).
+    Post and PostVotedUser live in POST_SHARDS when it's set. Instances, and
+    related lookups from comments, votes and boards, are routed by their
+    post id range or, for new posts, by crc32 of board path.
+    Queries without instance go to the use_shard context or to default.
+    Relations to users and boards cross databases, so deleting them doesn't
+    cascade into shards.
+
+    Methods:
+        db_for_read     : Return replica, shard or default alias
+        db_for_write    : Return shard or default alias, pin request to primary
+        allow_relation  : Allow relations across default, replicas and shards
+        allow_migrate   : Migrate only sharded models on shards, none on replicas
+    """
+
+    def primary(self, model, hints):
+        if not settings.POST_SHARDS or not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+
+        # Related managers and descriptors hint the instance they start from,
+        # e.g. a comment for comment.post or a board for board.posts
+        instance = hints.get("instance")
+        if isinstance(instance, models.Model):
+            label = instance._meta.label_lower
+            if (
+                is_sharded(type(instance))
+                and instance._state.db in settings.POST_SHARDS
+            ):
+                return instance._state.db
+            post_id = instance.pk if label == "posts.post" else None
+            post_id = post_id or getattr(instance, "post_id", None)
+            if post_id is not None:
+                return post_shard(post_id)
+            board_id = instance.pk if label == "boards.board" else None
+            board_id = board_id or getattr(instance, "board_id", None)
+            if board_id is not None:
+                return shard_for(board_id)
+
+        return _shard.get() or DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        alias = self.primary(model, hints)
+        if (
+            alias == DEFAULT_DB_ALIAS
+            and settings.DATABASE_REPLICAS
+            and _replica_reads.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            state = _request_state.get()
+            if state is None or not (state["pinned"] or state["wrote"]):
+                return choice(settings.DATABASE_REPLICAS)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return self.primary(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {obj1._state.db, obj2._state.db}
+        if databases <= {
+            DEFAULT_DB_ALIAS,
+            *settings.DATABASE_REPLICAS,
+            *settings.POST_SHARDS,
+        }:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        if db in settings.POST_SHARDS:
+            return app_label == "posts" and model_name in (
+                None,
+                "post",
+                "postvoteduser",
+            )
+        return None
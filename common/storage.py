@@ -0,0 +1,89 @@
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+import os
+import re
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_NAME = re.compile(r"(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})(\.\w+)?")
+# Dot-prefixed, so serve_media never serves partially written uploads
+TEMPORARY_DIRECTORY = ".incoming"
+
+
+def content_digest(name):
+    """Return sha256 hex digest of content-addressed name, None for other names"""
+    match = CONTENT_NAME.fullmatch(name)
+    if match is None or not match["digest"].startswith(match["prefix"]):
+        return None
+    return match["digest"]
+
+
+class AtomicFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage writing files through a temporary file moved into place
+    Readers never see a partially written file, and concurrent saves of one
+    name replace each other instead of keeping suffixed copies.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Saves replace the file, so the requested name is always available
+        return name
+
+    def write_temporary(self, content, digest=None):
+        """Write content to a temporary file under location, return its path
+        Temporary files live in the TEMPORARY_DIRECTORY subdirectory, on the
+        same filesystem for os.replace and never served by serve_media.
+        digest (a hashlib object) is updated with the written bytes.
+        """
+        directory = os.path.join(self.location, TEMPORARY_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        with NamedTemporaryFile(
+            dir=directory, prefix="upload-", delete=False
+        ) as temporary:
+            try:
+                for chunk in content.chunks():
+                    if digest is not None:
+                        digest.update(chunk)
+                    temporary.write(chunk)
+            except BaseException:
+                os.remove(temporary.name)
+                raise
+        return temporary.name
+
+    def replace(self, temporary, name):
+        """Move temporary file to name, return name"""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temporary, self.file_permissions_mode)
+        os.replace(temporary, path)
+        return name
+
+    def _save(self, name, content):
+        return self.replace(self.write_temporary(content), name)
+
+
+class ContentAddressedStorage(AtomicFileSystemStorage):
+    """FileSystemStorage naming saved files by the sha256 of their content
+    Files are saved as "<first 2 hex digits>/<sha256><extension>", whatever
+    the upload name or upload_to, so identical uploads share one file and a
+    name never changes content (safe for immutable caching and strong ETags).
+    Names stored before, such as default_avatar.png, still open and serve.
+    Deleting a name removes it for every record sharing the content.
+    """
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if not re.fullmatch(r"\.\w{1,10}", extension):
+            extension = ""
+
+        digest = sha256()
+        temporary = self.write_temporary(content, digest)
+        digest = digest.hexdigest()
+        name = f"{digest[:2]}/{digest}{extension}"
+        if os.path.exists(self.path(name)):
+            os.remove(temporary)
+            return name
+
+        # Concurrent uploads of equal content replace the file with equal bytes
+        return self.replace(temporary, name)
@@ -0,0 +1,137 @@
+from contextlib import ExitStack, contextmanager
+from django import test
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from common.routers import board_shard
+
+# Routed runs (POST_SHARDS, DATABASE_REPLICAS) query more than default
+PRIMARY_DATABASES = {DEFAULT_DB_ALIAS, *settings.POST_SHARDS}
+
+# Class decorator of tests of features working on default database only
+# (admin changelists, NDJSON commands, synthetic data), posts stay in default
+single_database = override_settings(POST_SHARDS=[], DATABASE_REPLICAS=[])
+
+
+@contextmanager
+def capture_queries():
+    """Yield list of queries run on default and every shard inside the block"""
+    queries = []
+    with ExitStack() as stack:
+        contexts = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in sorted(PRIMARY_DATABASES)
+        ]
+        yield queries
+    for context in contexts:
+        queries.extend(context.captured_queries)
+
+
+class BoardShardMixin:
+    """Run the whole test class inside board_shard(board_path)
+    Like board views, tests of one board's posts then find them by unhinted
+    queries (e.g. Post.objects.get(title=...)) when POST_SHARDS is set.
+    assertNumQueries counts queries of default and every shard.
+    """
+
+    board_path = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.board_shard = None
+        if cls.board_path is not None:
+            cls.board_shard = board_shard(cls.board_path)
+            cls.board_shard.__enter__()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls.exit_board_shard()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            super().tearDownClass()
+        finally:
+            cls.exit_board_shard()
+
+    @classmethod
+    def exit_board_shard(cls):
+        if cls.board_shard is not None:
+            cls.board_shard.__exit__(None, None, None)
+            cls.board_shard = None
+
+    def assertNumQueries(self, num, func=None, *args, using=None, **kwargs):
+        """Count queries of default and every shard unless using names one"""
+        if using is not None:
+            return super().assertNumQueries(num, func, *args, using=using, **kwargs)
+
+        context = self.assert_num_queries(num)
+        if func is None:
+            return context
+        with context:
+            func(*args, **kwargs)
+
+    @contextmanager
+    def assert_num_queries(self, num):
+        with capture_queries() as queries:
+            yield
+        self.assertEqual(
+            len(queries),
+            num,
+            "%d queries executed, %d expected\nCaptured queries were:\n%s"
+            % (
+                len(queries),
+                num,
+                "\n".join(
+                    f"{index}. {query['sql']}" for index, query in enumerate(queries, 1)
+                ),
+            ),
+        )
+
+
+class AdminChangelistMixin:
+    """Query counts of admin changelists, the client must be logged in as staff
+
+    Methods:
+        changelist_queries    : Return query count of model's changelist page
+        assertConstantQueries : Check changelist queries don't grow per row
+    """
+
+    def changelist_queries(self, model, per_page):
+        model_admin = site._registry[model]
+        list_per_page = model_admin.list_per_page
+        model_admin.list_per_page = per_page
+        url = f"/admin/{model._meta.app_label}/{model._meta.model_name}/"
+
+        try:
+            with capture_queries() as queries:
+                response = self.client.get(url)
+        finally:
+            model_admin.list_per_page = list_per_page
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cl"].result_list), per_page)
+        return len(queries)
+
+    def assertConstantQueries(self, model):
+        self.assertEqual(
+            self.changelist_queries(model, 2), self.changelist_queries(model, 9)
+        )
+
+
+class TestCase(BoardShardMixin, test.TestCase):
+    """TestCase allowed to query every configured shard
+    Tests run inside transactions, which the router never sends to replicas,
+    and Django checks constraints of every allowed alias at teardown, which
+    locks on replicas mirroring default's in-memory SQLite database.
+    """
+
+    databases = PRIMARY_DATABASES
+
+
+class TransactionTestCase(BoardShardMixin, test.TransactionTestCase):
+    """TransactionTestCase allowed to query every configured shard and replica"""
+
+    databases = PRIMARY_DATABASES | set(settings.DATABASE_REPLICAS)
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import datetime
+from hmac import compare_digest
+import os
+from django.contrib import admin
+from django.http import Http404, HttpResponse
+from django.template import Context, Template
+from django.views.decorators.http import require_GET, require_safe
+from common.media import serve_media
+from common.metrics import metrics_registry
+from common.profiling import make_profile_token, profile_store
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+
+@require_GET
+def metrics(request):
+    """Per view request metrics in Prometheus text format
+    Allowed for scrapers sending "Authorization: Bearer <METRICS_TOKEN>"
+    and for staff users.
+    """
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    scraper = bool(METRICS_TOKEN) and compare_digest(
+        authorization, f"Bearer {METRICS_TOKEN}"
+    )
+
+    if not (scraper or request.user.is_staff):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+
+    return HttpResponse(
+        metrics_registry.render(), content_type="text/plain; version=0.0.4"
+    )
+
+
+@require_safe
+def media(request, name):
+    """Uploaded file of MEDIA_URL, see common.media.serve_media"""
+    return serve_media(request, name)
+
+
+PROFILE_LIST_TEMPLATE = Template("""{% extends "admin/base_site.html" %}
+{% block title %}Request profiles{% endblock %}
+{% block content %}
+<h1>Request profiles</h1>
+<p>Profile a request by sending <code>X-Profile: {{ token }}</code></p>
+<table>
+<thead><tr><th>Time</th><th>Request</th><th>Status</th><th>Duration</th>
+<th>Samples</th><th>Reason</th></tr></thead>
+<tbody>
+{% for profile in profiles %}
+<tr><td><a href="{{ profile.name }}/">{{ profile.time|date:"Y-m-d H:i:s" }}</a></td>
+<td>{{ profile.method }} {{ profile.path }}</td><td>{{ profile.status }}</td>
+<td>{{ profile.duration|floatformat:3 }}s</td><td>{{ profile.samples }}</td>
+<td>{{ profile.reason }}</td></tr>
+{% empty %}
+<tr><td colspan="6">No profiles yet</td></tr>
+{% endfor %}
+</tbody>
+</table>
+{% endblock %}""")
+
+PROFILE_DETAIL_TEMPLATE = Template("""{% extends "admin/base_site.html" %}
+{% block title %}Request profile{% endblock %}
+{% block content %}
+<h1>{{ profile.method }} {{ profile.path }}</h1>
+<p>{{ profile.duration|floatformat:3 }}s, {{ profile.samples }} samples every
+{{ profile.interval }}s. <a href="?format=folded">Download folded stacks</a>
+for flamegraph.pl or speedscope.</p>
+<table>
+<thead><tr><th>Function</th><th>Self samples</th><th>Total samples</th></tr></thead>
+<tbody>
+{% for name, own, total in functions %}
+<tr><td><code>{{ name }}</code></td><td>{{ own }}</td><td>{{ total }}</td></tr>
+{% endfor %}
+</tbody>
+</table>
+{% endblock %}""")
+
+
+def profile_list(request):
+    """Staff page listing stored request profiles with a fresh X-Profile token"""
+    profiles = profile_store.list()
+    for profile in profiles:
+        profile["time"] = datetime.fromtimestamp(profile["created_at"])
+
+    context = dict(
+        admin.site.each_context(request), profiles=profiles, token=make_profile_token()
+    )
+    return HttpResponse(PROFILE_LIST_TEMPLATE.render(Context(context)))
+
+
+def profile_detail(request, name):
+    """Staff page of one profile's hottest functions or its folded stacks
+    Query Params:
+        format : folded to download "stack count" lines
+    """
+    profile = profile_store.load(name)
+    if profile is None:
+        raise Http404(f"Profile {name} does not exist")
+
+    stacks = profile["stacks"]
+    if request.GET.get("format") == "folded":
+        lines = "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+        response = HttpResponse(lines, content_type="text/plain")
+        response["Content-Disposition"] = f'attachment; filename="{name}.folded"'
+        return response
+
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+
+    functions = [
+        (function, own[function], count) for function, count in total.most_common(50)
+    ]
+    context = dict(
+        admin.site.each_context(request), profile=profile, functions=functions
+    )
+    return HttpResponse(PROFILE_DETAIL_TEMPLATE.render(Context(context)))
@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+from common.executor import orm_pool_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+application = orm_pool_application(get_asgi_application())
@@ -39,11 +39,15 @@ PROJECT_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + PROJECT_APPS
 
 MIDDLEWARE = [
+    "common.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "common.middleware.QueryMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "users.middleware.JsonWebTokenMiddleware",
+    "common.middleware.ReadYourWritesMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -80,6 +84,64 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile: WAL and tuned pragmas (common.db.sqlite3), busy
+# timeout and connections kept across requests for CONN_MAX_AGE seconds
+
+if os.environ.get("SQLITE_PRODUCTION", "False") == "True":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "common.db.sqlite3",
+            "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+            "OPTIONS": {"timeout": 20},
+        }
+    )
+
+# Read replicas and post shards (common.routers.DatabaseRouter), comma
+# separated SQLite file paths. Replicas are kept in sync outside of Django
+# (e.g. Litestream or LiteFS) and mirror default in tests.
+
+
+def database_files(variable):
+    return [path for path in os.environ.get(variable, "").split(",") if path]
+
+
+DATABASE_REPLICAS = []
+for index, path in enumerate(database_files("DATABASE_REPLICAS"), 1):
+    DATABASE_REPLICAS.append(f"replica_{index}")
+    DATABASES[f"replica_{index}"] = dict(
+        DATABASES["default"],
+        NAME=os.path.join(BASE_DIR, path),
+        TEST={"MIRROR": "default"},
+    )
+
+POST_SHARDS = []
+for index, path in enumerate(database_files("POST_SHARDS"), 1):
+    POST_SHARDS.append(f"shard_{index}")
+    directory, name = os.path.split(os.path.join(BASE_DIR, path))
+    DATABASES[f"shard_{index}"] = dict(
+        DATABASES["default"],
+        NAME=os.path.join(directory, name),
+        TEST={"NAME": os.path.join(directory, f"test_{name}")},
+    )
+
+DATABASE_ROUTERS = ["common.routers.DatabaseRouter"]
+
+# Cache shared by every worker process. Board cache versions, token versions,
+# trending counts and replica pins only reach other processes through it, so
+# deployments running more than one process set CACHE_BACKEND and
+# CACHE_LOCATION to a shared cache, e.g. memcached or
+# django.core.cache.backends.db.DatabaseCache (after createcachetable).
+# The LocMemCache default is per process, for development and tests.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -113,11 +175,27 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 
-# Media files
+# Media files, named by content hash (common.storage.ContentAddressedStorage)
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "uploads")
 MEDIA_URL = "/media/"
+DEFAULT_FILE_STORAGE = "common.storage.ContentAddressedStorage"
+
+# Front server sending media bodies: nginx (X-Accel-Redirect to an internal
+# location aliasing MEDIA_ROOT at MEDIA_ACCEL_PREFIX), sendfile (X-Sendfile)
+# or empty to stream them from Django
+
+MEDIA_SERVER = os.environ.get("MEDIA_SERVER", "")
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-media/")
 
 # Authentication User Model
 
 AUTH_USER_MODEL = "users.User"
+
+# Post search backend (fts5, python or auto)
+
+POST_SEARCH_BACKEND = os.environ.get("POST_SEARCH_BACKEND", "auto")
+
+# Buffer post vote counters in memory and flush them in batches (posts.buffer)
+
+VOTE_WRITE_BEHIND = os.environ.get("VOTE_WRITE_BEHIND", "False") == "True"
@@ -1,11 +1,21 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from common.views import media, metrics, profile_detail, profile_list
+from posts.views import trending_list
 
 urlpatterns = [
+    path("admin/profiles/", admin.site.admin_view(profile_list), name="profile_list"),
+    path(
+        "admin/profiles/<str:name>/",
+        admin.site.admin_view(profile_detail),
+        name="profile_detail",
+    ),
     path("admin/", admin.site.urls),
+    path("posts/", include("posts.urls")),
+    path("comments/", include("comments.urls")),
+    path("users/", include("users.urls")),
+    path("trending/", trending_list, name="trending"),
+    path("metrics/", metrics, name="metrics"),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", media, name="media"),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,18 +1,22 @@
 from django.contrib import admin
+from common.admin import EstimatedCountAdminMixin
 from posts.models import Post, PostVotedUser
 
 
 @admin.register(Post)
-class BoardAdmin(admin.ModelAdmin):
-    """Register Board model at admin panel
+class PostAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    """Register Post model at admin panel
     Inherit:
+        EstimatedCountAdminMixin
         admin.ModelAdmin
     Fields:
-        list_filter    : Fields used to filter Board object in the list
-        list_display   : Fields visible in Board object list
+        list_filter         : Fields used to filter Post object in the list
+        list_display        : Fields visible in Post object list
+        list_select_related : Foreign keys joined into the list query
     """
 
     list_filter = ("board",)
+    list_select_related = ("board", "create_user")
 
     list_display = (
         "title",
@@ -20,25 +24,39 @@ class BoardAdmin(admin.ModelAdmin):
         "create_user",
         "upvote",
         "downvote",
+        "unique_views",
         "created_at",
         "updated_at",
     )
 
 
 @admin.register(PostVotedUser)
-class PostVotedUserAdmin(admin.ModelAdmin):
+class PostVotedUserAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Register PostVotedUser model at admin panel
     Inherit:
+        EstimatedCountAdminMixin
         admin.ModelAdmin
     Fields:
-        list_filter    : Fields used to filter PostVotedUser object in the list
-        list_display   : Fields visible in PostVotedUser object list
+        list_filter         : Fields used to filter PostVotedUser object in the list
+        list_display        : Fields visible in PostVotedUser object list
+        list_select_related : Foreign keys used by __str__ joined into the list query
+    Methods:
+        get_queryset        : Defer post's content and viewer sketches which
+                              __str__ doesn't use
     """
 
     list_filter = ("is_upvoted",)
+    list_select_related = ("user", "post__board")
     list_display = (
         "__str__",
         "is_upvoted",
         "created_at",
         "updated_at",
     )
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .defer("post__content", "post__viewers", "post__board__viewers")
+        )
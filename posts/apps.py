@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = "posts"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from posts.signals import reserve_shard_ids, restore_post_search_schema
+
+        post_migrate.connect(restore_post_search_schema, sender=self)
+        post_migrate.connect(reserve_shard_ids, sender=self)
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from itertools import chain, groupby
+from threading import Event, Lock, Thread
+import atexit
+import logging
+import os
+from django.db import connections, transaction
+from django.db.models import Case, F, Value, When
+from common.routers import post_shard
+
+VOTE_BUFFER_SHARDS = int(os.environ.get("VOTE_BUFFER_SHARDS", 16))
+VOTE_BUFFER_MAX_PENDING = int(os.environ.get("VOTE_BUFFER_MAX_PENDING", 1000))
+VOTE_BUFFER_INTERVAL = float(os.environ.get("VOTE_BUFFER_INTERVAL", 1.0))
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer:
+    """Write-behind buffer of post vote counter deltas
+    Votes are spread over lock-striped shards by post id, so concurrent voters
+    on different posts don't contend. flush moves every pending delta into
+    posts with one UPDATE ... CASE statement per batch instead of one UPDATE
+    per vote, then rescores the flushed posts. Batches never span post shards.
+    Pending deltas live in process memory. voted_posts rows are written
+    synchronously, so replay rebuilds the counters after a crash.
+
+    Fields:
+        shards        : Count of lock-striped delta maps
+        max_pending   : Pending post count which triggers a flush
+        interval      : Seconds between background flushes
+        batch_size    : Posts updated by a single UPDATE statement
+    Methods:
+        add           : Buffer upvote and downvote delta of post
+        flush         : Apply pending deltas to posts, return flushed post count
+        pending       : Return count of posts with pending deltas
+        start / stop  : Start or stop background flush thread
+    """
+
+    def __init__(self, shards=16, max_pending=1000, interval=1.0, batch_size=500):
+        self.shards = [(Lock(), defaultdict(lambda: [0, 0])) for _ in range(shards)]
+        self.max_pending = max_pending
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flush_lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+
+    def add(self, post_id, upvote=0, downvote=0):
+        lock, deltas = self.shards[post_id % len(self.shards)]
+        with lock:
+            delta = deltas[post_id]
+            delta[0] += upvote
+            delta[1] += downvote
+
+        if self.pending() >= self.max_pending:
+            self.flush(blocking=False)
+
+    def pending(self):
+        return sum(len(deltas) for _, deltas in self.shards)
+
+    def drain(self):
+        drained = {}
+        for lock, deltas in self.shards:
+            with lock:
+                drained.update(deltas)
+                deltas.clear()
+        return drained
+
+    def flush(self, blocking=True):
+        if not self.flush_lock.acquire(blocking=blocking):
+            return 0
+
+        try:
+            deltas = {
+                post_id: delta for post_id, delta in self.drain().items() if any(delta)
+            }
+            post_ids = sorted(deltas)
+
+            # Shards own contiguous id ranges, so sorted ids are grouped by shard
+            batches = []
+            for _, shard_post_ids in groupby(post_ids, key=post_shard):
+                shard_post_ids = list(shard_post_ids)
+                for start in range(0, len(shard_post_ids), self.batch_size):
+                    batches.append(shard_post_ids[start : start + self.batch_size])
+
+            for index, batch_post_ids in enumerate(batches):
+                batch = {post_id: deltas[post_id] for post_id in batch_post_ids}
+                try:
+                    self.apply(batch)
+                except Exception:
+                    # Keep unapplied deltas for the next flush instead of losing votes
+                    for post_id in chain.from_iterable(batches[index:]):
+                        lock, pending = self.shards[post_id % len(self.shards)]
+                        with lock:
+                            delta = pending[post_id]
+                            delta[0] += deltas[post_id][0]
+                            delta[1] += deltas[post_id][1]
+                    raise
+
+            return len(post_ids)
+        finally:
+            self.flush_lock.release()
+
+    @staticmethod
+    def apply(batch):
+        from posts.models import Post
+        from posts.ranking import hot_score
+
+        def delta_case(index):
+            return Case(
+                *(
+                    When(pk=post_id, then=Value(delta[index]))
+                    for post_id, delta in batch.items()
+                    if delta[index]
+                ),
+                default=Value(0),
+            )
+
+        using = post_shard(next(iter(batch)))
+        with transaction.atomic(using=using):
+            Post.objects.using(using).filter(pk__in=batch).update(
+                upvote=F("upvote") + delta_case(0),
+                downvote=F("downvote") + delta_case(1),
+            )
+
+            posts = list(
+                Post.objects.using(using)
+                .filter(pk__in=batch)
+                .only("upvote", "downvote", "created_at", "hot_score")
+            )
+            for post in posts:
+                post.hot_score = hot_score(post.upvote, post.downvote, post.created_at)
+            Post.objects.using(using).bulk_update(posts, ["hot_score"])
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Vote buffer flush failed")
+            finally:
+                connections.close_all()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = Thread(target=self.run, name="vote-buffer", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+
+def replay_votes(since=None):
+    """Rebuild post vote counters from voted_posts rows
+    Recovers deltas lost with a crashed process's buffer. Only posts with
+    votes changed since the given datetime are recomputed when it's given.
+    Run it while no process holds pending deltas (e.g. before workers start),
+    otherwise those deltas are counted twice.
+    Return recomputed post count.
+    """
+    from posts.reconcile import reconcile_votes
+
+    return reconcile_votes(since, chunk_size=500).checked
+
+
+vote_buffer = VoteBuffer(
+    shards=VOTE_BUFFER_SHARDS,
+    max_pending=VOTE_BUFFER_MAX_PENDING,
+    interval=VOTE_BUFFER_INTERVAL,
+)
+
+
+def buffer_vote(post_id, upvote=0, downvote=0):
+    """Buffer vote delta once the current transaction commits"""
+    vote_buffer.start()
+    transaction.on_commit(
+        lambda: vote_buffer.add(post_id, upvote, downvote), using=post_shard(post_id)
+    )
+
+
+def flush_at_exit():
+    if vote_buffer.pending():
+        try:
+            vote_buffer.flush()
+        except Exception:
+            logger.exception("Vote buffer flush at exit failed, run replay_votes")
+
+
+atexit.register(flush_at_exit)
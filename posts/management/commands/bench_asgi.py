@@ -0,0 +1,159 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import cycle
+from time import perf_counter
+from wsgiref.util import setup_testing_defaults
+import asyncio
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from boards.models import Board
+from comments.models import Comment
+from common.benchmark import format_stats, summarize
+from common.executor import orm_pool_application
+from posts.models import Post
+from users.models import User
+
+HOST = "localhost"
+
+
+class Command(BaseCommand):
+    """Load test read endpoints through the ASGI and WSGI handlers
+    connections concurrent clients send post list, search and comment thread
+    requests in a closed loop (next request after the response) for seconds.
+    "asgi" awaits Django's ASGIHandler on the event loop, "wsgi" runs
+    WSGIHandler in a pool of wsgi-threads, like a threaded WSGI server.
+    Both run in-process without sockets, so only the handler, middleware,
+    view and database work differ. Clients waiting for a free worker count
+    in their latency like requests waiting in a server's backlog.
+    Fixtures are committed for the worker threads and deleted at the end.
+    """
+
+    help = "Compare requests/sec and latency of ASGI and WSGI read endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--wsgi-threads", type=int, default=32)
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username="bench_asgi_user")
+        board = Board.objects.create(name="bench", path="benchasgi", create_user=user)
+        posts = [
+            Post.objects.create(
+                create_user=user,
+                board=board,
+                title=f"bench post {index}",
+                content=f"bench content word{index % 10}",
+            )
+            for index in range(options["posts"])
+        ]
+        for index in range(options["comments"]):
+            Comment.objects.create(
+                post=posts[index % 5], create_user=user, content=f"comment {index}"
+            )
+
+        urls = [
+            (f"/posts/{board.path}/", ""),
+            (f"/posts/{board.path}/", "sort=hot"),
+            (f"/posts/{board.path}/search/", "q=word1"),
+            *((f"/comments/{post.pk}/", "") for post in posts[:5]),
+        ]
+        try:
+            for label, target in (("asgi", self.asgi), ("wsgi", self.wsgi)):
+                stats, errors, elapsed = asyncio.run(target(urls, options))
+                self.stdout.write(
+                    format_stats(
+                        f"{label} {stats['count'] / elapsed:.1f} req/sec "
+                        f"{errors} errors",
+                        stats,
+                    )
+                )
+        finally:
+            board.delete()
+            user.delete()
+
+    async def asgi(self, urls, options):
+        handler = orm_pool_application(ASGIHandler())
+
+        async def request(path, query):
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            await handler(
+                {
+                    "type": "http",
+                    "asgi": {"version": "3.0"},
+                    "http_version": "1.1",
+                    "method": "GET",
+                    "scheme": "http",
+                    "path": path,
+                    "raw_path": path.encode(),
+                    "query_string": query.encode(),
+                    "headers": [(b"host", HOST.encode())],
+                    "client": ("127.0.0.1", 0),
+                    "server": (HOST, 80),
+                },
+                receive,
+                send,
+            )
+            return messages[0]["status"]
+
+        return await self.load(request, urls, options)
+
+    async def wsgi(self, urls, options):
+        handler = WSGIHandler()
+        loop = asyncio.get_event_loop()
+
+        def call(path, query):
+            environ = {
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "HTTP_HOST": HOST,
+                "SERVER_NAME": HOST,
+            }
+            setup_testing_defaults(environ)
+            statuses = []
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            try:
+                b"".join(response)
+            finally:
+                response.close()
+            return int(statuses[0].split()[0])
+
+        with ThreadPoolExecutor(max_workers=options["wsgi_threads"]) as pool:
+
+            async def request(path, query):
+                return await loop.run_in_executor(pool, partial(call, path, query))
+
+            return await self.load(request, urls, options)
+
+    async def load(self, request, urls, options):
+        for url in urls:
+            await request(*url)
+
+        samples = []
+        counts = {"errors": 0}
+        deadline = perf_counter() + options["seconds"]
+
+        async def client(offset):
+            targets = cycle(urls[offset % len(urls) :] + urls[: offset % len(urls)])
+            while perf_counter() < deadline:
+                start = perf_counter()
+                status = await request(*next(targets))
+                samples.append((perf_counter() - start) * 1000)
+                if status != 200:
+                    counts["errors"] += 1
+
+        start = perf_counter()
+        await asyncio.gather(
+            *(client(index) for index in range(options["connections"]))
+        )
+        return summarize(samples), counts["errors"], perf_counter() - start
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from boards.models import Board
+from common.benchmark import format_stats, manual_timestamps, measure, rollback
+from common.pagination import CursorPaginator
+from posts.models import Post
+from posts.views import POST_LIST_FIELDS, POST_LIST_ORDERINGS
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Benchmark board post listing on first and deep pages
+    Compare cursor pagination with OFFSET pagination on the same data.
+    Fixtures are created in a transaction which is rolled back at the end.
+    """
+
+    help = "Benchmark cursor pagination of board posts at first and deep pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=10000)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        ordering = POST_LIST_ORDERINGS["latest"]
+        pages = options["pages"]
+        page_size = options["page_size"]
+        repeat = options["repeat"]
+
+        with rollback():
+            board = self.seed(pages * page_size + page_size)
+            queryset = Post.objects.filter(board=board).values(*POST_LIST_FIELDS)
+            paginator = CursorPaginator(queryset, ordering, page_size)
+
+            offset = (pages - 1) * page_size
+            anchor = queryset.order_by(*ordering)[offset - 1]
+            deep_cursor = paginator.encode_cursor("next", anchor)
+
+            results = {
+                "cursor page 1": measure(lambda: paginator.page(), repeat),
+                f"cursor page {pages}": measure(
+                    lambda: paginator.page(deep_cursor), repeat
+                ),
+                "offset page 1": measure(
+                    lambda: list(queryset.order_by(*ordering)[:page_size]),
+                    repeat,
+                ),
+                f"offset page {pages}": measure(
+                    lambda: list(
+                        queryset.order_by(*ordering)[offset : offset + page_size]
+                    ),
+                    repeat,
+                ),
+            }
+
+        for label, stats in results.items():
+            self.stdout.write(format_stats(label, stats))
+
+    def seed(self, count):
+        user = User.objects.create_user(username="bench_pagination_user")
+        board = Board.objects.create(
+            name="bench", path="benchpagination", create_user=user
+        )
+        now = timezone.now()
+
+        with manual_timestamps(Post):
+            Post.objects.bulk_create(
+                (
+                    Post(
+                        create_user=user,
+                        board=board,
+                        title=f"post {index}",
+                        content="content",
+                        created_at=now - timedelta(seconds=index // 3),
+                    )
+                    for index in range(count)
+                ),
+                batch_size=5000,
+            )
+
+        return board
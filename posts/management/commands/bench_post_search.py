@@ -0,0 +1,86 @@
+from itertools import accumulate
+from random import Random
+from django.core.management.base import BaseCommand
+from boards.models import Board
+from common.benchmark import format_stats, measure, rollback
+from posts.models import Post
+from posts.search import Fts5SearchBackend, InvertedIndexSearchBackend
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Benchmark post search backends on a synthetic corpus
+    Words follow a Zipf distribution so queries cover common, medium
+    and rare terms. Fixtures are rolled back at the end.
+    """
+
+    help = "Benchmark FTS5, in-memory and LIKE post search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000000)
+        parser.add_argument("--words", type=int, default=40)
+        parser.add_argument("--vocabulary", type=int, default=20000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument(
+            "--backends",
+            default="fts5,like",
+            help="Comma separated backends among fts5, python, like",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        backends = options["backends"].split(",")
+        queries = {
+            "common term": "w3",
+            "medium term": "w300",
+            "rare term": "w8000",
+            "two terms": "w3 w300",
+        }
+
+        with rollback():
+            board = self.seed(options)
+            self.stdout.write(f"Seeded {options['posts']} posts")
+
+            for name in backends:
+                for label, query in queries.items():
+                    search = self.searcher(name, board, query)
+                    stats = measure(search, options["repeat"])
+                    self.stdout.write(format_stats(f"{name} {label}", stats))
+
+    def searcher(self, name, board, query):
+        if name == "like":
+            terms = query.split()
+            queryset = Post.objects.filter(board=board)
+            for term in terms:
+                queryset = queryset.filter(content__icontains=term)
+            return lambda: list(queryset.values("id", "title")[:20])
+
+        backend = {
+            "fts5": Fts5SearchBackend,
+            "python": InvertedIndexSearchBackend,
+        }[name]()
+        if name == "python":
+            backend.build()
+        return lambda: backend.search(query, board.pk)
+
+    def seed(self, options):
+        random = Random(options["seed"])
+        vocabulary = [f"w{rank}" for rank in range(1, options["vocabulary"] + 1)]
+        weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        words = options["words"]
+
+        user = User.objects.create_user(username="bench_search_user")
+        board = Board.objects.create(name="bench", path="benchsearch", create_user=user)
+
+        def posts():
+            for index in range(options["posts"]):
+                content = random.choices(vocabulary, cum_weights=weights, k=words)
+                yield Post(
+                    create_user=user,
+                    board=board,
+                    title=" ".join(content[:6]),
+                    content=" ".join(content),
+                )
+
+        Post.objects.bulk_create(posts(), batch_size=5000)
+        return board
@@ -0,0 +1,152 @@
+from random import Random
+from threading import Lock, Thread
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.test import RequestFactory
+from boards.models import Board
+from common.db.sqlite3.base import DEFAULT_PRAGMAS
+from posts.models import Post, PostVotedUser
+from posts.views import post_list
+from posts.votes import cast_vote, retract_vote
+from users.models import User
+
+MODES = (
+    (
+        "default",
+        {
+            "ENGINE": "django.db.backends.sqlite3",
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {},
+            "PRAGMAS": {"journal_mode": "DELETE"},
+        },
+    ),
+    (
+        "production",
+        {
+            "ENGINE": "common.db.sqlite3",
+            "CONN_MAX_AGE": 600,
+            "OPTIONS": {"timeout": 20},
+            "PRAGMAS": DEFAULT_PRAGMAS,
+        },
+    ),
+)
+
+
+class Command(BaseCommand):
+    """Benchmark mixed post list and vote throughput of SQLite configurations
+    Reader threads render the board's post list view, writer threads cast and
+    retract votes on the same posts, for seconds in every mode. After every
+    operation connections are closed like at the end of a request, unless
+    CONN_MAX_AGE keeps them. "default" is Django's stock backend with a
+    rollback journal, "production" is the SQLITE_PRODUCTION profile.
+    Threads need their own connections and commits, so fixtures can't be
+    rolled back and are deleted at the end instead.
+    """
+
+    help = "Compare mixed read/vote throughput of default and production SQLite"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=6)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=5)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("bench_sqlite only runs on SQLite databases")
+
+        User.objects.bulk_create(
+            User(username=f"bench_sqlite_user_{index}")
+            for index in range(options["users"])
+        )
+        users = list(User.objects.filter(username__startswith="bench_sqlite_user_"))
+        board = Board.objects.create(
+            name="bench", path="benchsqlite", create_user=users[0]
+        )
+        Post.objects.bulk_create(
+            Post(create_user=users[0], board=board, title="bench", content="bench")
+            for _ in range(options["posts"])
+        )
+        posts = list(Post.objects.filter(board=board))
+
+        database = connections.databases["default"]
+        original = database.copy()
+        try:
+            for label, mode in MODES:
+                PostVotedUser.objects.filter(post__board=board).delete()
+                Post.objects.filter(board=board).update(upvote=0, downvote=0)
+                # Journal mode is stored in the database file, reset it too
+                connection.close()
+                database.update(mode)
+                with connections["default"].cursor() as cursor:
+                    cursor.execute(
+                        f"PRAGMA journal_mode = {mode['PRAGMAS']['journal_mode']}"
+                    )
+                connections["default"].close()
+
+                reads, votes, errors, elapsed = self.run(board, users, posts, options)
+                self.stdout.write(
+                    f"{label:<12} {reads / elapsed:9.1f} reads/sec "
+                    f"{votes / elapsed:9.1f} votes/sec {errors:6d} errors "
+                    f"({options['readers']} readers, {options['writers']} writers)"
+                )
+        finally:
+            connections["default"].close()
+            database.clear()
+            database.update(original)
+            board.delete()
+            User.objects.filter(username__startswith="bench_sqlite_user_").delete()
+
+    def run(self, board, users, posts, options):
+        factory = RequestFactory()
+        deadline = perf_counter() + options["seconds"]
+        totals = {"reads": 0, "votes": 0, "errors": 0}
+        lock = Lock()
+
+        def read(random):
+            request = factory.get(f"/posts/{board.path}/")
+            request.user = random.choice(users)
+            post_list(request, board.path)
+            return "reads"
+
+        def vote(random):
+            user, post = random.choice(users), random.choice(posts)
+            if random.random() < 0.2:
+                retract_vote(user, post)
+            else:
+                cast_vote(user, post, is_upvoted=random.random() < 0.8)
+            return "votes"
+
+        def work(operation, seed):
+            random = Random(seed)
+            counts = {"reads": 0, "votes": 0, "errors": 0}
+            try:
+                while perf_counter() < deadline:
+                    try:
+                        counts[operation(random)] += 1
+                    except DatabaseError:
+                        counts["errors"] += 1
+                    close_old_connections()
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in counts.items():
+                        totals[key] += value
+
+        threads = [
+            Thread(target=work, args=(read, index))
+            for index in range(options["readers"])
+        ] + [
+            Thread(target=work, args=(vote, -index - 1))
+            for index in range(options["writers"])
+        ]
+        start = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - start
+
+        return totals["reads"], totals["votes"], totals["errors"], elapsed
@@ -0,0 +1,143 @@
+from itertools import count
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from boards.cache import get_board
+from boards.models import Board
+from common.benchmark import (
+    compare_results,
+    count_queries,
+    format_stats,
+    measure,
+    read_results,
+    rollback,
+    write_results,
+)
+from posts.admin import PostAdmin, PostVotedUserAdmin
+from posts.models import Post, PostVotedUser
+from posts.synthetic import generate
+from posts.trending import trending
+from posts.votes import cast_vote
+from users.models import User
+from users.utils.jwt import decode_jwt, verified_token_cache, verify_jwt
+from users.utils.snapshot import encode_user_jwt
+
+
+class Command(BaseCommand):
+    """End-to-end benchmark of model hot paths on synthetic data
+    Measures latency percentiles and per call query counts of board post
+    counts, votes, admin changelists, trending lists and jwt handling.
+    Results can be written as JSON and compared with a previous run's JSON,
+    failing the command when a p95 latency or a query count regresses.
+    Fixtures are rolled back.
+    """
+
+    help = "Benchmark hot paths and compare them with a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--boards", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--votes", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results JSON to this path")
+        parser.add_argument("--baseline", help="Compare with this results JSON")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 latency growth over baseline (0.2 = 20%%)",
+        )
+        parser.add_argument(
+            "--min-delta",
+            type=float,
+            default=0.5,
+            help="Ignore p95 latency growth below these milliseconds",
+        )
+
+    def handle(self, *args, **options):
+        with rollback():
+            generate(
+                users=options["users"],
+                boards=options["boards"],
+                posts=options["posts"],
+                votes=options["votes"],
+                seed=options["seed"],
+            )
+            results = self.run(options["repeat"])
+
+        for label, stats in results.items():
+            self.stdout.write(f"{format_stats(label, stats)}  {stats['queries']:3d}q")
+
+        if options["output"]:
+            write_results(options["output"], results)
+
+        if options["baseline"]:
+            regressions = compare_results(
+                results,
+                read_results(options["baseline"]),
+                options["tolerance"],
+                options["min_delta"],
+            )
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions from baseline")
+            self.stdout.write(self.style.SUCCESS("No regressions from baseline"))
+
+    def run(self, repeat):
+        board = Board.objects.order_by("-post_count").first()
+        post = Post.objects.filter(board=board).order_by("-upvote").first()
+        author = User.objects.filter(username__startswith="syn").first()
+
+        # Fresh voters so every measured PostVotedUser.save inserts a vote
+        User.objects.bulk_create(
+            User(username=f"bench_suite_voter_{index}") for index in range(repeat + 1)
+        )
+        voters = iter(User.objects.filter(username__startswith="bench_suite_voter_"))
+        cast_vote(author, post, is_upvoted=True)
+        flips = count(1)
+
+        admin_user = User.objects.create_superuser("bench_suite_admin", None, None)
+        request = RequestFactory().get("/admin/")
+        request.user = admin_user
+
+        def changelist(model_admin_class, model):
+            model_admin = model_admin_class(model, admin.site)
+            return lambda: model_admin.changelist_view(request).render()
+
+        token = encode_user_jwt(author)
+        decode_jwt(token)
+
+        benchmarks = {
+            "board post_count (cache)": lambda: get_board(board.pk).post_count,
+            "board post_count (db)": lambda: Board.objects.only("post_count")
+            .get(pk=board.pk)
+            .post_count,
+            "post create": lambda: Post.objects.create(
+                create_user=author, board=board, title="bench", content="bench"
+            ),
+            "vote save": lambda: PostVotedUser(
+                user=next(voters), post=post, is_upvoted=True
+            ).save(),
+            "vote flip": lambda: cast_vote(
+                author, post, is_upvoted=next(flips) % 2 == 0
+            ),
+            "admin post changelist": changelist(PostAdmin, Post),
+            "admin vote changelist": changelist(PostVotedUserAdmin, PostVotedUser),
+            "trending boards": lambda: trending.top_boards(10),
+            "trending posts": lambda: trending.top_posts(10),
+            "jwt encode": lambda: encode_user_jwt(author),
+            "jwt decode (cached)": lambda: decode_jwt(token),
+            "jwt verify (uncached)": lambda: verify_jwt(token),
+        }
+
+        results = {}
+        for label, func in benchmarks.items():
+            stats = measure(func, repeat)
+            stats["queries"] = count_queries(func)
+            results[label] = stats
+
+        verified_token_cache.clear()
+        return results
@@ -0,0 +1,100 @@
+from statistics import mean
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from common.hyperloglog import HyperLogLog
+from posts.unique_views import UniqueViews
+
+
+class Command(BaseCommand):
+    """Benchmark unique view sketches' throughput and accuracy
+    Records views through UniqueViews without touching the database. Post
+    p's viewers are the first distinct(p) viewer ids, distinct counts spread
+    geometrically from 1 to --viewers, and every viewer views its posts
+    --repeat times, so exact unique counts are known without keeping sets.
+    The board's sketch is the union of every post's viewers.
+    """
+
+    help = "Measure views/sec and estimate errors of unique view sketches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--views", type=int, default=10_000_000)
+        parser.add_argument("--posts", type=int, default=100)
+        parser.add_argument("--viewers", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=4)
+        parser.add_argument("--precision", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["views"] < options["posts"] * options["repeat"]:
+            raise CommandError("--views must allow one viewer of every post")
+
+        views = UniqueViews(interval=3600)
+        if options["precision"] is not None:
+            views.precision = options["precision"]
+        distinct = self.distinct_counts(
+            options["views"] // options["repeat"],
+            options["posts"],
+            options["viewers"],
+        )
+
+        recorded = 0
+        start = perf_counter()
+        for _ in range(options["repeat"]):
+            for post_id, count in distinct.items():
+                for viewer in range(count):
+                    views.record(post_id, "bench", f"user:{viewer}")
+                recorded += count
+        elapsed = perf_counter() - start
+
+        pending = views.drain()
+        views.stop()
+        sketches = pending["posts"]
+        errors = {
+            post_id: (sketch.count() - distinct[post_id]) / distinct[post_id]
+            for post_id, sketch in sketches.items()
+        }
+        standard_error = HyperLogLog(views.precision).standard_error()
+        board = pending["boards"]["bench"]
+        board_exact = max(distinct.values())
+
+        start = perf_counter()
+        merged = HyperLogLog(views.precision)
+        for sketch in sketches.values():
+            merged.merge(sketch)
+        merge_elapsed = perf_counter() - start
+        sizes = [len(sketch.to_bytes()) for sketch in sketches.values()]
+
+        self.stdout.write(
+            f"recorded      {recorded} views, {recorded / elapsed:,.0f} views/sec"
+        )
+        self.stdout.write(
+            f"post error    mean {mean(map(abs, errors.values())):.2%}, "
+            f"max {max(map(abs, errors.values())):.2%}, "
+            f"within 2 standard errors {self.within(errors, 2 * standard_error):.0%} "
+            f"(standard error {standard_error:.2%})"
+        )
+        self.stdout.write(
+            f"board         estimate {board.count()}, exact {board_exact}, "
+            f"error {(board.count() - board_exact) / board_exact:+.2%}"
+        )
+        self.stdout.write(
+            f"merge         {len(sketches)} sketches in {merge_elapsed * 1000:.1f} ms"
+        )
+        self.stdout.write(
+            f"column bytes  min {min(sizes)}, mean {mean(sizes):.0f}, "
+            f"max {max(sizes)}, board {len(board.to_bytes())}"
+        )
+
+    @staticmethod
+    def distinct_counts(total, posts, viewers):
+        # Geometric weights from 1 to viewers scaled to total unique views
+        ratio = viewers ** (1 / max(posts - 1, 1))
+        weights = [ratio**index for index in range(posts)]
+        scale = total / sum(weights)
+        return {
+            post_id: max(1, min(viewers, round(weight * scale)))
+            for post_id, weight in enumerate(weights, 1)
+        }
+
+    @staticmethod
+    def within(errors, bound):
+        return sum(abs(error) <= bound for error in errors.values()) / len(errors)
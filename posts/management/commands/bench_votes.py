@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from boards.models import Board
+from posts.buffer import vote_buffer
+from posts.models import Post, PostVotedUser
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Benchmark vote throughput with and without the write-behind buffer
+    Every thread votes on the same few hot posts to reproduce counter row
+    contention. Threads need their own connections and commits, so fixtures
+    can't be rolled back and are deleted at the end instead.
+    SQLite fails concurrent read-then-write transactions with "database is
+    locked", so it's benchmarked with a single thread by default.
+    """
+
+    help = "Compare votes/sec of synchronous and write-behind vote counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--posts", type=int, default=5)
+        parser.add_argument(
+            "--threads", type=int, default=None, help="Default 8, 1 on SQLite"
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        if threads is None:
+            threads = 1 if connection.vendor == "sqlite" else 8
+
+        User.objects.bulk_create(
+            User(username=f"bench_vote_user_{index}")
+            for index in range(options["users"])
+        )
+        users = list(User.objects.filter(username__startswith="bench_vote_user_"))
+        board = Board.objects.create(
+            name="bench", path="benchvotes", create_user=users[0]
+        )
+        Post.objects.bulk_create(
+            Post(create_user=users[0], board=board, title="hot", content="hot")
+            for _ in range(options["posts"])
+        )
+        posts = list(Post.objects.filter(board=board))
+
+        try:
+            for label, write_behind in (("synchronous", False), ("write-behind", True)):
+                PostVotedUser.objects.filter(post__board=board).delete()
+                Post.objects.filter(board=board).update(upvote=0, downvote=0)
+
+                with override_settings(VOTE_WRITE_BEHIND=write_behind):
+                    elapsed = self.run(users, posts, threads)
+                    vote_buffer.stop()
+
+                votes = len(users) * len(posts)
+                self.stdout.write(
+                    f"{label:<16} {votes / elapsed:10.1f} votes/sec "
+                    f"({votes} votes, {threads} threads)"
+                )
+        finally:
+            board.delete()
+            User.objects.filter(username__startswith="bench_vote_user_").delete()
+
+    def run(self, users, posts, threads):
+        def vote(user):
+            try:
+                for index, post in enumerate(posts):
+                    PostVotedUser(
+                        user=user, post=post, is_upvoted=(user.pk + index) % 4 != 0
+                    ).save()
+            finally:
+                connection.close()
+
+        start = perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(vote, users))
+        return perf_counter() - start
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from boards.models import Board
+from common.ndjson import export_rows
+from posts.models import Post, PostVotedUser
+
+
+class Command(BaseCommand):
+    """Export boards, posts and votes as newline delimited JSON
+    Tables are streamed with chunked iterators one row per line, so memory
+    stays flat regardless of table size unlike dumpdata. Boards come first
+    and votes last, so import_ndjson can insert them in order.
+    Users aren't exported, the target database must already have them.
+    """
+
+    help = "Stream boards, posts and voted_posts rows as NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="-", help="File path to write, - for stdout"
+        )
+        parser.add_argument(
+            "--board",
+            action="append",
+            dest="boards",
+            help="Only export the given board path (repeatable)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        boards = Board.objects.all()
+        posts = Post.objects.all()
+        votes = PostVotedUser.objects.all()
+        if options["boards"]:
+            boards = boards.filter(pk__in=options["boards"])
+            posts = posts.filter(board__in=options["boards"])
+            votes = votes.filter(post__board__in=options["boards"])
+
+        if options["output"] == "-":
+            counts = self.export(self.stdout, (boards, posts, votes), options)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                counts = self.export(stream, (boards, posts, votes), options)
+
+        self.stderr.write(
+            self.style.SUCCESS("Exported {} boards, {} posts, {} votes".format(*counts))
+        )
+
+    def export(self, stream, querysets, options):
+        return [
+            export_rows(queryset, stream, options["chunk_size"])
+            for queryset in querysets
+        ]
@@ -0,0 +1,75 @@
+import sys
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from boards.models import Board
+from comments.models import Comment
+from common.ndjson import preserve_timestamps, read_batches, reset_sequences
+from posts.models import Post, PostVotedUser
+from posts.reconcile import reconcile_votes
+
+MODELS = (Board, Post, PostVotedUser)
+
+
+class Command(BaseCommand):
+    """Import boards, posts and votes written by export_ndjson
+    Lines are read one at a time and inserted with bulk_create batches, so
+    memory stays flat. bulk_create skips save() and signals: no Board path
+    cleanup, no per vote counter updates and no timestamp overwrite.
+    Denormalized counters are recomputed once at the end instead.
+    Everything runs in one transaction, a bad line imports nothing.
+    """
+
+    help = "Bulk load boards, posts and voted_posts rows from NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File path to read, - for stdin")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["input"] == "-":
+            counts = self.load(sys.stdin, options["batch_size"])
+        else:
+            with open(options["input"], encoding="utf-8") as stream:
+                counts = self.load(stream, options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {} boards, {} posts, {} votes".format(
+                    *(counts[model] for model in MODELS)
+                )
+            )
+        )
+
+    def load(self, stream, batch_size):
+        counts = dict.fromkeys(MODELS, 0)
+
+        try:
+            with transaction.atomic(), preserve_timestamps(*MODELS):
+                for model, batch in read_batches(stream, MODELS, batch_size):
+                    model.objects.bulk_create(batch)
+                    counts[model] += len(batch)
+
+                reset_sequences(MODELS)
+                self.recount()
+        except ValueError as error:
+            raise CommandError(error)
+
+        return counts
+
+    def recount(self):
+        call_command("recount_posts", stdout=self.stdout)
+
+        comment_counts = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        Post.objects.update(comment_count=Coalesce(Subquery(comment_counts), 0))
+
+        for line in reconcile_votes().lines():
+            self.stdout.write(line)
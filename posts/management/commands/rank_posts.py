@@ -0,0 +1,63 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from common.routers import post_databases
+from posts.models import Post
+from posts.ranking import hot_score
+
+
+class Command(BaseCommand):
+    """Recompute Post's denormalized hot_score field
+    Votes keep hot_score up to date incrementally, so this periodic job only
+    repairs scores changed outside PostVotedUser.save (admin edits, raw SQL)
+    or rescores everything after the ranking formula changes.
+    Posts are read in primary key chunks and only changed scores are written.
+    Every post shard is rescored in turn.
+    """
+
+    help = "Recompute hot_score of posts in primary key chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since-hours",
+            type=int,
+            default=None,
+            help="Only rescore posts updated within the given hours",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only("upvote", "downvote", "created_at", "hot_score")
+        if options["since_hours"] is not None:
+            since = timezone.now() - timedelta(hours=options["since_hours"])
+            queryset = queryset.filter(updated_at__gte=since)
+
+        chunk_size = options["chunk_size"]
+        checked = changed = 0
+
+        for alias in post_databases():
+            last_pk = 0
+            while True:
+                posts = list(
+                    queryset.using(alias)
+                    .filter(pk__gt=last_pk)
+                    .order_by("pk")[:chunk_size]
+                )
+                if not posts:
+                    break
+
+                stale = []
+                for post in posts:
+                    score = hot_score(post.upvote, post.downvote, post.created_at)
+                    if score != post.hot_score:
+                        post.hot_score = score
+                        stale.append(post)
+
+                Post.objects.using(alias).bulk_update(stale, ["hot_score"])
+                checked += len(posts)
+                changed += len(stale)
+                last_pk = posts[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} posts, rescored {changed} posts")
+        )
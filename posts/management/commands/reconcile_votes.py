@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from posts.reconcile import reconcile_votes_since_last_run
+
+
+class Command(BaseCommand):
+    """Reconcile Post's denormalized upvote and downvote counters
+    voted_posts is the source of truth. Votes are recounted with grouped
+    aggregate queries per chunk of posts and drifted counters are fixed with
+    bulk updates. Only posts edited, voted or unvoted since the last run are
+    checked unless --full is given.
+    With VOTE_WRITE_BEHIND, this process's buffered deltas are flushed first
+    and posts touched within VOTE_RECONCILE_SETTLE seconds are left to the
+    next run, so deltas still buffered in workers aren't counted twice.
+    """
+
+    help = (
+        "Recount post votes and report counter drift. With VOTE_WRITE_BEHIND, "
+        "posts touched within VOTE_RECONCILE_SETTLE seconds (default 60) are "
+        "left to the next run, since workers may still buffer their deltas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Check every post, not only touched"
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report drift without fixing it"
+        )
+
+    def handle(self, *args, **options):
+        report = reconcile_votes_since_last_run(
+            full=options["full"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+
+        lines = list(report.lines())
+        style = self.style.WARNING if report.corrected else self.style.SUCCESS
+        self.stdout.write(style(lines[0]))
+        for line in lines[1:]:
+            self.stdout.write(line)
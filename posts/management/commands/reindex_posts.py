@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from common.routers import fan_out
+from posts.search import Fts5SearchBackend, get_search_backend
+
+
+class Command(BaseCommand):
+    """Rebuild post search index
+    Posts table is streamed in primary key chunks into the active backend
+    (posts_fts for fts5, in-memory index for python). Every post shard has
+    its own posts_fts.
+    """
+
+    help = "Rebuild post search index in primary key chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if isinstance(backend, Fts5SearchBackend):
+            indexed = sum(fan_out(backend.reindex, chunk_size=options["chunk_size"]))
+        else:
+            indexed = backend.reindex(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} posts with {backend.name} backend")
+        )
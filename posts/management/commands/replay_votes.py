@@ -0,0 +1,29 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from posts.buffer import replay_votes
+
+
+class Command(BaseCommand):
+    """Rebuild post vote counters from voted_posts rows
+    Recovery job for VOTE_WRITE_BEHIND, run after a process holding buffered
+    deltas crashed and before workers start buffering again.
+    """
+
+    help = "Recompute upvote, downvote and hot_score of posts from their votes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since-minutes",
+            type=int,
+            default=None,
+            help="Only recompute posts voted within the given minutes",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since_minutes"] is not None:
+            since = timezone.now() - timedelta(minutes=options["since_minutes"])
+
+        count = replay_votes(since)
+        self.stdout.write(self.style.SUCCESS(f"Replayed votes of {count} posts"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts.synthetic import generate
+
+
+class Command(BaseCommand):
+    """Seed a development database with reproducible synthetic data
+    Rows are committed, unlike the bench_* commands which roll them back.
+    Run it with a different --seed to add another independent data set.
+    """
+
+    help = "Generate users, boards, posts and votes with skewed activity"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--boards", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--votes", type=int, default=100000)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = generate(
+                users=options["users"],
+                boards=options["boards"],
+                posts=options["posts"],
+                votes=options["votes"],
+                seed=options["seed"],
+                days=options["days"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Seeded {users} users, {boards} boards, {posts} posts, "
+                "{votes} votes".format(**counts)
+            )
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_auto_20200621_0928'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['board', 'created_at', 'id'], name='posts_board_created_idx'),
+        ),
+    ]
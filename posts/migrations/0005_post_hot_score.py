@@ -0,0 +1,32 @@
+# Generated by Django 3.1 on 2026-10-18 07:31
+
+from django.db import migrations, models
+from posts.ranking import hot_score
+
+
+def fill_hot_score(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.only('upvote', 'downvote', 'created_at')
+    for post in posts.iterator():
+        post.hot_score = hot_score(post.upvote, post.downvote, post.created_at)
+        post.save(update_fields=['hot_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_posts_board_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['board', 'hot_score', 'id'], name='posts_board_hot_idx'),
+        ),
+        migrations.RunPython(fill_hot_score, migrations.RunPython.noop),
+    ]
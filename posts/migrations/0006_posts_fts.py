@@ -0,0 +1,28 @@
+# Generated by Django 3.1 on 2026-10-18 08:00
+
+from django.db import migrations
+from posts.search import FTS_TRIGGERS, ensure_fts_schema
+
+
+def create_posts_fts(apps, schema_editor):
+    ensure_fts_schema(schema_editor.connection)
+
+
+def drop_posts_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for trigger in FTS_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    schema_editor.execute('DROP TABLE IF EXISTS posts_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_posts_fts, drop_posts_fts),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_posts_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
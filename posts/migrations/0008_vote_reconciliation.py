@@ -0,0 +1,37 @@
+# Generated by Django 3.1 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteReconciliation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('full', models.BooleanField(default=False)),
+                ('checked', models.PositiveIntegerField(default=0)),
+                ('corrected', models.PositiveIntegerField(default=0)),
+                ('upvote_drift', models.IntegerField(default=0)),
+                ('downvote_drift', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'vote_reconciliations',
+                'get_latest_by': 'started_at',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at'], name='posts_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postvoteduser',
+            index=models.Index(fields=['updated_at'], name='voted_posts_updated_idx'),
+        ),
+    ]
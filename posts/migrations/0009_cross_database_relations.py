@@ -0,0 +1,32 @@
+# Generated by Django 3.1 on 2026-10-18 08:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0008_vote_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='board',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='boards.board'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='create_user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='users', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='postvoteduser',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='vote_users', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_cross_database_relations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='viewers',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -1,5 +1,11 @@
-from django.db import models
+from functools import partial
+from django.db import models, router, transaction
+from django.utils import timezone
 from common.models import AbstractTimeStamp
+from common.routers import ShardedQuerySet
+from boards.models import Board
+from posts.ranking import hot_score
+from posts.trending import trending
 
 
 class Post(AbstractTimeStamp):
@@ -7,36 +13,140 @@ class Post(AbstractTimeStamp):
     Inherit:
         AbstractTimeStamp
     Fields:
-        create_user : User model (1:N)
-        board       : Board model (1:N)
-        voted_post  : VotedPost model (M:N)
-        title       : CharField
-        content     : TextField
-        upvote      : PositiveIntegerField
-        downvote    : PositiveIntegerField
+        create_user      : User model (1:N)
+        board            : Board model (1:N)
+        voted_post       : VotedPost model (M:N)
+        title            : CharField
+        content          : TextField
+        upvote           : PositiveIntegerField
+        downvote         : PositiveIntegerField
+        hot_score        : FloatField (Denormalized)
+        comment_count    : PositiveIntegerField (Denormalized)
+        viewers          : BinaryField (HyperLogLog sketch of unique viewers)
     Methods:
-        __str__     : Return post's title
+        __str__          : Return post's title
+        from_db          : Remember loaded board to detect board changes
+        save             : Set initial hot_score and update boards' post_count
+                           Count committed new posts in trending boards
+                           Never overwrite denormalized fields on update
+                           Refuse moving post to a board of another shard
+        update_hot_score : Recompute hot_score from stored vote counters
+        unique_views     : Return estimated unique viewers
     Meta :
-        db_table    : posts
+        db_table         : posts
+        indexes          : board, created_at, id (Board post listing)
+                           board, hot_score, id (Board hot post listing)
+                           updated_at (Incremental vote reconciliation)
     """
 
+    # Posts may live in shards apart from users and boards (common.routers)
     create_user = models.ForeignKey(
-        "users.User", related_name="users", on_delete=models.CASCADE
+        "users.User",
+        related_name="users",
+        on_delete=models.CASCADE,
+        db_constraint=False,
     )
     board = models.ForeignKey(
-        "boards.Board", related_name="posts", on_delete=models.CASCADE
+        "boards.Board",
+        related_name="posts",
+        on_delete=models.CASCADE,
+        db_constraint=False,
     )
     post_voted_user = models.ManyToManyField("users.User", through="PostVotedUser")
     title = models.CharField(max_length=100)
     content = models.TextField()
     upvote = models.PositiveIntegerField(default=0)
     downvote = models.PositiveIntegerField(default=0)
+    hot_score = models.FloatField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    viewers = models.BinaryField(null=True, editable=False)
+
+    objects = ShardedQuerySet.as_manager()
+
+    DENORMALIZED_FIELDS = ("hot_score", "comment_count", "viewers")
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get("board_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        loaded_board_id = getattr(self, "_loaded_board_id", None)
+
+        if adding:
+            self.hot_score = hot_score(
+                self.upvote, self.downvote, self.created_at or timezone.now()
+            )
+        elif not kwargs.get("force_insert") and kwargs.get("update_fields") is None:
+            # Denormalized fields are maintained with queryset updates,
+            # so a stale in-memory value must not be written back
+            skipped = self.get_deferred_fields().union(self.DENORMALIZED_FIELDS)
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+
+        using = kwargs.get("using") or router.db_for_write(Post, instance=self)
+        if (
+            loaded_board_id is not None
+            and loaded_board_id != self.board_id
+            and router.db_for_write(Post, instance=Post(board_id=self.board_id))
+            != using
+        ):
+            raise ValueError("Post can't move to a board of another shard")
+
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+            if adding:
+                Board.objects.filter(pk=self.board_id).update(
+                    post_count=models.F("post_count") + 1
+                )
+                transaction.on_commit(
+                    partial(trending.record_post, self.pk, self.board_id), using=using
+                )
+            elif loaded_board_id is not None and loaded_board_id != self.board_id:
+                Board.objects.filter(pk=loaded_board_id, post_count__gt=0).update(
+                    post_count=models.F("post_count") - 1
+                )
+                Board.objects.filter(pk=self.board_id).update(
+                    post_count=models.F("post_count") + 1
+                )
+
+        self._loaded_board_id = self.board_id
+
+    def update_hot_score(self):
+        posts = Post.objects.db_manager(router.db_for_write(Post, instance=self))
+        upvote, downvote, created_at = posts.values_list(
+            "upvote", "downvote", "created_at"
+        ).get(pk=self.pk)
+
+        self.hot_score = hot_score(upvote, downvote, created_at)
+        posts.filter(pk=self.pk).update(hot_score=self.hot_score)
+        return self.hot_score
+
+    def unique_views(self):
+        from posts.unique_views import unique_views
+
+        return unique_views.post_views(self.pk, self.viewers)
+
     class Meta:
         db_table = "posts"
+        indexes = [
+            models.Index(
+                fields=["board", "created_at", "id"], name="posts_board_created_idx"
+            ),
+            models.Index(
+                fields=["board", "hot_score", "id"], name="posts_board_hot_idx"
+            ),
+            models.Index(fields=["updated_at"], name="posts_updated_idx"),
+        ]
 
 
 class PostVotedUser(AbstractTimeStamp):
@@ -49,20 +159,28 @@ class PostVotedUser(AbstractTimeStamp):
         is_upvoted      : BooleanField
     Methods:
         __str__         : Return voted post's info
-        save            : Update post object according to is_upvoted
+        from_db         : Remember loaded is_upvoted to detect flipped votes
+        save            : Update post's vote counters and hot_score by is_upvoted
+                          (see posts.votes for cast, flip and retract)
     Meta:
         unique_together : user, post
         db_table        : voted_posts
+        indexes         : updated_at (Incremental vote reconciliation)
     """
 
     user = models.ForeignKey(
-        "users.User", related_name="vote_users", on_delete=models.CASCADE
+        "users.User",
+        related_name="vote_users",
+        on_delete=models.CASCADE,
+        db_constraint=False,
     )
     post = models.ForeignKey(
         "posts.Post", related_name="vote_posts", on_delete=models.CASCADE
     )
     is_upvoted = models.BooleanField(default=True)
 
+    objects = ShardedQuerySet.as_manager()
+
     def __str__(self):
         user = f"USER({self.user})"
         post = f"POST({self.post})"
@@ -71,15 +189,73 @@ class PostVotedUser(AbstractTimeStamp):
 
         return f"{user} / {post} / {board} -> {stat}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_upvoted = instance.__dict__.get("is_upvoted")
+        return instance
+
     def save(self, *args, **kwargs):
-        if self.is_upvoted:
-            self.post.upvote = models.F("upvote") + 1
+        from posts.votes import (
+            UNCHANGED,
+            apply_vote_change,
+            flip_change,
+            invalidate_viewer_votes,
+            loaded_board_id,
+            vote_change,
+        )
+
+        loaded_is_upvoted = getattr(self, "_loaded_is_upvoted", None)
+        if self._state.adding:
+            change = vote_change(self.is_upvoted)
+        elif loaded_is_upvoted is not None and loaded_is_upvoted != self.is_upvoted:
+            change = flip_change(self.is_upvoted)
         else:
-            self.post.downvote = models.F("downvote") + 1
+            change = UNCHANGED
 
-        self.post.save()
-        super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(PostVotedUser, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            post = self._state.fields_cache.get("post")
+            apply_vote_change(self.post_id, change, loaded_board_id(post))
+            if change != UNCHANGED:
+                invalidate_viewer_votes(self.user_id, using)
+
+        self._loaded_is_upvoted = self.is_upvoted
 
     class Meta:
         unique_together = (("user", "post"),)
         db_table = "voted_posts"
+        indexes = [models.Index(fields=["updated_at"], name="voted_posts_updated_idx")]
+
+
+class VoteReconciliation(models.Model):
+    """Vote Counter Reconciliation Run Model
+    Record of reconcile_votes runs, the last one bounds the next incremental run
+    Fields:
+        started_at     : DateTimeField
+        full           : BooleanField (Every post was checked)
+        checked        : PositiveIntegerField (Checked post count)
+        corrected      : PositiveIntegerField (Corrected post count)
+        upvote_drift   : IntegerField (Stored minus counted upvotes)
+        downvote_drift : IntegerField (Stored minus counted downvotes)
+    Methods:
+        __str__        : Return run's start time and corrected post count
+    Meta:
+        db_table       : vote_reconciliations
+        get_latest_by  : started_at
+    """
+
+    started_at = models.DateTimeField()
+    full = models.BooleanField(default=False)
+    checked = models.PositiveIntegerField(default=0)
+    corrected = models.PositiveIntegerField(default=0)
+    upvote_drift = models.IntegerField(default=0)
+    downvote_drift = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M:%S} -> {self.corrected} corrected"
+
+    class Meta:
+        db_table = "vote_reconciliations"
+        get_latest_by = "started_at"
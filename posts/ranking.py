@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from math import log10
+
+HOT_SCORE_EPOCH = datetime(2020, 6, 21, tzinfo=timezone.utc)
+HOT_SCORE_HALF_LIFE = 45000
+
+
+def hot_score(upvote, downvote, created_at):
+    """Return time-decayed hot score of post
+    Vote term grows logarithmically and time term linearly from HOT_SCORE_EPOCH,
+    so a post needs 10x votes to beat one HOT_SCORE_HALF_LIFE seconds newer.
+    Decay is relative between posts, so a stored score never goes stale
+    and only has to change when the post's votes change.
+    """
+    score = upvote - downvote
+    order = log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    seconds = (created_at - HOT_SCORE_EPOCH).total_seconds()
+
+    return round(sign * order + seconds / HOT_SCORE_HALF_LIFE, 7)
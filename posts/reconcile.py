@@ -0,0 +1,205 @@
+from collections import Counter
+from datetime import timedelta
+import os
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from common.routers import post_databases, use_shard
+from posts.models import Post, PostVotedUser, VoteReconciliation
+from posts.ranking import hot_score
+
+DRIFT_BUCKETS = (1, 10, 100, 1000)
+# Seconds a vote may wait in another process's VOTE_WRITE_BEHIND buffer
+VOTE_RECONCILE_SETTLE = float(os.environ.get("VOTE_RECONCILE_SETTLE", 60))
+
+
+class DriftReport:
+    """Drift of stored vote counters from voted_posts rows
+    Fields:
+        checked        : Checked post count
+        corrected      : Post count whose counters differed
+        upvote_drift   : Sum of stored minus counted upvotes
+        downvote_drift : Sum of stored minus counted downvotes
+        largest        : Largest absolute drift of a single counter
+        buckets        : Corrected post count by largest drift bucket
+    Methods:
+        add            : Count drift of one post
+        lines          : Return printable report lines
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.corrected = 0
+        self.upvote_drift = 0
+        self.downvote_drift = 0
+        self.largest = 0
+        self.buckets = Counter()
+
+    def add(self, upvote_drift, downvote_drift):
+        self.checked += 1
+        if not (upvote_drift or downvote_drift):
+            return
+
+        drift = max(abs(upvote_drift), abs(downvote_drift))
+        self.corrected += 1
+        self.upvote_drift += upvote_drift
+        self.downvote_drift += downvote_drift
+        self.largest = max(self.largest, drift)
+        self.buckets[self.bucket(drift)] += 1
+
+    @staticmethod
+    def bucket(drift):
+        lower = 1
+        for upper in DRIFT_BUCKETS:
+            if drift <= upper:
+                return f"{lower}-{upper}" if lower != upper else f"{upper}"
+            lower = upper + 1
+        return f">{DRIFT_BUCKETS[-1]}"
+
+    def lines(self):
+        yield (
+            f"Checked {self.checked} posts, corrected {self.corrected} posts "
+            f"(upvote drift {self.upvote_drift:+d}, "
+            f"downvote drift {self.downvote_drift:+d}, largest {self.largest})"
+        )
+        labels = [self.bucket(upper) for upper in DRIFT_BUCKETS]
+        labels.append(f">{DRIFT_BUCKETS[-1]}")
+        for label in labels:
+            if self.buckets[label]:
+                yield f"  drift {label:>9}: {self.buckets[label]} posts"
+
+
+def reconcile_posts(post_ids, report, dry_run=False):
+    """Recount votes of posts with one grouped query and fix drifted counters
+    Posts are locked before counting, so votes committed meanwhile wait for
+    their counter update until corrections are written.
+    Posts are looked up in the current use_shard database.
+    """
+    using = router.db_for_write(Post)
+    with transaction.atomic(using=using):
+        posts = list(
+            Post.objects.using(using)
+            .select_for_update()
+            .filter(pk__in=post_ids)
+            .only("upvote", "downvote", "created_at", "hot_score")
+            .order_by("pk")
+        )
+        counts = {
+            row["post"]: (row["up"], row["down"])
+            for row in PostVotedUser.objects.using(using)
+            .filter(post__in=post_ids)
+            .values("post")
+            .annotate(
+                up=Count("pk", filter=Q(is_upvoted=True)),
+                down=Count("pk", filter=Q(is_upvoted=False)),
+            )
+            .order_by()
+        }
+
+        stale = []
+        for post in posts:
+            upvote, downvote = counts.get(post.pk, (0, 0))
+            report.add(post.upvote - upvote, post.downvote - downvote)
+
+            score = hot_score(upvote, downvote, post.created_at)
+            if (post.upvote, post.downvote, post.hot_score) != (
+                upvote,
+                downvote,
+                score,
+            ):
+                post.upvote, post.downvote, post.hot_score = upvote, downvote, score
+                stale.append(post)
+
+        if not dry_run:
+            Post.objects.using(using).bulk_update(
+                stale, ["upvote", "downvote", "hot_score"]
+            )
+
+
+def touched_post_ids(since):
+    """Return ids of posts edited, voted or unvoted since the given datetime"""
+    voted = PostVotedUser.objects.filter(updated_at__gte=since).values_list(
+        "post_id", flat=True
+    )
+    edited = Post.objects.filter(updated_at__gte=since).values_list("pk", flat=True)
+    return sorted(set(voted).union(edited))
+
+
+def reconcile_votes(since=None, chunk_size=1000, dry_run=False, until=None):
+    """Reconcile post vote counters with voted_posts rows
+    Every post is walked in primary key (keyset) chunks when since is None,
+    otherwise only posts edited or voted since then. Every post shard is
+    reconciled in turn.
+    Deltas buffered by this process (VOTE_WRITE_BEHIND) are flushed first,
+    writing true totals under them would count them twice. Other processes'
+    buffers are out of reach, posts touched at or after until are skipped
+    so their pending deltas land first.
+    Return DriftReport.
+    """
+    if settings.VOTE_WRITE_BEHIND:
+        from posts.buffer import vote_buffer
+
+        vote_buffer.flush()
+
+    report = DriftReport()
+    for alias in post_databases():
+        with use_shard(alias):
+            reconcile_database(report, since, chunk_size, dry_run, until)
+    return report
+
+
+def reconcile_database(report, since, chunk_size, dry_run, until=None):
+    settling = set(touched_post_ids(until)) if until is not None else set()
+
+    if since is not None:
+        post_ids = [pk for pk in touched_post_ids(since) if pk not in settling]
+        for start in range(0, len(post_ids), chunk_size):
+            reconcile_posts(post_ids[start : start + chunk_size], report, dry_run)
+        return
+
+    last_pk = 0
+    while True:
+        post_ids = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not post_ids:
+            return
+
+        checked = [pk for pk in post_ids if pk not in settling]
+        if checked:
+            reconcile_posts(checked, report, dry_run)
+        last_pk = post_ids[-1]
+
+
+def reconcile_votes_since_last_run(full=False, chunk_size=1000, dry_run=False):
+    """Run reconcile_votes over posts touched since the last recorded run
+    The first run, or a full one, checks every post. Deleted votes touch
+    their post's updated_at, so incremental runs see them too.
+    With VOTE_WRITE_BEHIND, posts touched within VOTE_RECONCILE_SETTLE seconds
+    may have deltas buffered in workers. They are skipped and the run is
+    recorded as started before them, so the next run checks them.
+    Return DriftReport.
+    """
+    started_at, until = timezone.now(), None
+    if settings.VOTE_WRITE_BEHIND:
+        started_at = until = started_at - timedelta(seconds=VOTE_RECONCILE_SETTLE)
+    last_run = VoteReconciliation.objects.order_by("-started_at").first()
+    full = full or last_run is None
+    since = None if full else last_run.started_at
+
+    report = reconcile_votes(since, chunk_size, dry_run, until)
+
+    if not dry_run:
+        VoteReconciliation.objects.create(
+            started_at=started_at,
+            full=full,
+            checked=report.checked,
+            corrected=report.corrected,
+            upvote_drift=report.upvote_drift,
+            downvote_drift=report.downvote_drift,
+        )
+
+    return report
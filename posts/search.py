@@ -0,0 +1,473 @@
+from collections import defaultdict
+from heapq import nsmallest
+from math import log
+from threading import RLock
+import re
+from django.conf import settings
+from django.core import signing
+from django.db import connection, connections, router
+from django.utils.html import escape
+
+SEARCH_CURSOR_SALT = "posts.search.cursor"
+SEARCH_RESULT_FIELDS = (
+    "id",
+    "title",
+    "create_user",
+    "upvote",
+    "downvote",
+    "hot_score",
+    "created_at",
+)
+TITLE_WEIGHT = 10.0
+SNIPPET_TOKENS = 16
+MARK_START, MARK_END = "\x02", "\x03"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, content, content='posts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, content
+    ON posts WHEN old.title IS NOT new.title OR old.content IS NOT new.content
+    BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO posts_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+)
+FTS_TRIGGERS = ("posts_fts_insert", "posts_fts_delete", "posts_fts_update")
+
+
+class InvalidSearchCursor(Exception):
+    """Raised when a search cursor can't be decoded or belongs to other query"""
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def render_highlight(text):
+    """Escape text and turn match markers into <mark> tags"""
+    return escape(text).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def encode_search_cursor(query, board_id, rank, post_id):
+    return signing.dumps(
+        {"q": query, "b": board_id, "v": [rank, post_id]}, salt=SEARCH_CURSOR_SALT
+    )
+
+
+def decode_search_cursor(cursor, query, board_id):
+    try:
+        data = signing.loads(cursor, salt=SEARCH_CURSOR_SALT)
+        rank, post_id = float(data["v"][0]), int(data["v"][1])
+    except (signing.BadSignature, KeyError, IndexError, TypeError, ValueError):
+        raise InvalidSearchCursor("Cursor is malformed")
+
+    if data.get("q") != query or data.get("b") != board_id:
+        raise InvalidSearchCursor("Cursor doesn't belong to this search")
+
+    return rank, post_id
+
+
+def fts_available(using_connection=None):
+    using_connection = using_connection or connection
+    if using_connection.vendor != "sqlite":
+        return False
+
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        )
+        return cursor.fetchone() is not None
+
+
+def ensure_fts_schema(using_connection):
+    """Create posts_fts table and its sync triggers when missing
+    SQLite migrations rebuild altered tables, which drops their triggers,
+    so this also runs after every migrate and rebuilds the index when
+    a trigger had to be recreated.
+    Return False when the backend has no FTS5 support.
+    """
+    if using_connection.vendor != "sqlite":
+        return False
+
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'trigger' AND tbl_name = 'posts'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+        try:
+            for statement in FTS_SCHEMA:
+                cursor.execute(statement)
+        except Exception:
+            return False
+
+        if not existing.issuperset(FTS_TRIGGERS):
+            cursor.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+    return True
+
+
+class SearchPage:
+    """Single page of search results
+    Fields:
+        items : Result dicts with title_highlight, snippet and rank
+        next  : Cursor of the following results or None
+    """
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next = next_cursor
+
+
+class BaseSearchBackend:
+    """Post search backend interface
+    Results are ordered by (rank, id), lower rank is more relevant,
+    and paginated by a signed (rank, id) cursor.
+
+    Methods:
+        search  : Return SearchPage of board's posts matching query
+        reindex : Rebuild index by streaming posts table in primary key chunks
+    """
+
+    name = None
+
+    def search(self, query, board_id, cursor=None, page_size=20):
+        after = None
+        if cursor is not None:
+            after = decode_search_cursor(cursor, query, board_id)
+
+        terms = tokenize(query)
+        if not terms:
+            return SearchPage([], None)
+
+        items = self.find(terms, board_id, after, page_size + 1)
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            last = items[-1]
+            next_cursor = encode_search_cursor(
+                query, board_id, last["rank"], last["id"]
+            )
+
+        return SearchPage(items, next_cursor)
+
+    def find(self, terms, board_id, after, limit):
+        raise NotImplementedError
+
+    def reindex(self, chunk_size=2000):
+        raise NotImplementedError
+
+
+class Fts5SearchBackend(BaseSearchBackend):
+    """SQLite FTS5 search backend
+    posts_fts is an external content index over posts kept in sync by triggers,
+    ranked by bm25 with title weighted over content.
+    """
+
+    name = "fts5"
+
+    def find(self, terms, board_id, after, limit):
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        rank = f"bm25(posts_fts, {TITLE_WEIGHT}, 1.0)"
+        columns = ", ".join(
+            f"posts.{field}_id" if field == "create_user" else f"posts.{field}"
+            for field in SEARCH_RESULT_FIELDS
+        )
+        sql = (
+            f"SELECT {columns}, "
+            f"highlight(posts_fts, 0, '{MARK_START}', '{MARK_END}'), "
+            f"snippet(posts_fts, 1, '{MARK_START}', '{MARK_END}', '...', "
+            f"{SNIPPET_TOKENS}), {rank} "
+            "FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid "
+            "WHERE posts_fts MATCH %s AND posts.board_id = %s "
+        )
+        params = [match, board_id]
+
+        if after is not None:
+            sql += f"AND ({rank} > %s OR ({rank} = %s AND posts.id > %s)) "
+            params += [after[0], after[0], after[1]]
+
+        sql += f"ORDER BY {rank}, posts.id LIMIT %s"
+        params.append(limit)
+
+        from posts.models import Post
+
+        # Board's shard or, inside replica_reads, a replica
+        connection = connections[router.db_for_read(Post)]
+        items = []
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():
+                item = dict(zip(SEARCH_RESULT_FIELDS, row))
+                item["created_at"] = connection.ops.convert_datetimefield_value(
+                    item["created_at"], None, connection
+                )
+                title, snippet, score = row[len(SEARCH_RESULT_FIELDS) :]
+                item["title_highlight"] = render_highlight(title)
+                item["snippet"] = render_highlight(snippet)
+                item["rank"] = score
+                items.append(item)
+
+        return items
+
+    def reindex(self, chunk_size=2000):
+        from posts.models import Post
+
+        indexed = 0
+        last_pk = 0
+
+        with connections[router.db_for_write(Post)].cursor() as cursor:
+            cursor.execute("INSERT INTO posts_fts(posts_fts) VALUES ('delete-all')")
+            while True:
+                cursor.execute(
+                    "SELECT MAX(id), COUNT(*) FROM (SELECT id FROM posts "
+                    "WHERE id > %s ORDER BY id LIMIT %s)",
+                    [last_pk, chunk_size],
+                )
+                max_pk, count = cursor.fetchone()
+                if not count:
+                    break
+
+                cursor.execute(
+                    "INSERT INTO posts_fts(rowid, title, content) "
+                    "SELECT id, title, content FROM posts WHERE id > %s AND id <= %s",
+                    [last_pk, max_pk],
+                )
+                indexed += count
+                last_pk = max_pk
+
+        return indexed
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """Pure Python in-memory inverted index search backend
+    Fallback for databases without FTS5. Index is built lazily from the posts
+    table and kept in sync by Post signals of this process, ranked by BM25
+    over title (weighted) and content terms. Bulk writes bypassing signals
+    or other processes' writes need reindex.
+    """
+
+    name = "python"
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = RLock()
+        self.built = False
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.total_length = 0.0
+
+    def find(self, terms, board_id, after, limit):
+        self.build()
+
+        with self.lock:
+            postings = [self.postings.get(term, {}) for term in set(terms)]
+            if not all(postings):
+                return []
+
+            postings.sort(key=len)
+            candidates = [
+                post_id
+                for post_id in postings[0]
+                if self.documents[post_id][0] == board_id
+                and all(post_id in posting for posting in postings[1:])
+            ]
+
+            count = len(self.documents)
+            average = self.total_length / count
+            idf = [log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+
+            ranked = []
+            for post_id in candidates:
+                length = self.documents[post_id][1]
+                norm = self.k1 * (1 - self.b + self.b * length / average)
+                score = 0.0
+                for weight, posting in zip(idf, postings):
+                    frequency = posting[post_id]
+                    score += weight * frequency * (self.k1 + 1) / (frequency + norm)
+                ranked.append((-score, post_id))
+
+        if after is not None:
+            ranked = [item for item in ranked if item > after]
+
+        ranked = nsmallest(limit, ranked)
+        return self.render(ranked, set(terms))
+
+    def render(self, ranked, terms):
+        from posts.models import Post
+
+        rows = Post.objects.filter(pk__in=[post_id for _, post_id in ranked]).values(
+            *SEARCH_RESULT_FIELDS, "content"
+        )
+        rows = {row["id"]: row for row in rows}
+
+        items = []
+        for rank, post_id in ranked:
+            item = rows.get(post_id)
+            if item is None:
+                continue
+            content = item.pop("content")
+            item["title_highlight"] = render_highlight(self.mark(item["title"], terms))
+            item["snippet"] = render_highlight(self.snippet(content, terms))
+            item["rank"] = rank
+            items.append(item)
+
+        return items
+
+    @staticmethod
+    def mark(text, terms):
+        return TOKEN_PATTERN.sub(
+            lambda match: (
+                f"{MARK_START}{match.group()}{MARK_END}"
+                if match.group().lower() in terms
+                else match.group()
+            ),
+            text,
+        )
+
+    def snippet(self, text, terms):
+        matches = list(TOKEN_PATTERN.finditer(text))
+        first = next(
+            (i for i, match in enumerate(matches) if match.group().lower() in terms), 0
+        )
+        start = max(0, first - SNIPPET_TOKENS // 4)
+        window = matches[start : start + SNIPPET_TOKENS]
+        if not window:
+            return ""
+
+        begin, end = window[0].start(), window[-1].end()
+        snippet = self.mark(text[begin:end], terms)
+        prefix = "..." if begin > 0 else ""
+        suffix = "..." if end < len(text) else ""
+        return f"{prefix}{snippet}{suffix}"
+
+    def build(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    self.reindex()
+
+    def reindex(self, chunk_size=2000):
+        from common.routers import post_databases
+        from posts.models import Post
+
+        with self.lock:
+            self.postings = defaultdict(dict)
+            self.documents = {}
+            self.total_length = 0.0
+
+            fields = ("id", "board_id", "title", "content")
+            for alias in post_databases():
+                last_pk = 0
+                while True:
+                    rows = list(
+                        Post.objects.using(alias)
+                        .filter(pk__gt=last_pk)
+                        .order_by("pk")
+                        .values_list(*fields)[:chunk_size]
+                    )
+                    if not rows:
+                        break
+                    for post_id, board_id, title, content in rows:
+                        self.add(post_id, board_id, title, content)
+                    last_pk = rows[-1][0]
+
+            self.built = True
+            return len(self.documents)
+
+    def add(self, post_id, board_id, title, content):
+        with self.lock:
+            self.remove(post_id)
+
+            frequencies = defaultdict(float)
+            for term in tokenize(title):
+                frequencies[term] += TITLE_WEIGHT
+            for term in tokenize(content):
+                frequencies[term] += 1
+
+            for term, frequency in frequencies.items():
+                self.postings[term][post_id] = frequency
+
+            length = sum(frequencies.values())
+            self.documents[post_id] = (board_id, length, tuple(frequencies))
+            self.total_length += length
+
+    def remove(self, post_id):
+        with self.lock:
+            document = self.documents.pop(post_id, None)
+            if document is None:
+                return
+
+            self.total_length -= document[1]
+            for term in document[2]:
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(post_id, None)
+                    if not posting:
+                        del self.postings[term]
+
+
+_backends = {}
+_auto_backend_name = None
+
+
+def get_search_backend():
+    """Return configured post search backend
+    POST_SEARCH_BACKEND setting: fts5, python or auto (fts5 when posts_fts exists)
+    """
+    global _auto_backend_name
+
+    name = getattr(settings, "POST_SEARCH_BACKEND", "auto")
+    if name == "auto":
+        if _auto_backend_name is None:
+            _auto_backend_name = (
+                Fts5SearchBackend.name
+                if fts_available()
+                else InvertedIndexSearchBackend.name
+            )
+        name = _auto_backend_name
+
+    if name not in _backends:
+        backend_class = {
+            Fts5SearchBackend.name: Fts5SearchBackend,
+            InvertedIndexSearchBackend.name: InvertedIndexSearchBackend,
+        }[name]
+        _backends[name] = backend_class()
+
+    return _backends[name]
+
+
+def index_post(post):
+    """Update in-memory index of this process if it is already built"""
+    backend = _backends.get(InvertedIndexSearchBackend.name)
+    if backend is not None and backend.built:
+        backend.add(post.pk, post.board_id, post.title, post.content)
+
+
+def unindex_post(post_id):
+    backend = _backends.get(InvertedIndexSearchBackend.name)
+    if backend is not None and backend.built:
+        backend.remove(post_id)
@@ -0,0 +1,71 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from boards.models import Board
+from posts.models import Post, PostVotedUser
+from posts.search import ensure_fts_schema, index_post, unindex_post
+
+
+@receiver(post_delete, sender=Post)
+def decrease_board_post_count(sender, instance, **kwargs):
+    """Decrease deleted post's board post_count
+    Receive post_delete signal so that queryset and cascade deletions are counted
+    """
+    Board.objects.filter(pk=instance.board_id, post_count__gt=0).update(
+        post_count=models.F("post_count") - 1
+    )
+
+
+@receiver(post_delete, sender=PostVotedUser)
+def touch_unvoted_post(sender, instance, using, **kwargs):
+    """Touch updated_at of deleted vote's post
+    Incremental vote reconciliation finds posts by updated_at, so votes deleted
+    without a counter update (admin, queryset or cascade deletions) are
+    corrected by its next run.
+    """
+    Post.objects.using(using).filter(pk=instance.post_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_index(sender, instance, **kwargs):
+    """Keep in-memory search index in sync (posts_fts uses triggers)"""
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+def restore_post_search_schema(sender, using, **kwargs):
+    """Recreate posts_fts triggers dropped by SQLite table rebuilds"""
+    from django.db import connections
+
+    ensure_fts_schema(connections[using])
+
+
+def reserve_shard_ids(sender, using, **kwargs):
+    """Start post shard's posts and voted_posts ids at its own id range"""
+    from django.conf import settings
+    from django.db import connections
+    from common.routers import shard_id_start
+
+    connection = connections[using]
+    if using not in settings.POST_SHARDS or connection.vendor != "sqlite":
+        return
+
+    start = shard_id_start(using)
+    with connection.cursor() as cursor:
+        for table in (Post._meta.db_table, PostVotedUser._meta.db_table):
+            cursor.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s",
+                [start, table],
+            )
+            if not cursor.rowcount:
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                    [table, start],
+                )
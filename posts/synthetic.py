@@ -0,0 +1,125 @@
+from bisect import bisect
+from datetime import timedelta
+from io import StringIO
+from itertools import accumulate
+from random import Random
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.utils import timezone
+from boards.models import Board
+from common.benchmark import manual_timestamps
+from posts.models import Post, PostVotedUser
+from posts.reconcile import reconcile_votes
+from users.models import User
+
+
+class ZipfChoice:
+    """Draw ranks 0 ~ count - 1 with probability proportional to 1 / rank ** s
+    Few boards, authors and posts get most of the activity, like real boards.
+    """
+
+    def __init__(self, count, exponent=1.1):
+        self.weights = list(
+            accumulate(1 / rank**exponent for rank in range(1, count + 1))
+        )
+
+    def __call__(self, random):
+        return bisect(self.weights, random.random() * self.weights[-1])
+
+
+def generate(
+    users=1000, boards=20, posts=20000, votes=100000, seed=0, days=30, batch_size=5000
+):
+    """Seed reproducible users, boards, posts and votes with skewed activity
+    Same arguments produce the same rows. Board sizes, post authors and votes
+    per post follow Zipf distributions, post times are spread over days.
+    Rows are bulk created and denormalized counters are recomputed at the end.
+    Return dict of created users, boards, posts and votes counts.
+    """
+    random = Random(seed)
+    prefix = f"syn{seed}"
+    now = timezone.now()
+
+    password = make_password(None)
+    User.objects.bulk_create(
+        (
+            User(username=f"{prefix}_user_{index}", password=password)
+            for index in range(users)
+        ),
+        batch_size=batch_size,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=f"{prefix}_user_")
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    user_choice = ZipfChoice(len(user_ids))
+
+    Board.objects.bulk_create(
+        Board(
+            name=f"{prefix} board {index}",
+            path=f"{prefix}b{index}",
+            create_user_id=user_ids[index % len(user_ids)],
+        )
+        for index in range(boards)
+    )
+    board_ids = [f"{prefix}b{index}" for index in range(boards)]
+    board_choice = ZipfChoice(boards)
+    word_choice = ZipfChoice(5000)
+
+    def words(count):
+        return " ".join(f"w{word_choice(random)}" for _ in range(count))
+
+    def new_posts():
+        for _ in range(posts):
+            created_at = now - timedelta(seconds=random.uniform(0, days * 86400))
+            yield Post(
+                create_user_id=user_ids[user_choice(random)],
+                board_id=board_ids[board_choice(random)],
+                title=words(6),
+                content=words(random.randint(10, 80)),
+                created_at=created_at,
+            )
+
+    with manual_timestamps(Post):
+        Post.objects.bulk_create(new_posts(), batch_size=batch_size)
+
+    post_ids = list(
+        Post.objects.filter(board__in=board_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    # Newer posts (higher pk) draw the most votes
+    post_ids.reverse()
+    post_choice = ZipfChoice(len(post_ids))
+    quality = [random.betavariate(5, 2) for _ in post_ids]
+
+    # Distinct (user, post) pairs, votes beyond available pairs are dropped
+    votes = min(votes, len(user_ids) * len(post_ids))
+    pairs = set()
+    for _ in range(votes * 3):
+        if len(pairs) >= votes:
+            break
+        pairs.add((random.randrange(len(user_ids)), post_choice(random)))
+
+    PostVotedUser.objects.bulk_create(
+        (
+            PostVotedUser(
+                user_id=user_ids[user],
+                post_id=post_ids[post],
+                is_upvoted=random.random() < quality[post],
+            )
+            for user, post in sorted(pairs)
+        ),
+        batch_size=batch_size,
+    )
+
+    call_command("recount_posts", stdout=StringIO())
+    reconcile_votes()
+
+    return {
+        "users": len(user_ids),
+        "boards": len(board_ids),
+        "posts": len(post_ids),
+        "votes": len(pairs),
+    }
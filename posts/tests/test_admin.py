@@ -0,0 +1,137 @@
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.db import connection
+from common.testing import (
+    AdminChangelistMixin,
+    TestCase,
+    capture_queries,
+    single_database,
+)
+from boards.models import Board
+from common.pagination import EstimatedCountPaginator
+from posts.models import Post, PostVotedUser
+from users.models import User
+
+
+@single_database
+class PostAdminQueryCountTest(AdminChangelistMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running PostAdminQueryCountTest
+
+        User Fields :
+            admin             : superuser
+            test_user_0 ~ 9   : voters
+
+        Board Fields :
+            path : board0 ~ board2
+
+        Post Fields :
+            post 0 ~ 9 : spread over boards, voted by every voter
+        """
+        cls.admin = User.objects.create_superuser(username="admin", password="admin")
+        users = [User.objects.create_user(username=f"test_user_{i}") for i in range(10)]
+        boards = [
+            Board.objects.create(
+                name=f"board{i}", path=f"board{i}", create_user=users[i]
+            )
+            for i in range(3)
+        ]
+        for index in range(10):
+            post = Post.objects.create(
+                create_user=users[index],
+                board=boards[index % 3],
+                title=f"post {index}",
+                content="content",
+            )
+            for user in users:
+                PostVotedUser.objects.create(user=user, post=post)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_post_voted_user_changelist(self):
+        """PostVotedUserAdmin changelist query count test
+        Check __str__ of user, post and board doesn't query per row
+        """
+        self.assertConstantQueries(PostVotedUser)
+
+    def test_post_changelist(self):
+        """PostAdmin changelist query count test
+        Check board and create_user columns don't query per row
+        """
+        self.assertConstantQueries(Post)
+
+
+@single_database
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running EstimatedCountPaginatorTest
+
+        Post Fields :
+            title : test title
+
+        PostVotedUser Fields :
+            user       : test_user_0 ~ 29
+            is_upvoted : True except test_user_0 ~ 4
+        """
+        users = [User.objects.create_user(username=f"test_user_{i}") for i in range(30)]
+        board = Board.objects.create(name="test", path="test", create_user=users[0])
+        post = Post.objects.create(
+            create_user=users[0], board=board, title="test title", content=""
+        )
+        for index, user in enumerate(users):
+            PostVotedUser.objects.create(user=user, post=post, is_upvoted=index >= 5)
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self, queryset):
+        paginator = EstimatedCountPaginator(queryset.order_by("pk"), 10)
+        paginator.exact_threshold = 10
+        return paginator
+
+    def test_small_filtered_exact_count(self):
+        """EstimatedCountPaginator small set test
+        Check sets within exact_threshold are counted exactly every time
+        """
+        queryset = PostVotedUser.objects.filter(is_upvoted=False)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.paginator(queryset).count, 5)
+
+    def test_large_cached_count(self):
+        """EstimatedCountPaginator cached count test
+        Check large set without statistics is counted once and reused
+        """
+        queryset = PostVotedUser.objects.filter(is_upvoted=True)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.paginator(queryset).count, 25)
+
+        PostVotedUser.objects.filter(user__username="test_user_29").delete()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.paginator(queryset).count, 25)
+
+    def test_large_statistics_count(self):
+        """EstimatedCountPaginator statistics test
+        Check unfiltered set uses sqlite_stat1 instead of COUNT(*)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE voted_posts")
+
+        with capture_queries() as context:
+            self.assertEqual(self.paginator(PostVotedUser.objects.all()).count, 30)
+
+        self.assertEqual(len(context), 2)
+        self.assertIn("sqlite_stat1", context[1]["sql"])
+
+    def test_changelist_skip_full_count(self):
+        """PostVotedUserAdmin estimated count test
+        Check filtered changelist doesn't run unfiltered full count
+        """
+        self.assertFalse(site._registry[PostVotedUser].show_full_result_count)
+        self.assertIs(site._registry[PostVotedUser].paginator, EstimatedCountPaginator)
+        self.assertIs(site._registry[Post].paginator, EstimatedCountPaginator)
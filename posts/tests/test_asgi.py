@@ -0,0 +1,89 @@
+from contextvars import ContextVar
+from threading import current_thread
+import asyncio
+from django.test import SimpleTestCase
+from django.urls import reverse
+from common.testing import TestCase
+from boards.models import Board
+from common.executor import orm_pool_application, run_sync
+from common.middleware import QueryMetricsMiddleware
+from posts.models import Post
+from users.models import User
+from users.utils.snapshot import encode_user_jwt
+
+request_label = ContextVar("request_label", default=None)
+
+
+class RunSyncTest(SimpleTestCase):
+    def test_run_sync_in_thread_pool(self):
+        """run_sync thread pool test
+        Check blocking code of orm_pool_application requests runs in orm threads
+        with the caller's context, and outside them in other threads
+        """
+
+        async def application(scope, receive, send):
+            request_label.set("request 1")
+            return await run_sync(lambda: (current_thread().name, request_label.get()))
+
+        thread_name, label = asyncio.run(
+            orm_pool_application(application)({}, None, None)
+        )
+        self.assertTrue(thread_name.startswith("orm"))
+        self.assertEqual(label, "request 1")
+
+        thread_name, label = asyncio.run(application({}, None, None))
+        self.assertFalse(thread_name.startswith("orm"))
+        self.assertEqual(label, "request 1")
+
+    def test_hybrid_middleware(self):
+        """HybridMiddleware test
+        Check middlewares follow the sync or async chain they wrap
+        """
+
+        async def async_view(request):
+            pass
+
+        self.assertTrue(asyncio.iscoroutinefunction(QueryMetricsMiddleware(async_view)))
+        self.assertFalse(
+            asyncio.iscoroutinefunction(QueryMetricsMiddleware(lambda request: None))
+        )
+
+
+class AsgiViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running AsgiViewTest
+
+        User  : test_user_1
+        Board : test
+        Posts : post 0 ~ post 2
+        """
+        cls.user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=cls.user)
+        for index in range(3):
+            Post.objects.create(
+                create_user=cls.user, board=board, title=f"post {index}", content=""
+            )
+
+    async def test_post_list(self):
+        """ASGI post list test
+        Check async post list runs through the async middleware chain
+        """
+        response = await self.async_client.get(
+            reverse("posts:list", args=["test"]),
+            HTTP_AUTHORIZATION=f"Bearer {encode_user_jwt(self.user)}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [post["title"] for post in response.json()["results"]],
+            ["post 2", "post 1", "post 0"],
+        )
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+    async def test_method_not_allowed(self):
+        """ASGI method test
+        Check async views keep require_GET
+        """
+        response = await self.async_client.post(reverse("posts:list", args=["test"]))
+        self.assertEqual(response.status_code, 405)
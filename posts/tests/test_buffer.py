@@ -0,0 +1,94 @@
+from django.test import override_settings
+from common.testing import TestCase
+from users.models import User
+from boards.models import Board
+from posts.buffer import VoteBuffer, replay_votes
+from posts.models import Post, PostVotedUser
+from posts.ranking import hot_score
+
+
+class VoteBufferTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running VoteBufferTest
+
+        Users       : test_user_0 ~ test_user_2
+        Board       : test
+        Post Fields :
+            create_user : test_user_0
+            board       : test
+            title       : post 0 ~ post 1
+        """
+        cls.users = [
+            User.objects.create_user(username=f"test_user_{index}")
+            for index in range(3)
+        ]
+        board = Board.objects.create(name="test", path="test", create_user=cls.users[0])
+        cls.posts = [
+            Post.objects.create(
+                create_user=cls.users[0], board=board, title=f"post {index}"
+            )
+            for index in range(2)
+        ]
+
+    def test_vote_buffer_flush(self):
+        """VoteBuffer flush test
+        Check buffered deltas are applied with one batch and hot_score follows
+        """
+        buffer = VoteBuffer(shards=4)
+        buffer.add(self.posts[0].pk, upvote=1)
+        buffer.add(self.posts[0].pk, upvote=1)
+        buffer.add(self.posts[0].pk, downvote=1)
+        buffer.add(self.posts[1].pk, downvote=2)
+        self.assertEqual(2, buffer.pending())
+
+        with self.assertNumQueries(5):
+            self.assertEqual(2, buffer.flush())
+
+        first, second = Post.objects.order_by("pk")
+        self.assertEqual((2, 1), (first.upvote, first.downvote))
+        self.assertEqual((0, 2), (second.upvote, second.downvote))
+        self.assertEqual(hot_score(2, 1, first.created_at), first.hot_score)
+        self.assertEqual(0, buffer.pending())
+
+    def test_vote_buffer_flush_at_max_pending(self):
+        """VoteBuffer max_pending test
+        Check add flushes on its own once max_pending posts have deltas
+        """
+        buffer = VoteBuffer(max_pending=2)
+        buffer.add(self.posts[0].pk, upvote=1)
+        self.assertEqual(0, Post.objects.get(pk=self.posts[0].pk).upvote)
+
+        buffer.add(self.posts[1].pk, upvote=1)
+        self.assertEqual(0, buffer.pending())
+        self.assertEqual(1, Post.objects.get(pk=self.posts[0].pk).upvote)
+
+    @override_settings(VOTE_WRITE_BEHIND=True)
+    def test_post_voted_user_save_write_behind(self):
+        """PostVotedUser save with VOTE_WRITE_BEHIND test
+        Check vote row is written while post counters wait for the buffer
+        """
+        PostVotedUser.objects.create(user=self.users[1], post=self.posts[0])
+
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.assertTrue(PostVotedUser.objects.filter(post=post).exists())
+        self.assertEqual(0, post.upvote)
+
+    def test_replay_votes(self):
+        """replay_votes test
+        Check counters and hot_score of every post are rebuilt from votes
+        """
+        PostVotedUser.objects.create(user=self.users[1], post=self.posts[0])
+        PostVotedUser.objects.create(
+            user=self.users[2], post=self.posts[0], is_upvoted=False
+        )
+        Post.objects.update(upvote=7, downvote=7)
+
+        self.assertEqual(2, replay_votes())
+
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.assertEqual((1, 1), (post.upvote, post.downvote))
+        self.assertEqual(hot_score(1, 1, post.created_at), post.hot_score)
+        self.assertEqual(0, Post.objects.get(pk=self.posts[1].pk).upvote)
@@ -0,0 +1,124 @@
+from hashlib import sha256
+from tempfile import TemporaryDirectory
+import os
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from common.media import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, parse_range
+from common.storage import TEMPORARY_DIRECTORY, content_digest
+
+
+class ContentAddressedStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.media = TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=self.media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_deduplicated_names(self):
+        """ContentAddressedStorage save test
+        Check files are named by content hash and equal contents share a file
+        """
+        digest = sha256(b"avatar").hexdigest()
+
+        first = default_storage.save("avatars/me.PNG", ContentFile(b"avatar"))
+        second = default_storage.save("avatars/copy.png", ContentFile(b"avatar"))
+        other = default_storage.save("avatars/me.png", ContentFile(b"other"))
+
+        self.assertEqual(first, f"{digest[:2]}/{digest}.png")
+        self.assertEqual(second, first)
+        self.assertNotEqual(other, first)
+        self.assertEqual(content_digest(first), digest)
+        self.assertIsNone(content_digest("default_avatar.png"))
+        self.assertEqual(
+            os.listdir(os.path.join(self.media.name, TEMPORARY_DIRECTORY)), []
+        )
+        with default_storage.open(first) as stored:
+            self.assertEqual(stored.read(), b"avatar")
+
+
+class MediaViewTest(SimpleTestCase):
+    def setUp(self):
+        """Run before every MediaViewTest test
+
+        Files : content addressed 0123456789 and legacy default_avatar.png
+        """
+        self.media = TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=self.media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.name = default_storage.save("file.txt", ContentFile(b"0123456789"))
+        with open(os.path.join(self.media.name, "default_avatar.png"), "wb") as file:
+            file.write(b"legacy")
+
+    def get(self, name, **headers):
+        return self.client.get(reverse("media", args=[name]), **headers)
+
+    def test_immutable_file(self):
+        """Content-addressed media test
+        Check hashed names are cached for a year and revalidate by content hash
+        """
+        response = self.get(self.name)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response["ETag"], f'"{content_digest(self.name)}"')
+        self.assertEqual(response["Content-Type"], "text/plain")
+
+        response = self.get(self.name, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_legacy_file(self):
+        """Legacy media test
+        Check names stored before content addressing are served and revalidated
+        """
+        response = self.get("default_avatar.png")
+        self.assertEqual(b"".join(response.streaming_content), b"legacy")
+        self.assertEqual(response["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+        self.assertEqual(self.get("missing.png").status_code, 404)
+
+    def test_hidden_file(self):
+        """Hidden media test
+        Check temporary uploads and other dot-prefixed names are never served
+        """
+        directory = os.path.join(self.media.name, TEMPORARY_DIRECTORY)
+        with open(os.path.join(directory, "upload-partial"), "wb") as file:
+            file.write(b"partial")
+        with open(os.path.join(self.media.name, ".hidden"), "wb") as file:
+            file.write(b"hidden")
+
+        for name in (f"{TEMPORARY_DIRECTORY}/upload-partial", ".hidden"):
+            self.assertEqual(self.get(name).status_code, 404)
+
+    def test_range(self):
+        """Media range request test
+        Check single byte ranges, If-Range and unsatisfiable ranges
+        """
+        response = self.get(self.name, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+
+        response = self.get(self.name, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get(self.name, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+        self.assertEqual(parse_range("bytes=-3", 10), (7, 9))
+        self.assertEqual(parse_range("bytes=8-20", 10), (8, 9))
+        self.assertIsNone(parse_range("bytes=0-1,4-5", 10))
+
+    @override_settings(MEDIA_SERVER="nginx", MEDIA_ACCEL_PREFIX="/protected-media/")
+    def test_accel_redirect(self):
+        """Media front server test
+        Check nginx gets X-Accel-Redirect with cache headers and no body
+        """
+        response = self.get(self.name)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.name}")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.content, b"")
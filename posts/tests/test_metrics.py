@@ -0,0 +1,80 @@
+from unittest import mock
+from django.test import RequestFactory
+from django.urls import reverse
+from common.testing import TestCase
+from boards.models import Board
+from common.metrics import metrics_registry
+from common.middleware import QueryMetricsMiddleware
+from users.models import User
+
+
+class QueryMetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running QueryMetricsMiddlewareTest
+
+        Users : test_user_1, staff_user (is_staff)
+        Board : test
+        """
+        user = User.objects.create_user(username="test_user_1")
+        User.objects.create_user(username="staff_user", is_staff=True)
+        Board.objects.create(name="test", path="test", create_user=user)
+
+    def setUp(self):
+        metrics_registry.clear()
+
+    def test_server_timing_header(self):
+        """QueryMetricsMiddleware Server-Timing test
+        Check response reports db time, query count and total time
+        """
+        response = self.client.get(reverse("posts:list", args=["test"]))
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$',
+        )
+        self.assertEqual(1, sum(metrics_registry.views["posts:list"].buckets))
+
+    def test_n_plus_one_detection(self):
+        """QueryMetricsMiddleware N+1 test
+        Check repeated SQL is counted as duplicates and logged as N+1
+        """
+
+        def view(request):
+            for user in User.objects.all():
+                Board.objects.filter(create_user=user).exists()
+            for _ in range(5):
+                Board.objects.filter(path="test").exists()
+            return mock.MagicMock()
+
+        middleware = QueryMetricsMiddleware(view)
+        with self.assertLogs("common.middleware", "WARNING"):
+            middleware(RequestFactory().get("/"))
+
+        metrics = metrics_registry.views["<unresolved>"]
+        self.assertEqual(8, metrics.queries)
+        self.assertEqual(5, metrics.duplicates)
+        self.assertEqual(1, metrics.n_plus_one)
+
+    def test_metrics_endpoint(self):
+        """metrics view test
+        Check metrics are only exposed to staff users and token scrapers
+        """
+        self.client.get(reverse("posts:list", args=["test"]))
+        url = reverse("metrics")
+
+        self.assertEqual(403, self.client.get(url).status_code)
+
+        with mock.patch("common.views.METRICS_TOKEN", "secret"):
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(200, response.status_code)
+        self.assertIn(
+            'django_request_duration_seconds_bucket{view="posts:list",le="+Inf"} 1',
+            response.content.decode(),
+        )
+
+        self.client.force_login(User.objects.get(username="staff_user"))
+        response = self.client.get(url)
+        self.assertIn(
+            'django_request_queries_total{view="posts:list"}', response.content.decode()
+        )
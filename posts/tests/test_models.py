@@ -1,12 +1,17 @@
-from django.test import TestCase
+from io import StringIO
 from django.db import IntegrityError
+from django.core.management import call_command
+from common.testing import TestCase
 from common.models import Permission
 from users.models import User
 from boards.models import Board
 from posts.models import Post, PostVotedUser
+from posts.ranking import hot_score
 
 
 class PostModelTest(TestCase):
+    board_path = "test"
+
     @classmethod
     def setUpTestData(cls):
         """Run only once when running PostModelTest
@@ -74,8 +79,41 @@ class PostModelTest(TestCase):
         post = Post.objects.get(title="test title")
         self.assertEqual(0, len(post.post_voted_user.all()))
 
+    def test_post_hot_score_on_create(self):
+        """Post model hot_score field creation test
+        Check hot_score is computed when post is created
+        """
+        post = Post.objects.get(title="test title")
+        expected = hot_score(0, 0, post.created_at)
+        self.assertAlmostEqual(post.hot_score, expected, places=3)
+
+    def test_post_hot_score_newer_post(self):
+        """Post model hot_score field ordering test
+        Check newer post ranks higher than older post with the same votes
+        """
+        user = User.objects.get(username="test_user_1")
+        board = Board.objects.get(name="test")
+        older = Post.objects.get(title="test title")
+        newer = Post.objects.create(
+            create_user=user, board=board, title="newer", content=""
+        )
+        self.assertGreater(newer.hot_score, older.hot_score)
+
+    def test_rank_posts_command(self):
+        """rank_posts management command test
+        Check drifted hot_score is recomputed from vote counters
+        """
+        Post.objects.update(upvote=100, hot_score=0)
+
+        call_command("rank_posts", stdout=StringIO())
+
+        post = Post.objects.get(title="test title")
+        self.assertEqual(post.hot_score, hot_score(100, 0, post.created_at))
+
 
 class PostVotedUserModelTest(TestCase):
+    board_path = "test"
+
     @classmethod
     def setUpTestData(cls):
         """Run only once when running PostVotedUserModelTest
@@ -150,3 +188,18 @@ class PostVotedUserModelTest(TestCase):
 
         post.refresh_from_db()
         self.assertEqual(1, post.downvote)
+
+    def test_post_voted_user_save_hot_score(self):
+        """PostVotedUser model save method hot_score test
+        Check Post object's hot_score is updated from its new vote counters
+        """
+        post = Post.objects.get(title="test title")
+        self.assertEqual(post.hot_score, hot_score(1, 0, post.created_at))
+
+        for index in range(2, 5):
+            user = User.objects.create_user(username=f"test_user_{index}")
+            PostVotedUser.objects.create(user=user, post=post, is_upvoted=False)
+
+        post.refresh_from_db()
+        self.assertEqual(post.hot_score, hot_score(1, 3, post.created_at))
+        self.assertLess(post.hot_score, hot_score(0, 0, post.created_at))
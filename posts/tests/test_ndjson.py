@@ -0,0 +1,130 @@
+import json
+import os
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from common.testing import TestCase, single_database
+from users.models import User
+from boards.models import Board
+from posts.models import Post, PostVotedUser
+from posts.ranking import hot_score
+from posts.unique_views import UniqueViews
+
+
+@single_database
+class NdjsonCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running NdjsonCommandTest
+
+        Users       : test_user_0 ~ test_user_2
+        Boards      : test, other
+        Posts       : post 0 ~ post 2 on test, other post on other
+        Votes       : test_user_1 upvoted, test_user_2 downvoted posts on test
+        """
+        users = [
+            User.objects.create_user(username=f"test_user_{index}")
+            for index in range(3)
+        ]
+        board = Board.objects.create(name="test", path="test", create_user=users[0])
+        other = Board.objects.create(name="other", path="other", create_user=users[0])
+        Post.objects.create(
+            create_user=users[0], board=other, title="other post", content=""
+        )
+        for index in range(3):
+            post = Post.objects.create(
+                create_user=users[0], board=board, title=f"post {index}", content="é"
+            )
+            PostVotedUser.objects.create(user=users[1], post=post)
+            PostVotedUser.objects.create(user=users[2], post=post, is_upvoted=False)
+
+    def setUp(self):
+        file = NamedTemporaryFile(suffix=".ndjson", delete=False)
+        file.close()
+        self.path = file.name
+        self.addCleanup(os.remove, self.path)
+
+    def export(self, *args):
+        call_command("export_ndjson", "--output", self.path, *args, stderr=StringIO())
+        with open(self.path, encoding="utf-8") as stream:
+            return [json.loads(line) for line in stream]
+
+    def load(self, rows):
+        with open(self.path, "w", encoding="utf-8") as stream:
+            stream.writelines(json.dumps(row) + "\n" for row in rows)
+        call_command("import_ndjson", self.path, "--batch-size", 2, stdout=StringIO())
+
+    def test_export_ndjson_board(self):
+        """export_ndjson command board filter test
+        Check only the board's rows are written, boards first and votes last
+        """
+        rows = self.export("--board", "test")
+
+        self.assertEqual(
+            ["boards.board"] + ["posts.post"] * 3 + ["posts.postvoteduser"] * 6,
+            [row["model"] for row in rows],
+        )
+        self.assertEqual("é", rows[1]["fields"]["content"])
+
+    def test_import_ndjson_round_trip(self):
+        """import_ndjson command round trip test
+        Check rows keep their timestamps and counters are recomputed
+        """
+        posts = {post.pk: post for post in Post.objects.all()}
+        rows = self.export()
+        for row in rows:
+            if row["model"] == "posts.post":
+                row["fields"].update(upvote=9, downvote=9, comment_count=9)
+            if row["model"] == "boards.board":
+                row["fields"]["post_count"] = 0
+        Board.objects.all().delete()
+
+        self.load(rows)
+
+        self.assertEqual(3, Board.objects.get(pk="test").post_count)
+        self.assertEqual(6, PostVotedUser.objects.count())
+        for post in Post.objects.filter(board="test"):
+            self.assertEqual(posts[post.pk].created_at, post.created_at)
+            self.assertEqual(posts[post.pk].updated_at, post.updated_at)
+            self.assertEqual(
+                (1, 1, 0), (post.upvote, post.downvote, post.comment_count)
+            )
+            self.assertEqual(hot_score(1, 1, post.created_at), post.hot_score)
+
+        created = Post.objects.create(
+            create_user=User.objects.first(), board_id="test", title="new"
+        )
+        self.assertGreater(created.pk, max(posts))
+
+    def test_import_ndjson_viewers(self):
+        """import_ndjson command unique viewers test
+        Check flushed viewers sketches of posts and boards survive a round trip
+        """
+        post = Post.objects.get(title="post 0")
+        views = UniqueViews()
+        for viewer in ("a", "b"):
+            views.record(post.pk, "test", viewer)
+        views.flush()
+        views.stop()
+
+        rows = self.export()
+        Board.objects.all().delete()
+        self.load(rows)
+
+        post = Post.objects.get(title="post 0")
+        board = Board.objects.get(pk="test")
+        self.assertEqual(views.post_views(post.pk, post.viewers), 2)
+        self.assertEqual(views.board_views(board.pk, board.viewers), 2)
+
+    def test_import_ndjson_bad_line(self):
+        """import_ndjson command bad line test
+        Check unknown rows raise CommandError and import nothing
+        """
+        rows = self.export()
+        Board.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            self.load(rows + [{"model": "users.user", "fields": {}}])
+
+        self.assertFalse(Board.objects.exists())
@@ -0,0 +1,99 @@
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from django.urls import reverse
+from common.testing import TestCase
+from boards.models import Board
+from common.profiling import (
+    ProfileStore,
+    StackSampler,
+    make_profile_token,
+    profile_store,
+)
+from users.models import User
+
+
+def busy_loop(seconds):
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        pass
+
+
+class ProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running ProfilingTest
+
+        Users : test_user_1, staff_user (is_staff)
+        Board : test
+        """
+        user = User.objects.create_user(username="test_user_1")
+        cls.staff = User.objects.create_user(username="staff_user", is_staff=True)
+        Board.objects.create(name="test", path="test", create_user=user)
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profile_store.directory = directory.name
+        self.addCleanup(setattr, profile_store, "directory", None)
+        self.url = reverse("posts:list", args=["test"])
+
+    def test_stack_sampler(self):
+        """StackSampler test
+        Check samples of a busy function are folded with its callers
+        """
+        sampler = StackSampler(interval=0.001).start()
+        busy_loop(0.05)
+        stacks = sampler.stop()
+
+        leaf = "test_profiling:test_stack_sampler;posts.tests.test_profiling:busy_loop"
+        self.assertTrue(any(stack.endswith(leaf) for stack in stacks))
+
+    def test_profile_header(self):
+        """ProfilingMiddleware header test
+        Check only requests with a valid signed token are profiled
+        """
+        self.assertNotIn("X-Profile-Id", self.client.get(self.url))
+        self.assertNotIn(
+            "X-Profile-Id", self.client.get(self.url, HTTP_X_PROFILE="forged")
+        )
+
+        response = self.client.get(self.url, HTTP_X_PROFILE=make_profile_token())
+        profile = profile_store.load(response["X-Profile-Id"])
+
+        self.assertEqual(self.url, profile["path"])
+        self.assertEqual("header", profile["reason"])
+        self.assertTrue(all(stack.split(";")[0] for stack in profile["stacks"]))
+        self.assertEqual(1, len(profile_store.names()))
+
+    def test_profile_store_ring_buffer(self):
+        """ProfileStore size test
+        Check only the newest size profiles are kept
+        """
+        store = ProfileStore(profile_store.directory, size=3)
+        names = [store.save({"created_at": index, "stacks": {}}) for index in range(5)]
+
+        self.assertEqual(names[:1:-1], store.names())
+        self.assertIsNone(store.load(names[0]))
+
+    def test_profile_admin_pages(self):
+        """profile_list and profile_detail view test
+        Check staff users browse profiles and download folded stacks
+        """
+        name = self.client.get(self.url, HTTP_X_PROFILE=make_profile_token())[
+            "X-Profile-Id"
+        ]
+        list_url = reverse("profile_list")
+        detail_url = reverse("profile_detail", args=[name])
+
+        self.assertEqual(302, self.client.get(list_url).status_code)
+
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(list_url), self.url)
+        self.assertContains(self.client.get(detail_url), "Self samples")
+
+        folded = self.client.get(detail_url, {"format": "folded"})
+        self.assertRegex(folded.content.decode(), r"^\S+ \d+\n")
+        self.assertEqual(
+            404,
+            self.client.get(reverse("profile_detail", args=["missing"])).status_code,
+        )
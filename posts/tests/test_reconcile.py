@@ -0,0 +1,145 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from common.testing import TestCase
+from common.routers import post_databases
+from users.models import User
+from boards.models import Board
+from posts.models import Post, PostVotedUser, VoteReconciliation
+from posts.ranking import hot_score
+from posts.buffer import vote_buffer
+from posts.reconcile import (
+    DriftReport,
+    reconcile_votes,
+    reconcile_votes_since_last_run,
+)
+
+
+class ReconcileVotesTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running ReconcileVotesTest
+
+        Users       : test_user_0 ~ test_user_2
+        Board       : test
+        Posts       : post 0 ~ post 4
+        Votes       : test_user_1 upvoted and test_user_2 downvoted every post
+        """
+        users = [
+            User.objects.create_user(username=f"test_user_{index}")
+            for index in range(3)
+        ]
+        board = Board.objects.create(name="test", path="test", create_user=users[0])
+        for index in range(5):
+            post = Post.objects.create(
+                create_user=users[0], board=board, title=f"post {index}"
+            )
+            PostVotedUser.objects.create(user=users[1], post=post)
+            PostVotedUser.objects.create(user=users[2], post=post, is_upvoted=False)
+
+        cls.post_ids = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+
+    def test_reconcile_votes_full(self):
+        """reconcile_votes full run test
+        Check drifted counters are corrected and the drift is reported
+        """
+        Post.objects.filter(pk=self.post_ids[0]).update(upvote=5)
+        Post.objects.filter(pk=self.post_ids[1]).update(downvote=0)
+        PostVotedUser.objects.filter(post_id=self.post_ids[2]).delete()
+
+        # Every further post database adds its empty first chunk query
+        with self.assertNumQueries(17 + len(post_databases())):
+            report = reconcile_votes(chunk_size=2)
+
+        self.assertEqual((5, 3), (report.checked, report.corrected))
+        self.assertEqual((5, 0), (report.upvote_drift, report.downvote_drift))
+        self.assertEqual({"1": 2, "2-10": 1}, dict(report.buckets))
+
+        for post in Post.objects.filter(pk__in=self.post_ids[:3]):
+            votes = PostVotedUser.objects.filter(post=post).count() // 2
+            self.assertEqual((votes, votes), (post.upvote, post.downvote))
+            self.assertEqual(hot_score(votes, votes, post.created_at), post.hot_score)
+
+    def test_reconcile_votes_dry_run(self):
+        """reconcile_votes dry run test
+        Check drift is reported without touching counters
+        """
+        Post.objects.filter(pk=self.post_ids[0]).update(upvote=5)
+
+        report = reconcile_votes(dry_run=True)
+
+        self.assertEqual(1, report.corrected)
+        self.assertEqual(5, Post.objects.get(pk=self.post_ids[0]).upvote)
+
+    def test_reconcile_votes_since(self):
+        """reconcile_votes incremental run test
+        Check only posts edited or voted since the given time are checked
+        """
+        last_vote = PostVotedUser.objects.latest("updated_at")
+        since = last_vote.updated_at + timedelta(microseconds=1)
+        Post.objects.filter(pk__in=self.post_ids[:2]).update(upvote=9)
+        Post.objects.filter(pk=self.post_ids[0]).update(updated_at=since)
+
+        report = reconcile_votes(since)
+
+        self.assertEqual((1, 1), (report.checked, report.corrected))
+        self.assertEqual(9, Post.objects.get(pk=self.post_ids[1]).upvote)
+
+    def test_reconcile_votes_deleted_vote(self):
+        """reconcile_votes deleted vote test
+        Check incremental runs correct posts whose votes were deleted
+        """
+        since = timezone.now()
+        PostVotedUser.objects.filter(post_id=self.post_ids[0]).delete()
+
+        report = reconcile_votes(since)
+
+        self.assertEqual((1, 1), (report.checked, report.corrected))
+        post = Post.objects.get(pk=self.post_ids[0])
+        self.assertEqual((0, 0), (post.upvote, post.downvote))
+
+    @override_settings(VOTE_WRITE_BEHIND=True)
+    def test_reconcile_votes_write_behind(self):
+        """reconcile_votes write-behind test
+        Check buffered deltas are flushed first and recently touched posts are
+        left to the next run
+        """
+        hour_ago = timezone.now() - timedelta(hours=1)
+        Post.objects.update(updated_at=hour_ago)
+        PostVotedUser.objects.update(updated_at=hour_ago)
+        vote_buffer.add(self.post_ids[0], upvote=1)
+        PostVotedUser.objects.filter(post_id=self.post_ids[1]).delete()
+
+        report = reconcile_votes_since_last_run(full=True)
+
+        self.assertEqual((4, 1), (report.checked, report.corrected))
+        self.assertEqual(1, Post.objects.get(pk=self.post_ids[0]).upvote)
+        self.assertEqual(1, Post.objects.get(pk=self.post_ids[1]).upvote)
+        self.assertLess(VoteReconciliation.objects.latest().started_at, timezone.now())
+
+    def test_drift_report_bucket(self):
+        """DriftReport bucket test
+        Check absolute drifts fall into their buckets
+        """
+        labels = [DriftReport.bucket(drift) for drift in (1, 2, 10, 11, 1000, 1001)]
+        self.assertEqual(["1", "2-10", "2-10", "11-100", "101-1000", ">1000"], labels)
+
+    def test_reconcile_votes_command(self):
+        """reconcile_votes command test
+        Check the first run is full and the next one only covers touched posts
+        """
+        Post.objects.filter(pk=self.post_ids[0]).update(upvote=5)
+        out = StringIO()
+
+        call_command("reconcile_votes", stdout=out)
+        self.assertIn("Checked 5 posts, corrected 1 posts", out.getvalue())
+        self.assertTrue(VoteReconciliation.objects.latest().full)
+
+        call_command("reconcile_votes", stdout=out)
+        self.assertIn("Checked 0 posts, corrected 0 posts", out.getvalue())
+        self.assertFalse(VoteReconciliation.objects.latest().full)
+        self.assertEqual(1, Post.objects.get(pk=self.post_ids[0]).upvote)
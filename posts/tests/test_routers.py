@@ -0,0 +1,198 @@
+from io import StringIO
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from common.testing import TransactionTestCase
+from boards.models import Board
+from comments.models import Comment
+from common.routers import (
+    SHARD_ID_SPAN,
+    DatabaseRouter,
+    read_your_writes,
+    replica_reads,
+    shard_for,
+    use_shard,
+)
+from posts.models import Post, PostVotedUser, VoteReconciliation
+from posts.reconcile import reconcile_votes
+from posts.unique_views import unique_views
+from posts.votes import cast_vote
+from users.models import User
+from users.utils.snapshot import encode_user_jwt
+
+SHARDS = ["shard_1", "shard_2"]
+
+
+@override_settings(POST_SHARDS=SHARDS, DATABASE_REPLICAS=["replica_1"])
+class DatabaseRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = DatabaseRouter()
+        cache.clear()
+
+    def test_replica_reads(self):
+        """DatabaseRouter replica test
+        Check only replica_reads blocks read from replicas
+        """
+        self.assertEqual(self.router.db_for_read(User), "default")
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(User), "replica_1")
+            self.assertEqual(self.router.db_for_write(User), "default")
+
+    def test_read_your_writes(self):
+        """DatabaseRouter stickiness test
+        Check reads stay on primary after the user's write, also in next requests
+        """
+        with replica_reads():
+            with read_your_writes(1):
+                self.assertEqual(self.router.db_for_read(User), "replica_1")
+                self.router.db_for_write(User)
+                self.assertEqual(self.router.db_for_read(User), "default")
+
+            with read_your_writes(1):
+                self.assertEqual(self.router.db_for_read(User), "default")
+            with read_your_writes(2):
+                self.assertEqual(self.router.db_for_read(User), "replica_1")
+
+    def test_shard_routing(self):
+        """DatabaseRouter shard test
+        Check posts and votes go to the shard of their board or post id range
+        """
+        self.assertIn(shard_for("test"), SHARDS)
+        self.assertEqual(shard_for("test"), shard_for("test"))
+        self.assertEqual(
+            self.router.db_for_write(Post, instance=Post(board_id="test")),
+            shard_for("test"),
+        )
+        self.assertEqual(
+            self.router.db_for_read(Post, instance=Post(pk=SHARD_ID_SPAN * 2 + 1)),
+            "shard_2",
+        )
+        vote = PostVotedUser(post_id=SHARD_ID_SPAN + 1)
+        self.assertEqual(
+            self.router.db_for_write(PostVotedUser, instance=vote), "shard_1"
+        )
+
+        self.assertEqual(self.router.db_for_read(Post), "default")
+        with use_shard("shard_2"), replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), "shard_2")
+            self.assertEqual(self.router.db_for_read(User), "replica_1")
+
+    def test_allow_migrate(self):
+        """DatabaseRouter migrate test
+        Check shards only get sharded models and replicas nothing
+        """
+        self.assertTrue(self.router.allow_migrate("shard_1", "posts", "post"))
+        self.assertTrue(self.router.allow_migrate("shard_1", "posts", "postvoteduser"))
+        self.assertFalse(
+            self.router.allow_migrate("shard_1", "posts", "votereconciliation")
+        )
+        self.assertFalse(self.router.allow_migrate("shard_1", "users", "user"))
+        self.assertFalse(self.router.allow_migrate("replica_1", "posts", "post"))
+        self.assertIsNone(self.router.allow_migrate("default", "users", "user"))
+
+
+@skipUnless(
+    len(settings.POST_SHARDS) > 1 and settings.DATABASE_REPLICAS,
+    "Set POST_SHARDS to 2+ and DATABASE_REPLICAS to 1+ SQLite files",
+)
+class ShardedPostsTest(TransactionTestCase):
+    """Run with e.g.
+    POST_SHARDS=db.shard_1.sqlite3,db.shard_2.sqlite3 DATABASE_REPLICAS=db.sqlite3
+    """
+
+    def setUp(self):
+        """Run before every ShardedPostsTest test
+
+        Users  : test_user_1
+        Boards : one per shard
+        Posts  : one per board
+        """
+        cache.clear()
+        self.addCleanup(unique_views.drain)
+        self.user = User.objects.create_user(username="test_user_1")
+        paths = {}
+        for index in range(100):
+            paths.setdefault(shard_for(f"board{index}"), f"board{index}")
+        self.boards = [
+            Board.objects.create(name=path, path=path, create_user=self.user)
+            for path in paths.values()
+        ]
+        self.posts = [
+            Post.objects.create(
+                create_user=self.user, board=board, title="title", content="content"
+            )
+            for board in self.boards
+        ]
+
+    def test_posts_in_shards(self):
+        """Sharded post test
+        Check posts are written in their board's shard with its id range
+        """
+        for board, post in zip(self.boards, self.posts):
+            shard = shard_for(board.path)
+            index = settings.POST_SHARDS.index(shard) + 1
+            self.assertEqual(post._state.db, shard)
+            self.assertEqual(post.pk // SHARD_ID_SPAN, index)
+            self.assertTrue(Post.objects.using(shard).filter(pk=post.pk).exists())
+            self.assertFalse(Post.objects.using("default").exists())
+            self.assertEqual(Board.objects.get(pk=board.pk).post_count, 1)
+
+    def test_votes_and_listing(self):
+        """Sharded vote and post list test
+        Check votes update their shard's counters and listings read them
+        """
+        post = self.posts[1]
+        cast_vote(self.user, post, is_upvoted=False)
+        self.assertEqual(PostVotedUser.objects.using(post._state.db).count(), 1)
+        post.refresh_from_db()
+        self.assertEqual((post.upvote, post.downvote), (0, 1))
+
+        response = self.client.get(
+            reverse("posts:list", args=[post.board_id]),
+            HTTP_AUTHORIZATION=f"Bearer {encode_user_jwt(self.user)}",
+        )
+        self.assertEqual(response.status_code, 200)
+        [item] = response.json()["results"]
+        self.assertEqual((item["id"], item["voted"]), (post.pk, "down"))
+
+    def test_comments(self):
+        """Sharded comment test
+        Check comments of sharded posts count, list, find their post and are
+        deleted with it across databases
+        """
+        post = self.posts[1]
+        comment = Comment.objects.create(post=post, create_user=self.user, content="a")
+        self.assertEqual(comment._state.db, "default")
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+        response = self.client.get(reverse("comments:thread", args=[post.pk]))
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], [comment.pk]
+        )
+
+        comment = Comment.objects.get(pk=comment.pk)
+        self.assertEqual(comment.post, post)
+        self.assertEqual(list(self.boards[1].posts.all()), [post])
+
+        post.delete()
+        self.assertFalse(Comment.objects.filter(pk=comment.pk).exists())
+
+    def test_fan_out(self):
+        """Sharded global query test
+        Check reconcile_votes and recount_posts cover every shard
+        """
+        for post in self.posts:
+            Post.objects.using(post._state.db).filter(pk=post.pk).update(upvote=3)
+        Board.objects.update(post_count=0)
+
+        self.assertEqual(reconcile_votes().corrected, len(self.posts))
+        self.assertFalse(VoteReconciliation.objects.exists())
+        call_command("recount_posts", stdout=StringIO())
+        self.assertEqual(
+            sorted(Board.objects.values_list("post_count", flat=True)),
+            [1] * len(self.boards),
+        )
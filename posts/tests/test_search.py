@@ -0,0 +1,178 @@
+from io import StringIO
+from django.core.management import call_command
+from common.testing import TestCase
+from boards.models import Board
+from posts.models import Post
+from posts.search import (
+    Fts5SearchBackend,
+    InvalidSearchCursor,
+    InvertedIndexSearchBackend,
+    get_search_backend,
+)
+from users.models import User
+
+
+class SearchBackendTestMixin:
+    backend_class = None
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running search backend test
+
+        Board Fields :
+            path : test, other
+
+        Post Fields (board test) :
+            apple title      : content mentions apple once
+            banana           : content mentions apple three times and <b>tag</b>
+            cherry           : content without apple
+            apple 0 ~ 4      : apple in title only
+        Post Fields (board other) :
+            apple other      : apple in other board
+        """
+        user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=user)
+        other = Board.objects.create(name="other", path="other", create_user=user)
+
+        def create(title, content, post_board=board):
+            Post.objects.create(
+                create_user=user, board=post_board, title=title, content=content
+            )
+
+        create("apple title", "a red apple in the basket")
+        create("banana", "apple apple apple and <b>tag</b> banana")
+        create("cherry", "nothing to see here")
+        for index in range(5):
+            create(f"apple {index}", "fruit")
+        create("apple other", "apple", other)
+
+    def setUp(self):
+        self.backend = self.backend_class()
+
+    def titles(self, page):
+        return [item["title"] for item in page.items]
+
+    def test_search_board_results(self):
+        """search method board filter test
+        Check only board's matching posts are returned
+        """
+        page = self.backend.search("apple", "test")
+        titles = self.titles(page)
+
+        self.assertEqual(len(titles), 7)
+        self.assertNotIn("cherry", titles)
+        self.assertNotIn("apple other", titles)
+
+    def test_search_all_terms(self):
+        """search method term matching test
+        Check every term must match
+        """
+        page = self.backend.search("apple banana", "test")
+        self.assertEqual(self.titles(page), ["banana"])
+
+    def test_search_ranked_by_relevance(self):
+        """search method ranking test
+        Check results are ordered by rank with title matches first
+        """
+        items = self.backend.search("apple", "test").items
+        ranks = [item["rank"] for item in items]
+
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(items[-1]["title"], "banana")
+
+    def test_search_highlight(self):
+        """search method highlight test
+        Check matches are wrapped in mark tags and html is escaped
+        """
+        item = self.backend.search("banana", "test").items[0]
+
+        self.assertEqual(item["title_highlight"], "<mark>banana</mark>")
+        self.assertIn("&lt;b&gt;tag&lt;/b&gt;", item["snippet"])
+        self.assertIn("<mark>banana</mark>", item["snippet"])
+
+    def test_search_cursor(self):
+        """search method cursor test
+        Check following next cursor returns remaining results once
+        """
+        first = self.backend.search("apple", "test", page_size=3)
+        titles = self.titles(first)
+        cursor = first.next
+
+        while cursor:
+            page = self.backend.search("apple", "test", cursor, page_size=3)
+            titles += self.titles(page)
+            cursor = page.next
+
+        self.assertEqual(len(titles), 7)
+        self.assertEqual(len(set(titles)), 7)
+
+    def test_search_cursor_of_other_query(self):
+        """search method cursor mismatch test
+        Check cursor can't be reused for a different query
+        """
+        cursor = self.backend.search("apple", "test", page_size=3).next
+        with self.assertRaises(InvalidSearchCursor):
+            self.backend.search("banana", "test", cursor)
+
+    def test_search_empty_query(self):
+        """search method empty query test
+        Check query without words returns nothing
+        """
+        self.assertEqual(self.backend.search("?!", "test").items, [])
+
+
+class Fts5SearchBackendTest(SearchBackendTestMixin, TestCase):
+    board_path = "test"
+
+    backend_class = Fts5SearchBackend
+
+    def test_search_follow_updates(self):
+        """posts_fts trigger test
+        Check created, updated and deleted posts are reflected
+        """
+        post = Post.objects.get(title="cherry")
+        post.content = "durian"
+        post.save()
+        self.assertEqual(self.titles(self.backend.search("durian", "test")), ["cherry"])
+
+        Post.objects.filter(pk=post.pk).delete()
+        self.assertEqual(self.backend.search("durian", "test").items, [])
+
+    def test_reindex(self):
+        """reindex method test
+        Check reindex restores every post
+        """
+        self.assertEqual(self.backend.reindex(chunk_size=2), Post.objects.count())
+        self.assertEqual(len(self.backend.search("apple", "test").items), 7)
+
+    def test_auto_backend(self):
+        """get_search_backend auto test
+        Check fts5 backend is chosen on SQLite with posts_fts
+        """
+        self.assertEqual(get_search_backend().name, "fts5")
+
+
+class InvertedIndexSearchBackendTest(SearchBackendTestMixin, TestCase):
+    board_path = "test"
+
+    backend_class = InvertedIndexSearchBackend
+
+    def test_search_follow_updates(self):
+        """index add and remove test
+        Check added and removed posts are reflected
+        """
+        self.backend.build()
+        post = Post.objects.get(title="cherry")
+        self.backend.add(post.pk, post.board_id, post.title, "durian")
+        self.assertEqual(self.titles(self.backend.search("durian", "test")), ["cherry"])
+
+        self.backend.remove(post.pk)
+        self.assertEqual(self.backend.search("durian", "test").items, [])
+
+    def test_reindex_command(self):
+        """reindex_posts management command test
+        Check command reports indexed post count
+        """
+        output = StringIO()
+        call_command("reindex_posts", chunk_size=2, stdout=output)
+        self.assertIn(f"Indexed {Post.objects.count()} posts", output.getvalue())
@@ -0,0 +1,73 @@
+from tempfile import TemporaryDirectory
+import os
+from django.db import OperationalError, connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+from common.db.sqlite3.base import DEFAULT_PRAGMAS
+
+
+class ProductionSQLiteTest(SimpleTestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = dict(
+            connections.databases["default"],
+            ENGINE="common.db.sqlite3",
+            NAME=os.path.join(directory.name, "db.sqlite3"),
+            OPTIONS={"timeout": 0},
+        )
+
+    def connect(self, **settings):
+        backend = load_backend("common.db.sqlite3")
+        wrapper = backend.DatabaseWrapper(dict(self.settings_dict, **settings))
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        """Production SQLite pragmas test
+        Check every new connection runs in WAL mode with tuned pragmas
+        """
+        wrapper = self.connect()
+
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        # NORMAL is 1, MEMORY temp_store is 2
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 1)
+        self.assertEqual(
+            self.pragma(wrapper, "cache_size"), DEFAULT_PRAGMAS["cache_size"]
+        )
+        self.assertEqual(self.pragma(wrapper, "temp_store"), 2)
+        self.assertEqual(
+            self.pragma(wrapper, "busy_timeout"), DEFAULT_PRAGMAS["busy_timeout"]
+        )
+
+        wrapper = self.connect(PRAGMAS={"synchronous": "FULL"})
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 2)
+
+    def test_begin_immediate(self):
+        """Production SQLite transaction test
+        Check atomic blocks take the write lock when they start and readers
+        aren't blocked by the writer
+        """
+        pragmas = dict(DEFAULT_PRAGMAS, busy_timeout=0)
+        writer = self.connect(PRAGMAS=pragmas)
+        other = self.connect(PRAGMAS=pragmas)
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE counter (value integer)")
+            cursor.execute("INSERT INTO counter VALUES (1)")
+
+        writer._start_transaction_under_autocommit()
+        self.assertTrue(writer.connection.in_transaction)
+
+        with other.cursor() as cursor:
+            cursor.execute("SELECT value FROM counter")
+            self.assertEqual(cursor.fetchone()[0], 1)
+            with self.assertRaisesMessage(OperationalError, "database is locked"):
+                cursor.execute("UPDATE counter SET value = 2")
+
+        writer.connection.rollback()
@@ -0,0 +1,93 @@
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, Q
+from common.testing import TestCase, single_database
+from boards.models import Board
+from common.benchmark import compare_results, read_results, write_results
+from posts.models import Post
+from posts.synthetic import generate
+from users.models import User
+
+
+@single_database
+class SyntheticDataTest(TestCase):
+    def test_generate_counts(self):
+        """generate function test
+        Check requested rows are created with consistent denormalized counters
+        """
+        counts = generate(users=20, boards=3, posts=60, votes=200, seed=1)
+
+        self.assertEqual({"users": 20, "boards": 3, "posts": 60, "votes": 200}, counts)
+        for board in Board.objects.all():
+            self.assertEqual(board.posts.count(), board.post_count)
+
+        posts = Post.objects.annotate(
+            up=Count("vote_posts", filter=Q(vote_posts__is_upvoted=True)),
+            down=Count("vote_posts", filter=Q(vote_posts__is_upvoted=False)),
+        )
+        for post in posts:
+            self.assertEqual((post.up, post.down), (post.upvote, post.downvote))
+
+    def test_generate_reproducible_skew(self):
+        """generate function seed test
+        Check same seed gives same rows and the largest board dominates
+        """
+        generate(users=20, boards=5, posts=200, votes=0, seed=2)
+        first = list(Post.objects.order_by("pk").values_list("board", "title"))
+        User.objects.all().delete()
+
+        generate(users=20, boards=5, posts=200, votes=0, seed=2)
+        second = list(Post.objects.order_by("pk").values_list("board", "title"))
+
+        self.assertEqual(first, second)
+        sizes = sorted(Board.objects.values_list("post_count", flat=True))
+        self.assertGreater(sizes[-1], sizes[0] * 2)
+
+
+@single_database
+class BenchmarkSuiteTest(TestCase):
+    def test_compare_results(self):
+        """compare_results function test
+        Check slower p95 beyond tolerance and extra queries are regressions
+        """
+        baseline = {
+            "fast": {"p95": 0.1, "queries": 1},
+            "slow": {"p95": 10.0, "queries": 2},
+        }
+        results = {
+            "fast": {"p95": 0.4, "queries": 1},
+            "slow": {"p95": 13.0, "queries": 3},
+            "new": {"p95": 1.0, "queries": 9},
+        }
+
+        regressions = compare_results(results, baseline, tolerance=0.2)
+
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(all(message.startswith("slow:") for message in regressions))
+
+    def test_bench_suite_baseline(self):
+        """bench_suite command test
+        Check results are written and a regressed baseline fails the command
+        """
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            options = dict(users=10, boards=2, posts=20, votes=30, repeat=2)
+
+            call_command("bench_suite", output=output, stdout=StringIO(), **options)
+            results = read_results(output)
+            self.assertIn("vote save", results)
+            self.assertEqual(6, results["vote save"]["queries"])
+
+            results["vote save"]["queries"] = 1
+            write_results(output, results)
+            with self.assertRaises(CommandError):
+                call_command(
+                    "bench_suite",
+                    baseline=output,
+                    stdout=StringIO(),
+                    stderr=StringIO(),
+                    **options,
+                )
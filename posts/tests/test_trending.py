@@ -0,0 +1,169 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase
+from django.urls import reverse
+from common.testing import TransactionTestCase
+from boards.models import Board
+from common.routers import shard_for
+from posts.models import Post
+from posts.trending import SlidingWindowCounter, Trending, trending
+from posts.votes import cast_vote, retract_vote
+from users.models import User
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlidingWindowCounterTest(SimpleTestCase):
+    def test_window(self):
+        """SlidingWindowCounter window test
+        Check counts of minutes older than window drop out of totals
+        """
+        clock = Clock()
+        counter = SlidingWindowCounter(window=3, clock=clock)
+        counter.add("a")
+        clock.now = 60
+        counter.add("a", 2)
+        counter.add("b")
+        self.assertEqual(counter.totals(), {"a": 3, "b": 1})
+        self.assertEqual(counter.snapshot(), {0: {"a": 1}, 1: {"a": 2, "b": 1}})
+
+        clock.now = 180
+        self.assertEqual(counter.top(1), [("a", 2)])
+        clock.now = 240
+        self.assertEqual(counter.totals(), {})
+
+
+class TrendingTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock()
+        self.workers = [
+            Trending(
+                window=5,
+                size=2,
+                post_weight=3,
+                clock=self.clock,
+                name="test",
+                max_workers=2,
+            )
+            for _ in range(3)
+        ]
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.stop()
+
+    def test_merge(self):
+        """Trending merge test
+        Check every worker's counts are merged into the top boards and posts
+        """
+        first, second, _ = self.workers
+        first.record_post(1, "a")
+        first.record_vote(1, "a")
+        first.record_vote(1, "a")
+        for _ in range(3):
+            second.record_vote(2, "b")
+        second.record_vote(3, "c")
+
+        first.merge()
+        second.merge()
+        self.assertEqual(second.top_boards(), [("a", 5), ("b", 3)])
+        self.assertEqual(second.top_posts(), [(2, 3), (1, 2)])
+        self.assertEqual(second.top_posts(1), [(2, 3)])
+
+        first.merge()
+        self.assertEqual(first.top_boards(), second.top_boards())
+
+        self.clock.now = 5 * 60
+        first.merge()
+        self.assertEqual(first.top_boards(), [])
+
+    def test_slots(self):
+        """Trending slot test
+        Check workers claim their own slots and merge alone without a free one
+        """
+        first, second, third = self.workers
+        first.record_vote(1, "a")
+        second.record_vote(2, "b")
+        third.record_vote(3, "c")
+        third.record_vote(3, "c")
+
+        for worker in self.workers:
+            worker.merge()
+        self.assertEqual((first.slot, second.slot, third.slot), (0, 1, None))
+        self.assertEqual(third.top_boards(), [("c", 2)])
+
+        cache.delete(third.key(1))
+        third.merge()
+        self.assertEqual(third.slot, 1)
+        self.assertEqual(third.top_boards(), [("c", 2), ("a", 1)])
+
+        second.merge()
+        self.assertEqual(second.slot, None)
+
+
+class TrendingFeedTest(TransactionTestCase):
+    def setUp(self):
+        """Run before every TrendingFeedTest test
+
+        User  : test_user_1
+        Board : trend
+        """
+        self.user = User.objects.create_user(username="test_user_1")
+        self.board = Board.objects.create(
+            name="trend", path="trend", create_user=self.user
+        )
+
+    def test_post_and_vote_feed(self):
+        """Trending feed test
+        Check committed posts and added votes count, retractions don't
+        """
+        boards, posts = trending.counters["boards"], trending.counters["posts"]
+        board_score = boards.totals()["trend"]
+
+        post = Post.objects.create(create_user=self.user, board=self.board, title="a")
+        # Counters outlive other tests, whose deleted post ids are reused
+        votes = posts.totals()[post.pk]
+        cast_vote(self.user, post.pk)
+        cast_vote(self.user, post.pk, is_upvoted=False)
+        retract_vote(self.user, post.pk)
+
+        self.assertEqual(
+            boards.totals()["trend"] - board_score, trending.post_weight + 2
+        )
+        self.assertEqual(posts.totals()[post.pk] - votes, 2)
+
+    def test_rolled_back_feed(self):
+        """Trending rollback test
+        Check rolled back posts and votes aren't counted
+        """
+        boards = trending.counters["boards"]
+        board_score = boards.totals()["trend"]
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic(using=shard_for(self.board.path)):
+                post = Post.objects.create(
+                    create_user=self.user, board=self.board, title="a"
+                )
+                cast_vote(self.user, post.pk)
+                raise IntegrityError
+
+        self.assertEqual(boards.totals()["trend"], board_score)
+
+    def test_trending_view(self):
+        """Trending view test
+        Check trending lists are answered without database queries
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("trending"), {"limit": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"boards", "posts"})
+
+        response = self.client.get(reverse("trending"), {"limit": 0})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,130 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from common.testing import TestCase
+from boards.models import Board
+from common.hyperloglog import HyperLogLog
+from posts.models import Post
+from posts.unique_views import UniqueViews, unique_views
+from users.models import User
+
+
+class HyperLogLogTest(SimpleTestCase):
+    def test_count(self):
+        """HyperLogLog count test
+        Check estimates stay within three standard errors from sparse to dense
+        """
+        sketch = HyperLogLog(precision=10)
+        self.assertEqual(sketch.count(), 0)
+
+        added = 0
+        for total in (10, 1000, 50000):
+            for value in range(added, total):
+                sketch.add(value)
+                sketch.add(value)
+            added = total
+            error = abs(sketch.count() - total) / total
+            self.assertLess(error, 3 * sketch.standard_error())
+
+    def test_merge(self):
+        """HyperLogLog merge test
+        Check merged sketches count the union of their values
+        """
+        first, second = HyperLogLog(), HyperLogLog()
+        for value in range(20000):
+            first.add(value)
+        for value in range(10000, 30000):
+            second.add(value)
+        sparse = HyperLogLog()
+        sparse.add(1)
+
+        union = HyperLogLog().merge(first).merge(second).merge(sparse)
+        self.assertLess(abs(union.count() - 30000) / 30000, 0.05)
+        self.assertEqual(
+            union.count(), HyperLogLog().merge(second).merge(first).count()
+        )
+
+        with self.assertRaises(ValueError):
+            first.merge(HyperLogLog(precision=8))
+
+    def test_bytes(self):
+        """HyperLogLog bytes test
+        Check sparse and dense sketches round trip through to_bytes
+        """
+        sketch = HyperLogLog()
+        for value in range(50):
+            sketch.add(value)
+        data = sketch.to_bytes()
+        self.assertEqual(len(data), 3 + 3 * len(sketch.sparse))
+        self.assertEqual(
+            HyperLogLog.from_bytes(memoryview(data)).count(), sketch.count()
+        )
+
+        for value in range(10000):
+            sketch.add(value)
+        data = sketch.to_bytes()
+        self.assertLess(len(data), sketch.size)
+        restored = HyperLogLog.from_bytes(data)
+        self.assertEqual(restored.registers, sketch.registers)
+
+
+class UniqueViewsTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running UniqueViewsTest
+
+        User        : test_user_1
+        Board       : test
+        Post Fields :
+            create_user : test_user_1
+            board       : test
+            title       : post 0 ~ post 1
+        """
+        cls.user = User.objects.create_user(username="test_user_1")
+        cls.board = Board.objects.create(name="test", path="test", create_user=cls.user)
+        cls.posts = [
+            Post.objects.create(
+                create_user=cls.user, board=cls.board, title=f"post {index}"
+            )
+            for index in range(2)
+        ]
+
+    def tearDown(self):
+        unique_views.drain()
+
+    def test_flush(self):
+        """UniqueViews flush test
+        Check sketches are merged into viewers columns, repeated views count once
+        """
+        views = UniqueViews()
+        first, second = self.posts
+        for viewer in ("a", "b", "a"):
+            views.record(first.pk, self.board.pk, viewer)
+        views.record(second.pk, self.board.pk, "c")
+
+        self.assertEqual(views.post_views(first.pk, None), 2)
+        with self.assertNumQueries(8):
+            self.assertEqual(views.flush(), 3)
+
+        views.record(first.pk, self.board.pk, "d")
+        views.record(first.pk, self.board.pk, "a")
+        views.flush()
+        views.stop()
+
+        first.refresh_from_db()
+        self.board.refresh_from_db()
+        self.assertEqual(views.post_views(first.pk, first.viewers), 3)
+        self.assertEqual(views.board_views(self.board.pk, self.board.viewers), 4)
+
+    def test_comment_thread_views(self):
+        """comment_thread unique views test
+        Check thread responses count each viewer of the post once
+        """
+        url = reverse("comments:thread", args=[self.posts[0].pk])
+        self.assertEqual(self.client.get(url).json()["views"], 1)
+        self.assertEqual(self.client.get(url).json()["views"], 1)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).json()["views"], 2)
+        self.assertEqual(self.posts[0].unique_views(), 2)
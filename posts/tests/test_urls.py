@@ -1 +1,23 @@
-from django.test import TestCase
+from django.urls import resolve, reverse
+from common.testing import TestCase
+from posts import views
+
+
+class PostUrlTest(TestCase):
+    def test_post_list_url(self):
+        """post_list url test
+        Check board path is routed to post_list view
+        """
+        url = reverse("posts:list", args=["test"])
+
+        self.assertEqual(url, "/posts/test/")
+        self.assertEqual(resolve(url).func, views.post_list)
+
+    def test_post_search_url(self):
+        """post_search url test
+        Check board search path is routed to post_search view
+        """
+        url = reverse("posts:search", args=["test"])
+
+        self.assertEqual(url, "/posts/test/search/")
+        self.assertEqual(resolve(url).func, views.post_search)
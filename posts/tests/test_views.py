@@ -1 +1,203 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from common.testing import TestCase
+from boards.models import Board
+from posts.models import Post, PostVotedUser
+from users.models import User
+from users.utils.snapshot import encode_user_jwt
+
+
+class PostListViewTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running PostListViewTest
+
+        User Fields :
+            username : test_user_1
+
+        Board Fields :
+            name        : test
+            path        : test
+            create_user : test_user_1
+
+        Post Fields :
+            title       : post 0 ~ post 44 (post 44 is the latest)
+            created_at  : Two posts share each timestamp
+        """
+        user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=user)
+        now = timezone.now()
+
+        for index in range(45):
+            post = Post.objects.create(
+                create_user=user, board=board, title=f"post {index}", content=""
+            )
+            Post.objects.filter(pk=post.pk).update(
+                created_at=now + timedelta(seconds=index // 2)
+            )
+
+        cls.url = reverse("posts:list", args=["test"])
+
+    def titles(self, response):
+        return [post["title"] for post in response.json()["results"]]
+
+    def test_post_list_first_page(self):
+        """post_list view first page test
+        Check latest 20 posts are returned with next cursor only
+        """
+        response = self.client.get(self.url)
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.titles(response), [f"post {i}" for i in range(44, 24, -1)]
+        )
+        self.assertIsNotNone(data["next"])
+        self.assertIsNone(data["previous"])
+        self.assertNotIn("content", data["results"][0])
+
+    def test_post_list_next_pages(self):
+        """post_list view next cursor test
+        Check following every next cursor returns each post exactly once
+        """
+        titles = []
+        cursor = None
+
+        while True:
+            params = {"cursor": cursor} if cursor else {}
+            response = self.client.get(self.url, params)
+            titles += self.titles(response)
+            cursor = response.json()["next"]
+            if cursor is None:
+                break
+
+        self.assertEqual(titles, [f"post {i}" for i in range(44, -1, -1)])
+
+    def test_post_list_previous_page(self):
+        """post_list view previous cursor test
+        Check previous cursor of second page returns first page
+        """
+        first = self.client.get(self.url)
+        second = self.client.get(self.url, {"cursor": first.json()["next"]})
+        previous = self.client.get(self.url, {"cursor": second.json()["previous"]})
+
+        self.assertEqual(self.titles(second), [f"post {i}" for i in range(24, 4, -1)])
+        self.assertEqual(self.titles(previous), self.titles(first))
+        self.assertIsNone(previous.json()["previous"])
+        self.assertIsNotNone(previous.json()["next"])
+
+    def test_post_list_hot_sort(self):
+        """post_list view hot sort test
+        Check hot sort orders posts by hot_score and paginates by it
+        """
+        Post.objects.filter(title="post 3").update(hot_score=10**6)
+
+        first = self.client.get(self.url, {"sort": "hot"})
+        second = self.client.get(
+            self.url, {"sort": "hot", "cursor": first.json()["next"]}
+        )
+
+        self.assertEqual(self.titles(first)[:2], ["post 3", "post 44"])
+        self.assertEqual(len(set(self.titles(first) + self.titles(second))), 40)
+
+    def test_post_list_cursor_of_other_sort(self):
+        """post_list view cursor sort mismatch test
+        Check latest cursor can't be used for hot sort
+        """
+        cursor = self.client.get(self.url).json()["next"]
+        response = self.client.get(self.url, {"sort": "hot", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_list_unknown_sort(self):
+        """post_list view unknown sort test
+        Check unknown sort returns 400
+        """
+        response = self.client.get(self.url, {"sort": "unknown"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_list_invalid_cursor(self):
+        """post_list view invalid cursor test
+        Check tampered cursor returns 400
+        """
+        response = self.client.get(self.url, {"cursor": "tampered"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_list_viewer_votes(self):
+        """post_list view viewer votes test
+        Check voted states of a page are looked up with a single query
+        """
+        user = User.objects.get(username="test_user_1")
+        for post in Post.objects.filter(title__in=["post 44", "post 43"]):
+            PostVotedUser.objects.create(
+                user=user, post=post, is_upvoted=post.title == "post 44"
+            )
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {encode_user_jwt(user)}"}
+        self.client.get(self.url, **headers)
+        cache.clear()
+
+        with self.assertNumQueries(3):
+            results = self.client.get(self.url, **headers).json()["results"]
+
+        self.assertEqual(["up", "down", None], [post["voted"] for post in results[:3]])
+        self.assertNotIn("voted", self.client.get(self.url).json()["results"][0])
+
+    def test_post_list_unknown_board(self):
+        """post_list view unknown board test
+        Check unknown board path returns 404
+        """
+        response = self.client.get(reverse("posts:list", args=["unknown"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PostSearchViewTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running PostSearchViewTest
+
+        Board Fields :
+            path : test
+
+        Post Fields :
+            title   : apple pie, banana
+            content : content
+        """
+        user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=user)
+        for title in ("apple pie", "banana"):
+            Post.objects.create(
+                create_user=user, board=board, title=title, content="content"
+            )
+
+        cls.url = reverse("posts:search", args=["test"])
+
+    def test_post_search(self):
+        """post_search view test
+        Check matching posts are returned with highlight
+        """
+        response = self.client.get(self.url, {"q": "apple"})
+        results = response.json()["results"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post["title"] for post in results], ["apple pie"])
+        self.assertEqual(results[0]["title_highlight"], "<mark>apple</mark> pie")
+        self.assertIsNone(response.json()["next"])
+
+    def test_post_search_without_query(self):
+        """post_search view empty query test
+        Check missing q returns 400
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_search_invalid_cursor(self):
+        """post_search view invalid cursor test
+        Check tampered cursor returns 400
+        """
+        response = self.client.get(self.url, {"q": "apple", "cursor": "tampered"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,237 @@
+from threading import Barrier, Thread
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from common.testing import TestCase, TransactionTestCase
+from users.models import User
+from boards.models import Board
+from posts.models import Post, PostVotedUser
+from posts.ranking import hot_score
+from posts.votes import (
+    UNCHANGED,
+    VoteChange,
+    cast_vote,
+    flip_vote,
+    retract_vote,
+    viewer_votes,
+)
+
+
+class VoteServiceTest(TestCase):
+    board_path = "test"
+
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running VoteServiceTest
+
+        Users       : test_user_1, test_user_2
+        Board       : test
+        Post Fields :
+            create_user : test_user_1
+            board       : test
+            title       : test title
+        """
+        cls.user = User.objects.create_user(username="test_user_1")
+        cls.other = User.objects.create_user(username="test_user_2")
+        board = Board.objects.create(name="test", path="test", create_user=cls.user)
+        cls.post = Post.objects.create(
+            create_user=cls.user, board=board, title="test title", content="content"
+        )
+
+    def counters(self):
+        post = Post.objects.get(pk=self.post.pk)
+        return post.upvote, post.downvote
+
+    def test_cast_vote(self):
+        """cast_vote test
+        Check first vote increases counter and a retried cast changes nothing
+        """
+        self.assertEqual(VoteChange(1, 0), cast_vote(self.user, self.post))
+        self.assertEqual(UNCHANGED, cast_vote(self.user, self.post))
+        self.assertEqual((1, 0), self.counters())
+
+    def test_cast_vote_flips_opposite_vote(self):
+        """cast_vote flip test
+        Check casting the opposite vote moves the count between counters
+        """
+        cast_vote(self.user, self.post, is_upvoted=True)
+        self.assertEqual(VoteChange(-1, 1), cast_vote(self.user, self.post, False))
+        self.assertEqual((0, 1), self.counters())
+        self.assertFalse(PostVotedUser.objects.get(user=self.user).is_upvoted)
+
+    def test_flip_vote(self):
+        """flip_vote test
+        Check flip changes an existing vote only, and retrying it is a no-op
+        """
+        self.assertEqual(UNCHANGED, flip_vote(self.user, self.post, False))
+        self.assertFalse(PostVotedUser.objects.exists())
+
+        cast_vote(self.user, self.post)
+        self.assertEqual(VoteChange(-1, 1), flip_vote(self.user, self.post, False))
+        self.assertEqual(UNCHANGED, flip_vote(self.user, self.post, False))
+        self.assertEqual((0, 1), self.counters())
+
+    def test_retract_vote(self):
+        """retract_vote test
+        Check retracting decreases the voted counter once and rescores post
+        """
+        cast_vote(self.user, self.post, is_upvoted=False)
+        cast_vote(self.other, self.post)
+
+        self.assertEqual(VoteChange(0, -1), retract_vote(self.user, self.post))
+        self.assertEqual(UNCHANGED, retract_vote(self.user, self.post))
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((1, 0), (post.upvote, post.downvote))
+        self.assertEqual(hot_score(1, 0, post.created_at), post.hot_score)
+
+    def test_vote_counter_update_columns(self):
+        """Vote counter update test
+        Check votes never rewrite post's other columns
+        """
+        Post.objects.filter(pk=self.post.pk).update(content="edited")
+
+        PostVotedUser.objects.create(user=self.user, post=self.post)
+        cast_vote(self.other, self.post)
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual("edited", post.content)
+        self.assertEqual(2, post.upvote)
+
+    def test_post_voted_user_save_flip(self):
+        """PostVotedUser model save flip test
+        Check saving a loaded vote with changed is_upvoted moves the count
+        """
+        PostVotedUser.objects.create(user=self.user, post=self.post)
+
+        vote = PostVotedUser.objects.get(user=self.user)
+        vote.is_upvoted = False
+        vote.save()
+        vote.save()
+
+        self.assertEqual((0, 1), self.counters())
+
+
+class ViewerVotesTest(TransactionTestCase):
+    board_path = "test"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="test_user_1")
+        board = Board.objects.create(name="test", path="test", create_user=self.user)
+        Post.objects.bulk_create(
+            Post(create_user=self.user, board=board, title=f"post {index}")
+            for index in range(100)
+        )
+        self.post_ids = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+        for post_id in self.post_ids[:30]:
+            cast_vote(self.user, post_id, is_upvoted=post_id % 3 != 0)
+
+    def test_viewer_votes_page(self):
+        """viewer_votes 100 posts page test
+        Check votes of a 100 posts page are looked up with one query
+        """
+        with self.assertNumQueries(1):
+            votes = viewer_votes(self.user, self.post_ids)
+
+        self.assertEqual(
+            {post_id: post_id % 3 != 0 for post_id in self.post_ids[:30]}, votes
+        )
+
+    def test_viewer_votes_cache(self):
+        """viewer_votes cache test
+        Check cached states are reused until the viewer's next vote
+        """
+        viewer_votes(self.user, self.post_ids, use_cache=True)
+
+        with self.assertNumQueries(0):
+            votes = viewer_votes(self.user, self.post_ids[:50], use_cache=True)
+        self.assertEqual(30, len(votes))
+
+        cast_vote(self.user, self.post_ids[-1])
+        retract_vote(self.user, self.post_ids[0])
+
+        with self.assertNumQueries(1):
+            votes = viewer_votes(self.user, self.post_ids, use_cache=True)
+        self.assertTrue(votes[self.post_ids[-1]])
+        self.assertNotIn(self.post_ids[0], votes)
+
+
+class VoteServiceConcurrencyTest(TransactionTestCase):
+    board_path = "test"
+
+    threads = 8
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"test_user_{index}")
+            for index in range(self.threads)
+        ]
+        board = Board.objects.create(
+            name="test", path="test", create_user=self.users[0]
+        )
+        self.post = Post.objects.create(
+            create_user=self.users[0], board=board, title="test", content="test"
+        )
+
+    def run_threads(self, target):
+        """Run target(index) in every thread at once, retrying locked databases"""
+        barrier = Barrier(self.threads)
+        errors = []
+
+        def run(index):
+            try:
+                barrier.wait()
+                for _ in range(200):
+                    try:
+                        target(index)
+                        return
+                    except OperationalError:
+                        continue
+                errors.append(index)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [Thread(target=run, args=(index,)) for index in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual([], errors)
+
+    def assertCountersMatchVotes(self):
+        post = Post.objects.get(pk=self.post.pk)
+        votes = PostVotedUser.objects.filter(post=post)
+        self.assertEqual(votes.filter(is_upvoted=True).count(), post.upvote)
+        self.assertEqual(votes.filter(is_upvoted=False).count(), post.downvote)
+        return post
+
+    def test_concurrent_votes(self):
+        """Concurrent cast, flip and retract test
+        Check counters match voted_posts rows after racing and retried votes
+        """
+
+        def vote(index):
+            user = self.users[index]
+            cast_vote(user, self.post)
+            cast_vote(user, self.post)
+            if index % 2:
+                flip_vote(user, self.post, False)
+            if index % 4 == 3:
+                retract_vote(user, self.post)
+
+        self.run_threads(vote)
+
+        post = self.assertCountersMatchVotes()
+        self.assertEqual((4, 2), (post.upvote, post.downvote))
+
+    def test_concurrent_same_vote(self):
+        """Concurrent duplicate cast test
+        Check one user's racing casts count exactly once
+        """
+        self.run_threads(lambda index: cast_vote(self.users[0], self.post, False))
+
+        post = self.assertCountersMatchVotes()
+        self.assertEqual((0, 1), (post.upvote, post.downvote))
@@ -0,0 +1,259 @@
+from collections import Counter, OrderedDict, deque
+from heapq import nlargest
+from operator import itemgetter
+from threading import Event, Lock, Thread
+from time import time
+from uuid import uuid4
+import logging
+import os
+from django.core.cache import cache
+
+TRENDING_WINDOW = int(os.environ.get("TRENDING_WINDOW", 60))
+TRENDING_MERGE_INTERVAL = float(os.environ.get("TRENDING_MERGE_INTERVAL", 10))
+TRENDING_SIZE = int(os.environ.get("TRENDING_SIZE", 100))
+TRENDING_POST_WEIGHT = int(os.environ.get("TRENDING_POST_WEIGHT", 3))
+TRENDING_POST_BOARDS_SIZE = int(os.environ.get("TRENDING_POST_BOARDS_SIZE", 100000))
+TRENDING_MAX_WORKERS = int(os.environ.get("TRENDING_MAX_WORKERS", 64))
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """Event counts by key over the last window minutes
+    A ring of per-minute Counters, the oldest minutes drop out as new ones
+    start, and running totals which expired minutes are subtracted from, so
+    adding an event and reading a key's total take constant time.
+
+    Fields:
+        window    : Counted minutes including the current one
+        clock     : Function returning seconds, time.time by default
+    Methods:
+        add       : Count events of key in the current minute
+        totals    : Return Counter of keys' counts within the window
+        snapshot  : Return per-minute counts within the window
+        top       : Return [(key, count)] of the k highest counts
+    """
+
+    def __init__(self, window=TRENDING_WINDOW, clock=time):
+        self.window = window
+        self.clock = clock
+        self.minutes = deque()
+        self.counts = Counter()
+        self.lock = Lock()
+
+    def advance(self):
+        minute = int(self.clock() // 60)
+        while self.minutes and self.minutes[0][0] <= minute - self.window:
+            _, expired = self.minutes.popleft()
+            self.counts.subtract(expired)
+            for key in expired:
+                if self.counts[key] <= 0:
+                    del self.counts[key]
+
+        if not self.minutes or self.minutes[-1][0] < minute:
+            self.minutes.append((minute, Counter()))
+        return self.minutes[-1][1]
+
+    def add(self, key, count=1):
+        with self.lock:
+            self.advance()[key] += count
+            self.counts[key] += count
+
+    def totals(self):
+        with self.lock:
+            self.advance()
+            return Counter(self.counts)
+
+    def snapshot(self):
+        with self.lock:
+            self.advance()
+            return {minute: dict(counts) for minute, counts in self.minutes if counts}
+
+    def top(self, k):
+        with self.lock:
+            self.advance()
+            return nlargest(k, self.counts.items(), key=itemgetter(1))
+
+
+class Trending:
+    """Trending boards and posts from sliding-window counters of all workers
+    Every process counts post creations and votes per board path and votes
+    per post id in SlidingWindowCounters. Every interval seconds a daemon
+    thread publishes the process's per-minute counts to its own slot key of
+    the default cache, sums the published counts of all slots and keeps the
+    size highest boards and posts. Queries slice those lists, so they never
+    touch the database or the cache, and lag events by interval.
+    Workers claim a free slot with cache.add, so concurrent workers never
+    share one, and slots of stopped workers expire after window minutes.
+    Board scores count a post creation as post_weight votes.
+    Workers only see each other through a cache shared by every process
+    (CACHES in config.settings), LocMemCache merges each process alone.
+
+    Fields:
+        window       : Trending minutes
+        interval     : Seconds between merges
+        size         : Kept boards and posts, the largest query limit
+        post_weight  : Board score of a post creation
+        name         : Shared cache key prefix
+        worker       : Id of this process in its slot
+        max_workers  : Slots, the most merged processes
+        slot         : Claimed slot or None
+    Methods:
+        record_post  : Count post creation in its board
+        record_vote  : Count vote in its post and post's board
+        merge        : Publish local counts, merge all workers' counts
+        top_boards   : Return [(board path, score)] of highest scores
+        top_posts    : Return [(post id, votes)] of most voted posts
+        start / stop : Start or stop background merge thread
+    """
+
+    def __init__(
+        self,
+        window=TRENDING_WINDOW,
+        interval=TRENDING_MERGE_INTERVAL,
+        size=TRENDING_SIZE,
+        post_weight=TRENDING_POST_WEIGHT,
+        name="trending",
+        clock=time,
+        max_workers=TRENDING_MAX_WORKERS,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.slot = None
+        self.window = window
+        self.interval = interval
+        self.size = size
+        self.post_weight = post_weight
+        self.clock = clock
+        self.worker = uuid4().hex
+        self.counters = {
+            "boards": SlidingWindowCounter(window, clock),
+            "posts": SlidingWindowCounter(window, clock),
+        }
+        self.leaders = {"boards": [], "posts": []}
+        self.merged = Event()
+        self.post_boards = OrderedDict()
+        self.post_boards_lock = Lock()
+        self.merge_lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+
+    def remember_board(self, post_id, board_id):
+        with self.post_boards_lock:
+            self.post_boards[post_id] = board_id
+            self.post_boards.move_to_end(post_id)
+            while len(self.post_boards) > TRENDING_POST_BOARDS_SIZE:
+                self.post_boards.popitem(last=False)
+
+    def board_of(self, post_id):
+        with self.post_boards_lock:
+            board_id = self.post_boards.get(post_id)
+        if board_id is None:
+            from common.routers import post_shard
+            from posts.models import Post
+
+            board_id = (
+                Post.objects.using(post_shard(post_id))
+                .filter(pk=post_id)
+                .values_list("board_id", flat=True)
+                .first()
+            )
+            if board_id is not None:
+                self.remember_board(post_id, board_id)
+        return board_id
+
+    def record_post(self, post_id, board_id):
+        self.start()
+        self.remember_board(post_id, board_id)
+        self.counters["boards"].add(board_id, self.post_weight)
+
+    def record_vote(self, post_id, board_id=None):
+        self.start()
+        board_id = board_id or self.board_of(post_id)
+        if board_id is None:
+            return
+        self.counters["posts"].add(post_id)
+        self.counters["boards"].add(board_id)
+
+    def key(self, slot):
+        return f"{self.name}:slot:{slot}"
+
+    def publish(self, snapshot, timeout):
+        """Write snapshot to this worker's slot, claiming a free one if needed"""
+        if self.slot is not None:
+            key = self.key(self.slot)
+            published = cache.get(key)
+            # The slot is refreshed every interval, so it's only lost when
+            # this worker stalled for the whole window
+            if published is not None and published["worker"] == self.worker:
+                cache.set(key, snapshot, timeout)
+                return True
+
+        self.slot = None
+        for slot in range(self.max_workers):
+            if cache.add(self.key(slot), snapshot, timeout):
+                self.slot = slot
+                return True
+        return False
+
+    def merge(self):
+        with self.merge_lock:
+            snapshot = {"worker": self.worker}
+            snapshot.update(
+                (name, counter.snapshot()) for name, counter in self.counters.items()
+            )
+            if self.publish(snapshot, self.window * 60):
+                keys = [self.key(slot) for slot in range(self.max_workers)]
+                published = cache.get_many(keys).values()
+            else:
+                logger.warning("No free trending slot, merging local counts only")
+                published = [snapshot]
+
+            first = int(self.clock() // 60) - self.window + 1
+            totals = {name: Counter() for name in self.counters}
+            for entry in published:
+                for name, total in totals.items():
+                    for minute, counts in entry[name].items():
+                        if minute >= first:
+                            total.update(counts)
+
+            self.leaders = {
+                name: nlargest(self.size, counts.items(), key=itemgetter(1))
+                for name, counts in totals.items()
+            }
+            self.merged.set()
+
+    def ensure_merged(self):
+        self.start()
+        if not self.merged.is_set():
+            self.merge()
+
+    def top_boards(self, limit=10):
+        self.ensure_merged()
+        return self.leaders["boards"][:limit]
+
+    def top_posts(self, limit=10):
+        self.ensure_merged()
+        return self.leaders["posts"][:limit]
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.merge()
+            except Exception:
+                logger.exception("Trending merge failed")
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = Thread(target=self.run, name="trending", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+trending = Trending()
@@ -0,0 +1,200 @@
+from itertools import groupby
+from threading import Event, Lock, Thread
+import atexit
+import logging
+import os
+from django.db import connections, transaction
+from common.hyperloglog import HyperLogLog, hash64
+from common.routers import post_shard
+
+UNIQUE_VIEWS_PRECISION = int(os.environ.get("UNIQUE_VIEWS_PRECISION", 12))
+UNIQUE_VIEWS_INTERVAL = float(os.environ.get("UNIQUE_VIEWS_INTERVAL", 10.0))
+
+logger = logging.getLogger(__name__)
+
+
+def viewer_key(request):
+    """Return viewer identity of request, user id or client address and agent"""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return (
+        f"anonymous:{request.META.get('REMOTE_ADDR', '')}:"
+        f"{request.META.get('HTTP_USER_AGENT', '')}"
+    )
+
+
+class UniqueViews:
+    """Write-behind unique viewer sketches of posts and boards
+    Views only add the viewer's hash to in-memory HyperLogLog sketches, so
+    viewing never writes rows. flush merges pending sketches into the posts'
+    and boards' viewers columns, one SELECT and one bulk UPDATE per batch
+    within a transaction. Sketch merges are unions, so workers flushing the
+    same post count each viewer once and flush order doesn't matter.
+    Unflushed views of a crashed process are lost, like uncounted views.
+    Processes which started the flush thread also flush at exit.
+
+    Fields:
+        precision    : HyperLogLog precision of new sketches
+        interval     : Seconds between background flushes
+        batch_size   : Rows merged by one SELECT and UPDATE
+    Methods:
+        record       : Add viewer to post's and board's pending sketches
+        flush        : Merge pending sketches into rows, return flushed count
+        post_views   : Return estimated unique viewers of post
+        board_views  : Return estimated unique viewers of board
+        start / stop : Start or stop background flush thread
+    """
+
+    def __init__(
+        self,
+        precision=UNIQUE_VIEWS_PRECISION,
+        interval=UNIQUE_VIEWS_INTERVAL,
+        batch_size=500,
+    ):
+        self.precision = precision
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pending = {"posts": {}, "boards": {}}
+        self.lock = Lock()
+        self.flush_lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+        self.flush_registered = False
+
+    def sketch(self, kind, key):
+        sketches = self.pending[kind]
+        sketch = sketches.get(key)
+        if sketch is None:
+            sketch = sketches[key] = HyperLogLog(self.precision)
+        return sketch
+
+    def record(self, post_id, board_id, viewer):
+        self.start()
+        hashed = hash64(viewer)
+        with self.lock:
+            self.sketch("posts", post_id).add_hash(hashed)
+            self.sketch("boards", board_id).add_hash(hashed)
+
+    def drain(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {"posts": {}, "boards": {}}
+        return pending
+
+    def restore(self, kind, sketches):
+        with self.lock:
+            for key, sketch in sketches.items():
+                pending = self.pending[kind].get(key)
+                self.pending[kind][key] = (
+                    sketch if pending is None else pending.merge(sketch)
+                )
+
+    def flush(self, blocking=True):
+        from boards.models import Board
+        from posts.models import Post
+
+        if not self.flush_lock.acquire(blocking=blocking):
+            return 0
+
+        try:
+            pending = self.drain()
+            # Shards own contiguous id ranges, so sorted ids are grouped by shard
+            post_ids = sorted(pending["posts"])
+            batches = [
+                (Post, shard, batch)
+                for shard, ids in groupby(post_ids, key=post_shard)
+                for batch in self.batches(list(ids))
+            ] + [
+                (Board, "default", batch)
+                for batch in self.batches(sorted(pending["boards"]))
+            ]
+
+            for index, (model, using, batch) in enumerate(batches):
+                kind = "posts" if model is Post else "boards"
+                try:
+                    self.apply(model, using, {key: pending[kind][key] for key in batch})
+                except Exception:
+                    # Keep unmerged sketches for the next flush instead of losing views
+                    for model, _, keys in batches[index:]:
+                        kind = "posts" if model is Post else "boards"
+                        self.restore(kind, {key: pending[kind][key] for key in keys})
+                    raise
+
+            return len(pending["posts"]) + len(pending["boards"])
+        finally:
+            self.flush_lock.release()
+
+    def batches(self, keys):
+        return [
+            keys[start : start + self.batch_size]
+            for start in range(0, len(keys), self.batch_size)
+        ]
+
+    @staticmethod
+    def apply(model, using, sketches):
+        with transaction.atomic(using=using):
+            rows = list(
+                model.objects.using(using)
+                .select_for_update()
+                .filter(pk__in=sketches)
+                .only("viewers")
+            )
+            for row in rows:
+                if row.viewers is not None:
+                    stored = HyperLogLog.from_bytes(row.viewers)
+                    if stored.precision == sketches[row.pk].precision:
+                        sketches[row.pk].merge(stored)
+                row.viewers = sketches[row.pk].to_bytes()
+            model.objects.using(using).bulk_update(rows, ["viewers"])
+
+    def views(self, kind, key, stored):
+        sketch = HyperLogLog(self.precision)
+        if stored is not None:
+            sketch = HyperLogLog.from_bytes(stored)
+        with self.lock:
+            pending = self.pending[kind].get(key)
+            if pending is not None and pending.precision == sketch.precision:
+                sketch.merge(pending)
+        return sketch.count()
+
+    def post_views(self, post_id, stored):
+        """Return unique viewers of post from its stored viewers and pending views"""
+        return self.views("posts", post_id, stored)
+
+    def board_views(self, board_id, stored):
+        """Return unique viewers of board from its stored viewers and pending views"""
+        return self.views("boards", board_id, stored)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unique views flush failed")
+            finally:
+                connections.close_all()
+
+    def flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Unique views flush at exit failed")
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = Thread(target=self.run, name="unique-views", daemon=True)
+            self.thread.start()
+            if not self.flush_registered:
+                atexit.register(self.flush_at_exit)
+                self.flush_registered = True
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+
+unique_views = UniqueViews()
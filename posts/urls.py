@@ -0,0 +1,9 @@
+from django.urls import path
+from posts import views
+
+app_name = "posts"
+
+urlpatterns = [
+    path("<str:board_path>/", views.post_list, name="list"),
+    path("<str:board_path>/search/", views.post_search, name="search"),
+]
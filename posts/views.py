@@ -1 +1,129 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from boards.cache import get_board_or_404
+from posts.models import Post
+from posts.search import InvalidSearchCursor, get_search_backend
+from posts.trending import trending
+from posts.votes import viewer_votes
+from common.executor import async_view
+from common.pagination import CursorPaginator, InvalidCursor
+from common.routers import board_sharded, replica_reads
+
+POST_LIST_ORDERINGS = {
+    "latest": ("-created_at", "-id"),
+    "hot": ("-hot_score", "-id"),
+}
+POST_LIST_PAGE_SIZE = 20
+POST_LIST_FIELDS = (
+    "id",
+    "title",
+    "create_user",
+    "upvote",
+    "downvote",
+    "hot_score",
+    "created_at",
+)
+
+
+@async_view
+@require_GET
+@replica_reads()
+@board_sharded
+def post_list(request, board_path):
+    """Latest posts of board paginated by cursor
+    Query Params:
+        sort   : latest (default) or hot
+        cursor : Opaque cursor from previous response's next or previous
+    Response:
+        results  : Post list without content, with voted ("up", "down" or null)
+                   for authenticated users
+        next     : Cursor of following posts or null
+        previous : Cursor of preceding posts or null
+    """
+    ordering = POST_LIST_ORDERINGS.get(request.GET.get("sort", "latest"))
+    if ordering is None:
+        return JsonResponse({"message": "Unknown sort"}, status=400)
+
+    board = get_board_or_404(board_path)
+    queryset = Post.objects.filter(board=board).values(*POST_LIST_FIELDS)
+    paginator = CursorPaginator(queryset, ordering, POST_LIST_PAGE_SIZE)
+
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor as error:
+        return JsonResponse({"message": str(error)}, status=400)
+
+    if request.user.is_authenticated:
+        votes = viewer_votes(
+            request.user, [post["id"] for post in page.items], use_cache=True
+        )
+        for post in page.items:
+            voted = votes.get(post["id"])
+            post["voted"] = None if voted is None else ("up" if voted else "down")
+
+    return JsonResponse(
+        {"results": page.items, "next": page.next, "previous": page.previous}
+    )
+
+
+@async_view
+@require_GET
+@replica_reads()
+@board_sharded
+def post_search(request, board_path):
+    """Board's posts matching search query ordered by relevance
+    Query Params:
+        q      : Search words, every word must match
+        cursor : Opaque cursor from previous response's next
+    Response:
+        results : Post list with title_highlight and content snippet
+        next    : Cursor of less relevant posts or null
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"message": "Search query is required"}, status=400)
+
+    board = get_board_or_404(board_path)
+
+    try:
+        page = get_search_backend().search(
+            query, board.pk, request.GET.get("cursor"), POST_LIST_PAGE_SIZE
+        )
+    except InvalidSearchCursor as error:
+        return JsonResponse({"message": str(error)}, status=400)
+
+    return JsonResponse({"results": page.items, "next": page.next})
+
+
+@require_GET
+def trending_list(request):
+    """Boards and posts with the most activity in the last TRENDING_WINDOW minutes
+    Answered from posts.trending's merged counters without database queries.
+    Query Params:
+        limit : Boards and posts to return, 10 by default
+    Response:
+        boards : Board paths with scores, post creations weigh
+                 TRENDING_POST_WEIGHT votes
+        posts  : Post ids with vote counts
+    """
+    try:
+        limit = int(request.GET.get("limit", 10))
+    except ValueError:
+        limit = 0
+    if not 0 < limit <= trending.size:
+        return JsonResponse(
+            {"message": f"limit must be between 1 and {trending.size}"}, status=400
+        )
+
+    return JsonResponse(
+        {
+            "boards": [
+                {"path": path, "score": score}
+                for path, score in trending.top_boards(limit)
+            ],
+            "posts": [
+                {"id": post_id, "votes": votes}
+                for post_id, votes in trending.top_posts(limit)
+            ],
+        }
+    )
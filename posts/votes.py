@@ -0,0 +1,237 @@
+from collections import defaultdict, namedtuple
+from functools import partial
+from time import time
+import os
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from common.routers import post_shard, use_shard
+from posts.models import Post, PostVotedUser
+from posts.trending import trending
+
+VoteChange = namedtuple("VoteChange", ["upvote", "downvote"])
+UNCHANGED = VoteChange(0, 0)
+VIEWER_VOTES_CACHE_TIMEOUT = int(os.environ.get("VIEWER_VOTES_CACHE_TIMEOUT", 60 * 5))
+VIEWER_VOTES_CACHE_SIZE = int(os.environ.get("VIEWER_VOTES_CACHE_SIZE", 2000))
+
+
+def _key(value):
+    return getattr(value, "pk", value)
+
+
+def loaded_board_id(post):
+    """Return board_id of a loaded Post without querying, otherwise None"""
+    return getattr(post, "__dict__", {}).get("board_id")
+
+
+def _counter(name, delta):
+    if delta >= 0:
+        return F(name) + delta
+    # Never fail the CHECK constraint on counters which drifted to zero
+    return Greatest(F(name) + delta, Value(0))
+
+
+def apply_vote_change(post_id, change, board_id=None):
+    """Add vote counter deltas to post
+    Updates only upvote and downvote with one UPDATE (or buffers the deltas
+    when VOTE_WRITE_BEHIND is set) and then rescores hot_score.
+    Added and flipped votes count in trending posts and boards once the
+    transaction commits, board_id saves looking up the post's board.
+    """
+    if change == UNCHANGED:
+        return
+
+    if change.upvote > 0 or change.downvote > 0:
+        transaction.on_commit(
+            partial(trending.record_vote, post_id, board_id),
+            using=post_shard(post_id),
+        )
+
+    if settings.VOTE_WRITE_BEHIND:
+        from posts.buffer import buffer_vote
+
+        buffer_vote(post_id, change.upvote, change.downvote)
+        return
+
+    Post.objects.using(post_shard(post_id)).filter(pk=post_id).update(
+        upvote=_counter("upvote", change.upvote),
+        downvote=_counter("downvote", change.downvote),
+    )
+    Post(pk=post_id).update_hot_score()
+
+
+def vote_change(is_upvoted, sign=1):
+    """Change of adding (sign 1) or removing (sign -1) a vote"""
+    return VoteChange(sign * int(is_upvoted), sign * int(not is_upvoted))
+
+
+def flip_change(is_upvoted):
+    """Change of an opposite vote turning into is_upvoted"""
+    return VoteChange(1, -1) if is_upvoted else VoteChange(-1, 1)
+
+
+def _flip(votes, is_upvoted):
+    updated = votes.exclude(is_upvoted=is_upvoted).update(
+        is_upvoted=is_upvoted, updated_at=timezone.now()
+    )
+    return flip_change(is_upvoted) if updated else UNCHANGED
+
+
+def cast_vote(user, post, is_upvoted=True):
+    """Set user's vote on post, creating or flipping it
+    Conditional UPDATE flips an opposite vote, otherwise an INSERT creates it.
+    A unique violation means the vote already exists, so retries are no-ops.
+    Return VoteChange applied to post's counters.
+    """
+    user_id, post_id = _key(user), _key(post)
+    using = post_shard(post_id)
+    votes = PostVotedUser.objects.using(using).filter(user_id=user_id, post_id=post_id)
+
+    with transaction.atomic(using=using):
+        while True:
+            change = _flip(votes, is_upvoted)
+            if change != UNCHANGED:
+                break
+
+            try:
+                with transaction.atomic(using=using):
+                    PostVotedUser.objects.using(using).bulk_create(
+                        [
+                            PostVotedUser(
+                                user_id=user_id, post_id=post_id, is_upvoted=is_upvoted
+                            )
+                        ]
+                    )
+            except IntegrityError:
+                # Inserted concurrently, done if it holds is_upvoted, otherwise flip it
+                if votes.filter(is_upvoted=is_upvoted).exists():
+                    break
+                continue
+
+            change = vote_change(is_upvoted)
+            break
+
+        apply_vote_change(post_id, change, loaded_board_id(post))
+        if change != UNCHANGED:
+            invalidate_viewer_votes(user_id, using)
+
+    return change
+
+
+def flip_vote(user, post, is_upvoted):
+    """Turn user's existing opposite vote on post into is_upvoted
+    Never creates a vote. Flipping to the current value is a no-op.
+    Return VoteChange applied to post's counters.
+    """
+    using = post_shard(_key(post))
+    votes = PostVotedUser.objects.using(using).filter(
+        user_id=_key(user), post_id=_key(post)
+    )
+
+    with transaction.atomic(using=using):
+        change = _flip(votes, is_upvoted)
+        apply_vote_change(_key(post), change, loaded_board_id(post))
+        if change != UNCHANGED:
+            invalidate_viewer_votes(_key(user), using)
+
+    return change
+
+
+def retract_vote(user, post):
+    """Withdraw user's vote on post
+    Deletes with a DELETE conditioned on the vote value, so the decremented
+    counter is known without reading the row first. Retrying is a no-op.
+    Return VoteChange applied to post's counters.
+    """
+    using = post_shard(_key(post))
+    votes = PostVotedUser.objects.using(using).filter(
+        user_id=_key(user), post_id=_key(post)
+    )
+
+    with transaction.atomic(using=using):
+        change = UNCHANGED
+        for is_upvoted in (True, False):
+            deleted, _ = votes.filter(is_upvoted=is_upvoted).delete()
+            if deleted:
+                change = vote_change(is_upvoted, -1)
+                break
+
+        apply_vote_change(_key(post), change)
+        if change != UNCHANGED:
+            invalidate_viewer_votes(_key(user), using)
+
+    return change
+
+
+def _viewer_votes_version(user_id):
+    key = f"viewer_votes:{user_id}:version"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_viewer_votes(user_id, using=None):
+    """Drop user's cached vote states once the transaction of using commits"""
+
+    def invalidate():
+        key = f"viewer_votes:{user_id}:version"
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time() * 1000), None)
+
+    transaction.on_commit(invalidate, using=using)
+
+
+def viewer_votes(user, post_ids, use_cache=False):
+    """Return user's votes among posts as {post_id: is_upvoted}
+    Posts the user didn't vote are left out. All posts are looked up with
+    one query on the (user, post) unique index.
+    With use_cache, the states of looked up posts (voted or not) are kept
+    per user under a version stamp which every vote change increments, so a
+    lookup racing a vote can't cache a stale state.
+    """
+    user_id = _key(user)
+    post_ids = list(post_ids)
+    if user_id is None or not post_ids:
+        return {}
+
+    states = {}
+    if use_cache:
+        key = f"viewer_votes:{user_id}:{_viewer_votes_version(user_id)}"
+        states = cache.get(key) or {}
+
+    missing = [post_id for post_id in post_ids if post_id not in states]
+    if missing:
+        if len(states) + len(missing) > VIEWER_VOTES_CACHE_SIZE:
+            states = {
+                post_id: states[post_id] for post_id in post_ids if post_id in states
+            }
+
+        # One query per post database, posts of a board share one
+        shards = defaultdict(list)
+        for post_id in missing:
+            shards[post_shard(post_id)].append(post_id)
+
+        found = {}
+        for alias, shard_post_ids in shards.items():
+            with use_shard(alias):
+                found.update(
+                    PostVotedUser.objects.filter(
+                        user_id=user_id, post_id__in=shard_post_ids
+                    ).values_list("post_id", "is_upvoted")
+                )
+        states.update((post_id, found.get(post_id)) for post_id in missing)
+        if use_cache:
+            cache.set(key, states, VIEWER_VOTES_CACHE_TIMEOUT)
+
+    return {
+        post_id: states[post_id]
+        for post_id in post_ids
+        if states.get(post_id) is not None
+    }
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from hashlib import sha1
+from multiprocessing import get_context
+from threading import Lock
+import logging
+import os
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from common.storage import AtomicFileSystemStorage
+from users.utils.thumbnails import render_thumbnails
+
+AVATAR_SIZES = (48, 96, 256)
+AVATAR_FORMATS = ("webp", "jpeg")
+AVATAR_WORKERS = int(os.environ.get("AVATAR_WORKERS", 2))
+AVATAR_RENDER_TIMEOUT = float(os.environ.get("AVATAR_RENDER_TIMEOUT", 10))
+AVATAR_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+logger = logging.getLogger(__name__)
+
+
+def rendition_name(name, size, format):
+    """Return deterministic storage name of avatar name's rendition"""
+    digest = sha1(name.encode()).hexdigest()
+    return f"renditions/avatars/{digest[:2]}/{digest}/{size}.{format}"
+
+
+class AvatarRenditions:
+    """Fixed-size WebP and JPEG avatar thumbnails rendered in a process pool
+    Renditions of every AVATAR_SIZES and AVATAR_FORMATS are rendered together
+    from one decode in worker processes, so resizing never holds the GIL of
+    request threads, and stored under rendition_name next to the originals.
+    Concurrent requests for one avatar share the render in flight.
+    Workers are spawned on first use and only import Pillow.
+    A pool broken by a crashed worker is replaced on the next submit.
+    Originals are read from default_storage, renditions keep their names in
+    an AtomicFileSystemStorage under MEDIA_ROOT, so concurrent renders of one
+    avatar replace each other's files.
+
+    Fields:
+        workers   : Worker process count
+        storage   : Storage of renditions
+    Methods:
+        cached    : Return whether name's renditions are stored
+        submit    : Render and store name's renditions, return Future of them
+        stored    : Return storage name of stored rendition or None
+        render    : Return rendition bytes, rendered now when not stored
+        shutdown  : Stop worker processes
+    """
+
+    def __init__(self, workers=AVATAR_WORKERS, storage=None):
+        self.workers = workers
+        self._storage = storage
+        self.lock = Lock()
+        self.pending = {}
+        self.executor = None
+
+    @property
+    def storage(self):
+        return self._storage or rendition_storage
+
+    def get_executor(self):
+        if self.executor is None:
+            # Forking would copy Django's threads and database connections
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn")
+            )
+        return self.executor
+
+    def cached(self, name):
+        # Stored last, so renditions are complete when it exists
+        return self.storage.exists(
+            rendition_name(name, AVATAR_SIZES[-1], AVATAR_FORMATS[-1])
+        )
+
+    def submit(self, name):
+        with self.lock:
+            future = self.pending.get(name)
+        if future is not None:
+            return future
+
+        # Read outside the lock, slow storage must not block other avatars
+        with default_storage.open(name) as original:
+            data = original.read()
+        with self.lock:
+            future = self.pending.get(name)
+            if future is not None:
+                return future
+
+            executor = self.get_executor()
+            try:
+                future = executor.submit(
+                    render_thumbnails, data, AVATAR_SIZES, AVATAR_FORMATS
+                )
+            except BrokenProcessPool:
+                self.executor = None
+                executor = self.get_executor()
+                future = executor.submit(
+                    render_thumbnails, data, AVATAR_SIZES, AVATAR_FORMATS
+                )
+            self.pending[name] = future
+        future.add_done_callback(partial(self.store, name, executor))
+        return future
+
+    def store(self, name, executor, future):
+        try:
+            if isinstance(future.exception(), BrokenProcessPool):
+                with self.lock:
+                    if self.executor is executor:
+                        self.executor = None
+            if future.exception() is not None:
+                logger.warning(
+                    "Rendering avatar %s failed", name, exc_info=future.exception()
+                )
+                return
+
+            # Save order matches cached, the largest last rendition marks completion
+            for size in AVATAR_SIZES:
+                for format in AVATAR_FORMATS:
+                    path = rendition_name(name, size, format)
+                    if not self.storage.exists(path):
+                        self.storage.save(
+                            path, ContentFile(future.result()[(size, format)])
+                        )
+        except Exception:
+            logger.exception("Storing avatar %s renditions failed", name)
+        finally:
+            with self.lock:
+                self.pending.pop(name, None)
+
+    def stored(self, name, size, format):
+        """Return storage name of stored rendition or None"""
+        path = rendition_name(name, size, format)
+        return path if self.storage.exists(path) else None
+
+    def render(self, name, size, format, timeout=AVATAR_RENDER_TIMEOUT):
+        """Return rendition bytes, lazily rendering avatars without renditions"""
+        path = self.stored(name, size, format)
+        if path is not None:
+            with self.storage.open(path) as stored:
+                return stored.read()
+        return self.submit(name).result(timeout)[(size, format)]
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+rendition_storage = AtomicFileSystemStorage()
+avatar_renditions = AvatarRenditions()
+
+
+def prepare_renditions(name):
+    """Start rendering uploaded avatar name unless its renditions are stored"""
+    try:
+        if not avatar_renditions.cached(name):
+            avatar_renditions.submit(name)
+    except Exception:
+        logger.exception("Submitting avatar %s failed", name)
@@ -0,0 +1,98 @@
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from time import perf_counter, process_time, sleep
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from PIL import Image
+from common.media import serve_media
+from users.avatars import AVATAR_FORMATS, AVATAR_SIZES, avatar_renditions
+from users.models import User
+from users.utils.thumbnails import render_thumbnails
+from users.views import avatar
+
+
+class Command(BaseCommand):
+    """Benchmark bytes and CPU per avatar request, original against renditions
+    A synthetic photo of size pixels is uploaded to a temporary MEDIA_ROOT.
+    "original" serves the upload like the media URL pattern does, the other
+    rows serve stored renditions through the avatar view. CPU is the request
+    thread's process time, rendering CPU is spent once per avatar in a
+    worker process and reported separately.
+    """
+
+    help = "Compare bytes and CPU per avatar request of originals and renditions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=2000)
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        size = (options["size"], options["size"])
+        # Detail at every scale like photos, noise would average out when shrunk
+        photo = Image.merge(
+            "RGB",
+            [
+                Image.effect_mandelbrot(size, (-2 + shift, -1.5, 1 + shift, 1.5), 100)
+                for shift in (0, 0.02, 0.04)
+            ],
+        )
+        stream = BytesIO()
+        photo.save(stream, "JPEG", quality=92)
+        data = stream.getvalue()
+
+        start = process_time()
+        render_thumbnails(data, AVATAR_SIZES, AVATAR_FORMATS)
+        render_cpu = (process_time() - start) * 1000
+
+        with TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            user = User.objects.create_user(
+                username="bench_avatars_user",
+                avatar=SimpleUploadedFile("bench.jpg", data),
+            )
+            try:
+                self.wait_for_renditions(user.avatar.name)
+                self.report(user.avatar.name, options["requests"])
+            finally:
+                user.delete()
+                avatar_renditions.shutdown()
+
+        self.stdout.write(
+            f"{'render (worker, once)':<24} {render_cpu:10.3f} cpu ms for "
+            f"{len(AVATAR_SIZES) * len(AVATAR_FORMATS)} renditions"
+        )
+
+    @staticmethod
+    def wait_for_renditions(name, timeout=30):
+        deadline = perf_counter() + timeout
+        while not avatar_renditions.cached(name):
+            if perf_counter() > deadline:
+                raise CommandError("Renditions weren't stored in time")
+            sleep(0.05)
+
+    def report(self, name, requests):
+        factory = RequestFactory()
+        targets = [("original", lambda request: serve_media(request, name))] + [
+            (
+                f"{size}px {format}",
+                lambda request, size=size, format=format: avatar(
+                    request, size, format, name
+                ),
+            )
+            for size in AVATAR_SIZES
+            for format in AVATAR_FORMATS
+        ]
+
+        for label, view in targets:
+            served = 0
+            start = process_time()
+            for _ in range(requests):
+                response = view(factory.get("/"))
+                served += len(b"".join(response.streaming_content))
+                response.close()
+            cpu = (process_time() - start) * 1000 / requests
+
+            self.stdout.write(
+                f"{label:<24} {served // requests:10,d} bytes {cpu:10.3f} cpu ms"
+                " per request"
+            )
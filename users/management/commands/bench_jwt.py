@@ -0,0 +1,46 @@
+from time import perf_counter, time
+from django.core.management.base import BaseCommand
+from users.utils.jwt import decode_jwt, encode_jwt, verified_token_cache, verify_jwt
+
+
+class Command(BaseCommand):
+    """Benchmark jwt verification with and without VerifiedTokenCache
+    A pool of distinct tokens is decoded round robin, like busy clients
+    re-sending the same access tokens.
+    """
+
+    help = "Compare cached and uncached jwt verification throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tokens", type=int, default=100)
+        parser.add_argument("--iterations", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        tokens = [
+            encode_jwt(
+                {
+                    "user_id": index,
+                    "iss": "Dynamic Board Backend",
+                    "exp": int(time()) + 3600,
+                }
+            )
+            for index in range(options["tokens"])
+        ]
+        iterations = options["iterations"]
+
+        verified_token_cache.clear()
+        uncached = self.throughput(verify_jwt, tokens, iterations)
+        cached = self.throughput(decode_jwt, tokens, iterations)
+
+        self.stdout.write(f"uncached verify_jwt : {uncached:12,.0f} tokens/sec")
+        self.stdout.write(f"cached decode_jwt   : {cached:12,.0f} tokens/sec")
+        self.stdout.write(f"speedup             : {cached / uncached:12.1f}x")
+        self.stdout.write(f"cache info          : {verified_token_cache.info()}")
+
+    @staticmethod
+    def throughput(decode, tokens, iterations):
+        count = len(tokens)
+        start = perf_counter()
+        for index in range(iterations):
+            decode(tokens[index % count])
+        return iterations / (perf_counter() - start)
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+from common.middleware import HybridMiddleware
+from users.utils.snapshot import user_from_jwt
+
+AUTHORIZATION_PREFIX = "Bearer "
+
+
+class JsonWebTokenMiddleware(HybridMiddleware):
+    """Authenticate request by jwt in Authorization header
+    request.user is built lazily from the token's user snapshot, so the users
+    table is only queried when a field outside the snapshot is accessed.
+    Invalid, expired or stale tokens fail closed to AnonymousUser.
+    Requests without a bearer token keep AuthenticationMiddleware's user.
+    Nothing is awaited, so the same code returns the response or, under ASGI,
+    the coroutine of get_response.
+    """
+
+    def __call__(self, request):
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+
+        if authorization.startswith(AUTHORIZATION_PREFIX):
+            access_token = authorization[len(AUTHORIZATION_PREFIX) :].strip()
+            request.user = SimpleLazyObject(
+                lambda: user_from_jwt(access_token) or AnonymousUser()
+            )
+            # Bearer tokens aren't sent by browsers on their own like cookies
+            request._dont_enforce_csrf_checks = True
+
+        return self.get_response(request)
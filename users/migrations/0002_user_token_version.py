@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
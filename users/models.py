@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import AbstractUser
 from common.models import Permission
+from users.utils.snapshot import set_token_version
+
+# Saving any of them makes issued jwt snapshots stale
+TOKEN_FIELDS = {"username", "permission", "is_active", "password"}
 
 
 class User(AbstractUser):
@@ -8,11 +12,14 @@ class User(AbstractUser):
     Inherit:
         AbstractUser
     Fields:
-        avatar     : ImageField
-        bio        : CharField
-        permission : CharField
+        avatar        : ImageField
+        bio           : CharField
+        permission    : CharField
+        token_version : PositiveIntegerField
+    Methods:
+        save          : Bump token_version so issued jwt snapshots become stale
     Meta:
-        db_table   : users
+        db_table      : users
     """
 
     avatar = models.ImageField(upload_to="avatars", default="default_avatar.png")
@@ -20,6 +27,29 @@ class User(AbstractUser):
     permission = models.CharField(
         choices=Permission.choices, max_length=6, default=Permission.NORMAL
     )
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # Partial saves such as update_last_login keep issued tokens valid
+        update_fields = kwargs.get("update_fields")
+        if self._state.adding or (
+            update_fields is not None and TOKEN_FIELDS.isdisjoint(update_fields)
+        ):
+            super().save(*args, **kwargs)
+        else:
+            using = kwargs.get("using") or router.db_for_write(User, instance=self)
+            with transaction.atomic(using=using):
+                # Bumped in the row, a stale instance never lowers the version
+                users = User.objects.using(using).filter(pk=self.pk)
+                users.update(token_version=models.F("token_version") + 1)
+                version = users.values_list("token_version", flat=True).first()
+                # A deleted row is inserted again by save with the old version
+                if version is not None:
+                    self.token_version = version
+                super().save(*args, **kwargs)
+
+        # Published before commit, a rollback only rejects tokens until cache expiry
+        set_token_version(self.pk, self.token_version)
 
     class Meta:
         db_table = "users"
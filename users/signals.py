@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from users.avatars import prepare_renditions
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+def render_avatar(sender, instance, update_fields=None, **kwargs):
+    """Render uploaded avatar's thumbnails in the background after commit"""
+    if update_fields is not None and "avatar" not in update_fields:
+        return
+    name = instance.avatar.name
+    if name and name != User._meta.get_field("avatar").default:
+        transaction.on_commit(lambda: prepare_renditions(name))
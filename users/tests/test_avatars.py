@@ -0,0 +1,133 @@
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest import mock
+import os
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from common.testing import TestCase
+from PIL import Image
+from common.media import IMMUTABLE_CACHE_CONTROL
+from users.avatars import avatar_renditions, rendition_name
+from users.models import User
+from users.utils.thumbnails import render_thumbnails
+
+
+def image_bytes(size=(640, 480), mode="RGB", format="PNG"):
+    stream = BytesIO()
+    Image.new(mode, size, (200, 40, 40, 128)[: len(mode)]).save(stream, format)
+    return stream.getvalue()
+
+
+class RenderThumbnailsTest(SimpleTestCase):
+    def test_render_thumbnails(self):
+        """render_thumbnails test
+        Check every size and format is a square image of its format
+        """
+        thumbnails = render_thumbnails(
+            image_bytes(mode="RGBA"), (48, 96), ("webp", "jpeg")
+        )
+
+        self.assertEqual(len(thumbnails), 4)
+        for (size, format), data in thumbnails.items():
+            with Image.open(BytesIO(data)) as image:
+                self.assertEqual(image.size, (size, size))
+                self.assertEqual(image.format, format.upper())
+
+
+class AvatarViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media = TemporaryDirectory()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media.name)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        avatar_renditions.shutdown()
+        cls.media_settings.disable()
+        cls.media.cleanup()
+
+    def setUp(self):
+        """Run before every AvatarViewTest test
+
+        User   : test_user_1
+        Avatar : 640x480 PNG
+        """
+        self.user = User.objects.create_user(
+            username="test_user_1",
+            avatar=SimpleUploadedFile("avatar.png", image_bytes()),
+        )
+
+    def test_lazy_rendition(self):
+        """Avatar rendition test
+        Check existing avatars are rendered on first request, then served stored
+        """
+        name = self.user.avatar.name
+        url = reverse("users:avatar", args=[96, "webp", name])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        with Image.open(BytesIO(response.content)) as image:
+            self.assertEqual(image.size, (96, 96))
+
+        for _ in range(100):
+            if avatar_renditions.cached(name):
+                break
+            sleep(0.05)
+        self.assertTrue(avatar_renditions.cached(name))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            avatar_renditions.render(name, 96, "webp"),
+        )
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(self.media.name, rendition_name(name, 48, "jpeg"))
+            )
+        )
+
+    def test_unknown_avatar(self):
+        """Avatar rendition not found test
+        Check sizes, formats and files other than avatars aren't rendered
+        """
+        name = self.user.avatar.name
+        for args in ([95, "webp", name], [96, "png", name], [96, "webp", "other.png"]):
+            response = self.client.get(reverse("users:avatar", args=args))
+            self.assertEqual(response.status_code, 404)
+
+    def test_failed_render(self):
+        """Avatar rendition failure test
+        Check lost worker processes respond 503 and decompression bombs 404
+        """
+        url = reverse("users:avatar", args=[96, "webp", self.user.avatar.name])
+        for error, status in (
+            (BrokenProcessPool, 503),
+            (Image.DecompressionBombError, 404),
+        ):
+            with mock.patch.object(avatar_renditions, "render", side_effect=error):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status)
+
+    def test_save_twice(self):
+        """Avatar rendition storage test
+        Check saving a stored rendition name again replaces its file in place
+        """
+        path = rendition_name("other.png", 96, "webp")
+        self.addCleanup(avatar_renditions.storage.delete, path)
+        for content in (b"first", b"second"):
+            saved = avatar_renditions.storage.save(path, ContentFile(content))
+            self.assertEqual(saved, path)
+
+        directory = os.path.join(self.media.name, os.path.dirname(path))
+        self.assertEqual(os.listdir(directory), ["96.webp"])
+        self.assertEqual(avatar_renditions.render("other.png", 96, "webp"), b"second")
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from common.testing import TestCase
+from common.models import Permission
+from users.middleware import JsonWebTokenMiddleware
+from users.models import User
+from users.utils.snapshot import encode_user_jwt
+
+
+class JsonWebTokenMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Run only once when running JsonWebTokenMiddlewareTest
+
+        User Fields :
+            username   : test_user_1
+            email      : test@test.com
+            permission : Permission.STAFF
+        """
+        User.objects.create_user(
+            username="test_user_1", email="test@test.com", permission=Permission.STAFF
+        )
+
+    def setUp(self):
+        """Run every test function
+        Clear token_version cache and issue token of test_user_1
+        """
+        cache.clear()
+        self.user = User.objects.get(username="test_user_1")
+        self.token = encode_user_jwt(self.user)
+        self.middleware = JsonWebTokenMiddleware(lambda request: request.user)
+
+    def authenticate(self, authorization=None):
+        headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+        request = RequestFactory().get("/", **headers)
+        request.user = AnonymousUser()
+        return self.middleware(request)
+
+    def test_snapshot_user_without_query(self):
+        """JsonWebTokenMiddleware snapshot test
+        Check snapshot fields are read without querying users table
+        """
+        self.authenticate(f"Bearer {self.token}").is_authenticated
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(f"Bearer {self.token}")
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.username, "test_user_1")
+            self.assertEqual(user.permission, Permission.STAFF)
+
+    def test_snapshot_user_deferred_field(self):
+        """JsonWebTokenMiddleware deferred field test
+        Check field outside snapshot is loaded from users table on access
+        """
+        user = self.authenticate(f"Bearer {self.token}")
+        user.is_authenticated
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "test@test.com")
+
+    def test_stale_snapshot_fail_closed(self):
+        """JsonWebTokenMiddleware stale token test
+        Check token issued before user save is rejected
+        """
+        self.assertTrue(self.authenticate(f"Bearer {self.token}").is_authenticated)
+
+        self.user.bio = "changed"
+        self.user.save()
+
+        self.assertFalse(self.authenticate(f"Bearer {self.token}").is_authenticated)
+        new_token = encode_user_jwt(self.user)
+        self.assertTrue(self.authenticate(f"Bearer {new_token}").is_authenticated)
+
+    def test_partial_save_keep_snapshot(self):
+        """JsonWebTokenMiddleware partial save test
+        Check save with update_fields (e.g. last_login) keeps token valid
+        """
+        self.user.bio = "changed"
+        self.user.save(update_fields=["bio"])
+
+        self.assertTrue(self.authenticate(f"Bearer {self.token}").is_authenticated)
+
+    def test_inactive_user_fail_closed(self):
+        """JsonWebTokenMiddleware inactive user test
+        Check token of user deactivated by queryset update is rejected
+        """
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertFalse(self.authenticate(f"Bearer {self.token}").is_authenticated)
+
+    def test_invalid_token(self):
+        """JsonWebTokenMiddleware invalid token test
+        Check malformed token becomes AnonymousUser
+        """
+        self.assertFalse(self.authenticate("Bearer invalid").is_authenticated)
+
+    def test_without_token(self):
+        """JsonWebTokenMiddleware without token test
+        Check request without Authorization header keeps existing user
+        """
+        self.assertIsInstance(self.authenticate(), AnonymousUser)
@@ -1,6 +1,7 @@
-from django.test import TestCase
 from django.db import IntegrityError
+from common.testing import TestCase
 from users.models import User
+from users.utils.snapshot import encode_user_jwt, user_from_jwt
 from common.models import Permission
 from tempfile import NamedTemporaryFile
 
@@ -90,3 +91,36 @@ class UserModelTest(TestCase):
         user.save()
 
         self.assertEqual(user.avatar, test_image_file)
+
+    def test_user_save_token_version(self):
+        """User model save method token_version test
+        Check saving a stale instance never lowers the stored token_version
+        """
+        stale = User.objects.get(username="test_user_2")
+        user = User.objects.get(username="test_user_2")
+        user.save()
+        user.save()
+
+        stale.save()
+        self.assertEqual(stale.token_version, 3)
+        self.assertEqual(User.objects.get(pk=stale.pk).token_version, 3)
+
+        stale.save(update_fields=["bio"])
+        self.assertEqual(User.objects.get(pk=stale.pk).token_version, 3)
+
+    def test_user_partial_save_token_version(self):
+        """User model partial save token_version test
+        Check partial saves of token fields reject issued tokens, others don't
+        """
+        user = User.objects.get(username="test_user_2")
+        token = encode_user_jwt(user)
+
+        user.save(update_fields=["last_login"])
+        self.assertIsNotNone(user_from_jwt(token))
+
+        user.permission = Permission.NORMAL
+        user.save(update_fields=["permission"])
+        self.assertIsNone(user_from_jwt(token))
+        self.assertEqual(
+            user_from_jwt(encode_user_jwt(user)).permission, Permission.NORMAL
+        )
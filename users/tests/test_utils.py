@@ -1,5 +1,13 @@
-from django.test import TestCase
-from users.utils.jwt import decode_jwt, encode_jwt
+from time import time
+from unittest.mock import patch
+from common.testing import TestCase
+from users.utils.jwt import (
+    VerifiedTokenCache,
+    decode_jwt,
+    encode_jwt,
+    verified_token_cache,
+)
+import jwt
 
 
 class JsonWebTokenUtilTest(TestCase):
@@ -23,3 +31,77 @@ class JsonWebTokenUtilTest(TestCase):
         """
         data = decode_jwt(self.jwt)
         self.assertEqual(self.data, data)
+
+
+class VerifiedTokenCacheTest(TestCase):
+    def setUp(self):
+        """Run every test function
+        Clear shared cache and prepare token which expires in an hour
+        """
+        verified_token_cache.clear()
+        self.data = {
+            "key": "value",
+            "iss": "Dynamic Board Backend",
+            "exp": int(time()) + 3600,
+        }
+        self.jwt = encode_jwt(self.data)
+
+    def test_decode_jwt_cache_hit(self):
+        """decode_jwt cache hit test
+        Check second decoding is answered from cache with same claims
+        """
+        self.assertEqual(decode_jwt(self.jwt), self.data)
+        self.assertEqual(decode_jwt(self.jwt), self.data)
+
+        info = verified_token_cache.info()
+        self.assertEqual(info["misses"], 1)
+        self.assertEqual(info["hits"], 1)
+
+    def test_decode_jwt_cached_claims_copy(self):
+        """decode_jwt cached claims copy test
+        Check mutating returned claims doesn't change cached claims
+        """
+        decode_jwt(self.jwt)["key"] = "changed"
+        self.assertEqual(decode_jwt(self.jwt)["key"], "value")
+
+    def test_decode_jwt_invalid_not_cached(self):
+        """decode_jwt invalid token test
+        Check token with wrong signature raises every time and isn't cached
+        """
+        header, payload, signature = self.jwt.split(".")
+        forged = f"{header}.{payload}.{signature[::-1]}"
+
+        for _ in range(2):
+            with self.assertRaises(jwt.InvalidSignatureError):
+                decode_jwt(forged)
+
+        self.assertEqual(verified_token_cache.info()["size"], 0)
+
+    def test_decode_jwt_cache_expire(self):
+        """decode_jwt cache expiration test
+        Check cached claims aren't returned after token's exp
+        """
+        decode_jwt(self.jwt)
+
+        expired = self.data["exp"] + 1
+        with patch("users.utils.jwt.time", return_value=expired), patch(
+            "jwt.api_jwt.timegm", return_value=expired
+        ):
+            with self.assertRaises(jwt.ExpiredSignatureError):
+                decode_jwt(self.jwt)
+
+        self.assertEqual(verified_token_cache.info()["size"], 0)
+
+    def test_cache_lru_eviction(self):
+        """VerifiedTokenCache eviction test
+        Check least recently used entry is evicted over maxsize
+        """
+        cache = VerifiedTokenCache(maxsize=2)
+        cache.set(b"a", {"key": "a"})
+        cache.set(b"b", {"key": "b"})
+        cache.get(b"a")
+        cache.set(b"c", {"key": "c"})
+
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"a"), {"key": "a"})
+        self.assertEqual(cache.get(b"c"), {"key": "c"})
@@ -0,0 +1,8 @@
+from django.urls import path
+from users import views
+
+app_name = "users"
+
+urlpatterns = [
+    path("avatars/<int:size>/<str:format>/<path:name>", views.avatar, name="avatar"),
+]
@@ -1,16 +1,96 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from time import time
 import os
 import jwt
 
-
 JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM")
 SECRET_KEY = os.environ.get("SECRET_KEY")
+JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE", 4096))
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified jwt claims
+    Keyed by token's sha256 digest so raw tokens aren't kept in memory.
+    Entry expires at token's own exp claim and only verified claims are stored.
+
+    Fields:
+        maxsize : Maximum entries, least recently used entry is evicted first
+        hits    : Count of lookups answered from cache
+        misses  : Count of lookups which needed verification
+    Methods:
+        get     : Return cached claims or None
+        set     : Store verified claims
+        clear   : Remove every entry and reset counters
+        info    : Return hits, misses, size and maxsize
+    """
+
+    def __init__(self, maxsize=JWT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def digest(access_token):
+        if isinstance(access_token, str):
+            access_token = access_token.encode("utf-8")
+        return sha256(access_token).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at is None or time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(claims)
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, claims):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = claims.get("exp")
+        if expires_at is not None and not isinstance(expires_at, (int, float)):
+            return
+
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+verified_token_cache = VerifiedTokenCache()
 
 
 def encode_jwt(data):
     return jwt.encode(data, SECRET_KEY, algorithm=JWT_ALGORITHM).decode("utf-8")
 
 
-def decode_jwt(access_token):
+def verify_jwt(access_token):
     return jwt.decode(
         access_token,
         SECRET_KEY,
@@ -18,3 +98,14 @@ def decode_jwt(access_token):
         issuer="Dynamic Board Backend",
         options={"verify_aud": False},
     )
+
+
+def decode_jwt(access_token):
+    key = verified_token_cache.digest(access_token)
+    claims = verified_token_cache.get(key)
+
+    if claims is None:
+        claims = verify_jwt(access_token)
+        verified_token_cache.set(key, claims)
+
+    return claims
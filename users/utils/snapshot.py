@@ -0,0 +1,97 @@
+from time import time
+import os
+import jwt
+from django.core.cache import cache
+from django.db import router
+from django.db.models import DEFERRED
+from users.utils.jwt import encode_jwt, decode_jwt
+
+JWT_ISSUER = "Dynamic Board Backend"
+JWT_EXPIRATION_SECONDS = int(os.environ.get("JWT_EXPIRATION_SECONDS", 60 * 60 * 24))
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.environ.get("TOKEN_VERSION_CACHE_TIMEOUT", 60))
+SNAPSHOT_FIELDS = ("id", "username", "permission", "token_version")
+
+
+def token_version_key(user_id):
+    return f"users:token_version:{user_id}"
+
+
+def set_token_version(user_id, version):
+    cache.set(token_version_key(user_id), version, TOKEN_VERSION_CACHE_TIMEOUT)
+
+
+def get_token_version(user_id):
+    """Return user's current token_version or None for missing/inactive user
+    Looked up from cache first, so the users table is queried at most once per
+    TOKEN_VERSION_CACHE_TIMEOUT for each user. Other processes see a bumped
+    version at once only through a shared cache (CACHES in config.settings),
+    with a per process cache they accept revoked tokens until the timeout.
+    """
+    from users.models import User
+
+    version = cache.get(token_version_key(user_id))
+    if version is None:
+        row = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        version = -1 if row is None else row
+        set_token_version(user_id, version)
+
+    return None if version < 0 else version
+
+
+def encode_user_jwt(user, expires_in=JWT_EXPIRATION_SECONDS):
+    """Return access token carrying user's snapshot claims"""
+    return encode_jwt(
+        {
+            "id": user.pk,
+            "username": user.username,
+            "permission": user.permission,
+            "ver": user.token_version,
+            "iss": JWT_ISSUER,
+            "exp": int(time()) + expires_in,
+        }
+    )
+
+
+def user_from_claims(claims):
+    """Build User instance from snapshot claims without querying the database
+    Fields missing from the token are deferred, so touching one of them loads
+    only that field from the users table.
+    Return None when the snapshot is malformed or its version is stale.
+    """
+    from users.models import User
+
+    try:
+        values = {
+            "id": int(claims["id"]),
+            "username": claims["username"],
+            "permission": claims["permission"],
+            "token_version": int(claims["ver"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if get_token_version(values["id"]) != values["token_version"]:
+        return None
+
+    field_names = [
+        field.attname for field in User._meta.concrete_fields if field.attname in values
+    ]
+    return User.from_db(
+        router.db_for_read(User),
+        field_names,
+        [
+            values[field.attname] if field.attname in values else DEFERRED
+            for field in User._meta.concrete_fields
+        ],
+    )
+
+
+def user_from_jwt(access_token):
+    try:
+        return user_from_claims(decode_jwt(access_token))
+    except jwt.InvalidTokenError:
+        return None
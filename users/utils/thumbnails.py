@@ -0,0 +1,41 @@
+from io import BytesIO
+from PIL import Image, ImageOps
+
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def render_thumbnails(data, sizes, formats):
+    """Return {(size, format): bytes} of square thumbnails of image data
+    Pure Pillow without Django, so process pool workers only import this.
+    The image is decoded once, JPEGs at the smallest scale covering the
+    largest size (draft), then every size is cropped to fill its square.
+    """
+    largest = max(sizes)
+    with Image.open(BytesIO(data)) as image:
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    thumbnails = {}
+    for size in sorted(sizes, reverse=True):
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for format in formats:
+            pillow_format, options = THUMBNAIL_FORMATS[format]
+            if pillow_format == "JPEG" and thumbnail.mode == "RGBA":
+                background = Image.new("RGB", thumbnail.size, (255, 255, 255))
+                background.paste(thumbnail, mask=thumbnail.getchannel("A"))
+                output = background
+            else:
+                output = thumbnail
+
+            stream = BytesIO()
+            output.save(stream, pillow_format, **options)
+            thumbnails[(size, format)] = stream.getvalue()
+        # Smaller sizes resample the previous thumbnail instead of the original
+        image = thumbnail
+
+    return thumbnails
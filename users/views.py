@@ -1 +1,51 @@
-from django.shortcuts import render
+from concurrent.futures import TimeoutError as RenderTimeout
+from concurrent.futures.process import BrokenProcessPool
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+from PIL.Image import DecompressionBombError
+from common.media import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, serve_media
+from common.storage import content_digest
+from users.avatars import (
+    AVATAR_CONTENT_TYPES,
+    AVATAR_FORMATS,
+    AVATAR_SIZES,
+    avatar_renditions,
+)
+from users.models import User
+
+
+@require_safe
+def avatar(request, size, format, name):
+    """Avatar thumbnail of size in pixels and format (webp or jpeg)
+    URL Params:
+        name : Avatar file name, e.g. user.avatar.name
+    Response:
+        Stored rendition, cached by clients for a year when name is content
+        addressed. Existing avatars without renditions are rendered on
+        first request. Renders timing out or losing their worker process
+        respond 503, undecodable images 404.
+    """
+    if size not in AVATAR_SIZES or format not in AVATAR_FORMATS:
+        raise Http404
+
+    immutable = content_digest(name) is not None
+    stored = avatar_renditions.stored(name, size, format)
+    if stored is not None:
+        return serve_media(request, stored, immutable, avatar_renditions.storage)
+
+    if not User.objects.filter(avatar=name).exists():
+        raise Http404
+    try:
+        data = avatar_renditions.render(name, size, format)
+    except (RenderTimeout, BrokenProcessPool):
+        response = HttpResponse(status=503)
+        response["Retry-After"] = "1"
+        return response
+    except (OSError, DecompressionBombError):
+        raise Http404
+
+    response = HttpResponse(data, content_type=AVATAR_CONTENT_TYPES[format])
+    response["Cache-Control"] = (
+        IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    )
+    return response